@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class ArticleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'article'
+
+    def ready(self):
+        from article.facets import invalidate_facets
+        from article.homepage import invalidate_homepage
+        from core.models import Article, Tag
+
+        for handler in (invalidate_facets, invalidate_homepage):
+            for model in (Article, Tag):
+                post_save.connect(handler, sender=model)
+                post_delete.connect(handler, sender=model)
+            m2m_changed.connect(handler, sender=Article.tags.through)
@@ -0,0 +1,185 @@
+"""
+Ingest of article photos delivered as ZIP archive.
+"""
+import logging
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from core.models import Image
+from article.serializers import ArchivePhotoSerializer
+
+logger = logging.getLogger(__name__)
+
+IGNORED_PREFIXES = ('__MACOSX/', '.')
+
+
+def progress_key(article):
+    """Returns cache key holding archive ingest progress of article."""
+    return f'article-archive-progress-{article.pk}'
+
+
+def get_progress(article):
+    """Returns progress of last archive ingest for article."""
+    return cache.get(progress_key(article), {'status': 'idle'})
+
+
+def _set_progress(article, **progress):
+    cache.set(progress_key(article), progress,
+              settings.ARCHIVE_UPLOAD['PROGRESS_TIMEOUT'])
+
+
+def _archive_entries(archive):
+    """Returns file entries of archive skipping directories and metadata."""
+    return [info for info in archive.infolist()
+            if not info.is_dir()
+            and not os.path.basename(info.filename).startswith(
+                IGNORED_PREFIXES)
+            and not info.filename.startswith(IGNORED_PREFIXES)]
+
+
+def _read_entry(archive, info, max_size):
+    """Reads single entry, refusing entries larger than max_size."""
+    if info.file_size > max_size:
+        return None
+    with archive.open(info) as entry:
+        data = entry.read(max_size + 1)
+    return data if len(data) <= max_size else None
+
+
+def _process_entry(article, name, data):
+    """Validates and resizes single photo, storing its file.
+
+    Runs in worker thread so it must not touch the database.
+    """
+    photo = SimpleUploadedFile(os.path.basename(name), data)
+    serializer = ArchivePhotoSerializer(data={'photo': photo})
+    if not serializer.is_valid():
+        return None, serializer.errors
+
+    image = Image(article=article, **serializer.validated_data)
+    image.prepare_photo()
+    if not image.photo._committed:
+        image.photo.save(image.photo.name, image.photo.file, save=False)
+    return image, None
+
+
+def _delete_files(images):
+    """Deletes stored photos of images whose rows were not created."""
+    for image in images:
+        try:
+            image.photo.delete(save=False)
+        except OSError:
+            logger.warning('Could not delete orphaned file %s',
+                           image.photo.name)
+
+
+def _orphaned_images(pending_images, futures):
+    """Returns images with stored photos but no rows after failed ingest."""
+    images = [image for image, _ in pending_images]
+    for future in futures:
+        if not future.cancelled() and future.exception() is None:
+            image, _ = future.result()
+            if image is not None:
+                images.append(image)
+    return images
+
+
+def ingest_archive(article, archive_file):
+    """Creates Image rows for every valid photo in ZIP archive.
+
+    Entries are read one by one and handed to bounded worker pool, so only
+    a few decoded photos are kept in memory at once. Rows are created in
+    batches. Entry failing to decode or resize is reported as failed
+    without affecting others. When ingest itself fails, files stored for
+    rows not created are deleted. Returns summary with result for every
+    entry.
+    """
+    options = settings.ARCHIVE_UPLOAD
+    workers = options['WORKERS']
+    results = []
+    pending_images = []
+    futures_results = {}
+    processed = 0
+
+    def flush():
+        Image.objects.bulk_create([image for image, _ in pending_images])
+        for image, result in pending_images:
+            result.update(status='created', id=image.id)
+        pending_images.clear()
+
+    def collect(futures):
+        nonlocal processed
+        for future in futures:
+            result = futures_results.pop(future)
+            processed += 1
+            try:
+                image, errors = future.result()
+            except Exception as error:
+                logger.warning('Archive entry %s of article %s failed: %s',
+                               result['name'], article.pk, error)
+                result.update(status='failed', errors={'photo': [str(error)]})
+                continue
+            if errors:
+                result.update(status='invalid', errors=errors)
+            else:
+                pending_images.append((image, result))
+        if len(pending_images) >= options['BATCH_SIZE']:
+            flush()
+        _set_progress(article, status='running', processed=processed,
+                      total=len(entries))
+
+    with zipfile.ZipFile(archive_file) as archive:
+        entries = _archive_entries(archive)
+        if len(entries) > options['MAX_ENTRIES']:
+            raise ValueError(
+                f'Archive contains {len(entries)} files, '
+                f'limit is {options["MAX_ENTRIES"]}.')
+        _set_progress(article, status='running', processed=0,
+                      total=len(entries))
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for info in entries:
+                    result = {'name': info.filename}
+                    results.append(result)
+                    data = _read_entry(
+                        archive, info, options['MAX_ENTRY_SIZE'])
+                    if data is None:
+                        result.update(
+                            status='invalid',
+                            errors={'photo': ['File is too large.']})
+                        processed += 1
+                        continue
+
+                    if len(futures_results) >= workers * 2:
+                        done, _ = wait(futures_results,
+                                       return_when=FIRST_COMPLETED)
+                        collect(done)
+                    future = executor.submit(
+                        _process_entry, article, info.filename, data)
+                    futures_results[future] = result
+
+                collect(wait(futures_results).done)
+            flush()
+        except BaseException:
+            _delete_files(_orphaned_images(pending_images, futures_results))
+            _set_progress(article, status='failed', processed=processed,
+                          total=len(entries))
+            raise
+    created = sum(1 for result in results if result['status'] == 'created')
+    summary = {
+        'total': len(results),
+        'created': created,
+        'failed': len(results) - created,
+        'results': results,
+    }
+    _set_progress(article, status='done', processed=processed,
+                  total=len(results))
+    logger.info('Archive ingest for article %s: %s of %s photos created.',
+                article.pk, created, len(results))
+    return summary
@@ -0,0 +1,94 @@
+"""
+Async read-only views for article API, served under ASGI.
+
+Rows are fetched with Django's async ORM and related tags are prefetched,
+so existing serializers render them without touching the database inside
+the event loop. Output matches the synchronous DRF endpoints.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
+
+from article import serializers
+from article.views import filter_articles
+from core.custom_renderers import ORJSONRenderer
+from core.custom_throttling import AddressReadRateThrottle
+from core.models import Article, Image, Tag
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+async def _check_request(request):
+    """Returns error response for disallowed method or throttled client.
+
+    Throttle may read and update network cache, so it runs in a thread
+    instead of blocking the event loop.
+    """
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    throttle = AddressReadRateThrottle()
+    if not await sync_to_async(throttle.allow_request)(request, None):
+        response = _render({'detail': 'Request was throttled.'}, status=429)
+        response['Retry-After'] = str(int(throttle.wait()) + 1)
+        return response
+    return None
+
+
+def _render(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), status=status,
+                        content_type='application/json')
+
+
+async def article_list(request):
+    """Lists articles, accepting the same filters as article list."""
+    error = await _check_request(request)
+    if error:
+        return error
+    queryset = filter_articles(
+        Article.objects.prefetch_related('tags'), request.GET)
+    articles = [article async for article in queryset]
+    serializer = serializers.ArticleSerializer(
+        articles, many=True, context={'request': request})
+    return _render(serializer.data)
+
+
+async def article_detail(request, slug):
+    """Returns details of article."""
+    error = await _check_request(request)
+    if error:
+        return error
+    try:
+        article = await Article.objects.prefetch_related('tags').aget(
+            slug=slug)
+    except Article.DoesNotExist:
+        raise Http404('No Article matches the given query.')
+    serializer = serializers.ArticleDetailSerializer(
+        article, context={'request': request})
+    return _render(serializer.data)
+
+
+async def tag_list(request):
+    """Lists tags."""
+    error = await _check_request(request)
+    if error:
+        return error
+    tags = [tag async for tag in Tag.objects.order_by('-id')]
+    return _render(serializers.TagSerializer(tags, many=True).data)
+
+
+async def image_list(request):
+    """Lists images, optionally only of article given as article-id."""
+    error = await _check_request(request)
+    if error:
+        return error
+    queryset = Image.objects.order_by('-id')
+    article_id = request.GET.get('article-id')
+    if article_id:
+        queryset = queryset.filter(article__id__exact=article_id)
+    images = [image async for image in queryset]
+    serializer = serializers.ImageSerializer(
+        images, many=True, context={'request': request})
+    return _render(serializer.data)
+
+
+for view in (article_list, article_detail, tag_list, image_list):
+    view.use_read_replica = True
@@ -0,0 +1,65 @@
+"""
+Facet counts of articles per category and tag.
+
+Counts are computed with one aggregate query per facet and cached under
+a version key, bumped whenever articles or their tags change.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.custom_metrics import count_cache_lookup
+from core.models import Article, Tag
+
+VERSION_KEY = 'article-facets-version'
+
+
+def facets_version():
+    """Returns current version of cached facets."""
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_facets(sender, **kwargs):
+    """Signal handler invalidating cached facets after article changes."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def facets_key(params, top):
+    """Returns cache key of facets for filter parameters."""
+    digest = hashlib.sha1(
+        repr((sorted(params.items()), top)).encode()).hexdigest()
+    return f'article-facets-{facets_version()}-{digest}'
+
+
+def category_counts(articles):
+    """Returns number of articles for every category choice."""
+    counts = dict(articles.order_by().values('category').annotate(
+        count=Count('id', distinct=True)).values_list('category', 'count'))
+    return [{'key': key, 'label': label, 'count': counts.get(key, 0)}
+            for key, label in Article.CATEGORY_CHOICES]
+
+
+def tag_counts(articles, top):
+    """Returns top tags with numbers of articles."""
+    tags = Tag.objects.filter(
+        article__in=articles.order_by().values('id')).annotate(
+            count=Count('article', distinct=True)).order_by(
+                '-count', 'name').values('id', 'name', 'slug', 'count')
+    return list(tags[:top])
+
+
+def get_facets(articles, params, top):
+    """Returns cached facets of articles filtered with params."""
+    key = facets_key(params, top)
+    facets = cache.get(key)
+    count_cache_lookup('facets', facets is not None)
+    if facets is None:
+        facets = {'categories': category_counts(articles),
+                  'tags': tag_counts(articles, top)}
+        cache.set(key, facets, settings.ARTICLE_FACETS['TIMEOUT'])
+    return facets
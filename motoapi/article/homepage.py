@@ -0,0 +1,68 @@
+"""
+Homepage document with latest articles of every category.
+
+Articles are selected with one ROW_NUMBER() window query partitioned by
+category, their tags with one shared prefetch. The document is cached
+under a version key, bumped whenever an article or tag changes, so a
+document built from data read before a change is never served after it.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from article.serializers import ArticleSerializer
+from core.custom_metrics import count_cache_lookup
+from core.models import Article
+
+VERSION_KEY = 'article-homepage-version'
+
+
+def homepage_key():
+    """Returns cache key of homepage document for current version."""
+    return f'article-homepage-{cache.get_or_set(VERSION_KEY, 1, None)}'
+
+
+def latest_per_category(count):
+    """Returns queryset of latest count articles of every category."""
+    return Article.objects.annotate(
+        row_number=Window(RowNumber(), partition_by=F('category'),
+                          order_by=F('id').desc())).filter(
+                              row_number__lte=count).order_by('-id')
+
+
+def build_homepage():
+    """Returns homepage document, thumbnail URLs are relative to host."""
+    articles = list(latest_per_category(
+        settings.ARTICLE_HOMEPAGE['PER_CATEGORY']).prefetch_related('tags'))
+    grouped = {key: [] for key, label in Article.CATEGORY_CHOICES}
+    for article, data in zip(articles,
+                             ArticleSerializer(articles, many=True).data):
+        grouped.setdefault(article.category, []).append(data)
+    return {'categories': [
+        {'key': key, 'label': label, 'articles': grouped[key]}
+        for key, label in Article.CATEGORY_CHOICES]}
+
+
+def invalidate_homepage(sender, **kwargs):
+    """Signal handler invalidating cached homepage after article changes."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def get_homepage(request):
+    """Returns cached homepage document with absolute thumbnail URLs."""
+    key = homepage_key()
+    homepage = cache.get(key)
+    count_cache_lookup('homepage', homepage is not None)
+    if homepage is None:
+        homepage = build_homepage()
+        cache.set(key, homepage, settings.ARTICLE_HOMEPAGE['TIMEOUT'])
+    return {'categories': [
+        {**category, 'articles': [
+            {**article, 'thumbnail': request.build_absolute_uri(
+                article['thumbnail'])} if article['thumbnail'] else article
+            for article in category['articles']]}
+        for category in homepage['categories']]}
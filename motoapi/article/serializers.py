@@ -1,21 +1,41 @@
 """
 Serializers for article API.
 """
+import zipfile
+from operator import itemgetter
+
+from django.contrib.auth import get_user_model
+from django.utils.text import slugify
 from rest_framework import serializers
 
+from core.custom_mixins import (
+    SparseFieldsetSerializerMixin, TimedListSerializer, TimedSerializerMixin)
+from core.custom_timing import timed
 from core.models import Article, Tag, Image
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, SparseFieldsetSerializerMixin,
+                    serializers.ModelSerializer):
     """Serializer for Tag object."""
 
     class Meta:
         model = Tag
         fields = ['id', 'name']
         read_only_fields = ['id']
+        list_serializer_class = TimedListSerializer
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """Serializer for public summary of article author."""
+
+    class Meta:
+        model = get_user_model()
+        fields = ['id', 'name', 'surname']
+        read_only_fields = fields
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(TimedSerializerMixin, SparseFieldsetSerializerMixin,
+                        serializers.ModelSerializer):
     """Serializer for Article objects."""
     tags = TagSerializer(many=True, required=False, read_only=False)
 
@@ -23,12 +43,32 @@ class ArticleSerializer(serializers.ModelSerializer):
         model = Article
         fields = ['id', 'header', 'user', 'slug', 'tags', 'thumbnail']
         read_only_fields = ['id']
+        list_serializer_class = TimedListSerializer
+
+    def to_representation(self, instance):
+        """Adds related objects requested in expand context."""
+        ret = super().to_representation(instance)
+        expand = self.context.get('expand', ())
+        if 'user' in expand and 'user' in ret:
+            ret['user'] = (AuthorSerializer(instance.user).data
+                           if instance.user else None)
+        if 'images' in expand:
+            images = getattr(instance, 'expanded_images', None)
+            if images is None:
+                images = instance.image_set.order_by('-id')
+            ret['images'] = ImageSerializer(
+                images, many=True, context=self.context).data
+        return ret
 
     def _get_or_create_tags(self, tags, article):
-        """Creates or gets already created tags."""
-        for tag in tags:
-            tag_obj, create = Tag.objects.get_or_create(**tag)
-            article.tags.add(tag_obj)
+        """Creates or gets already created tags, with the same number of
+        queries for any number of tags."""
+        names = list(dict.fromkeys(tag['name'] for tag in tags))
+        found = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+        found.update((tag.name, tag) for tag in Tag.objects.bulk_create(
+            [Tag(name=name, slug=slugify(name))
+             for name in names if name not in found]))
+        article.tags.add(*(found[name] for name in names))
 
     def create(self, validated_data):
         """Creating a recipe."""
@@ -54,6 +94,82 @@ class ArticleSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ArticleListSerializer:
+    """
+    Read-only serializer building the same output as ArticleSerializer.
+
+    Articles are fetched with one values query and their tags with one
+    grouped query, so no model instances or serializer fields are created
+    per row.
+    """
+    columns = {'id': 'id', 'header': 'header', 'user': 'user_id',
+               'slug': 'slug', 'thumbnail': 'thumbnail'}
+
+    def __init__(self, queryset, context=None, fields=None):
+        self.queryset = queryset
+        self.context = context or {}
+        self.fields = [name for name in ArticleSerializer.Meta.fields
+                       if fields is None or name in fields]
+
+    def get_tags(self, article_ids):
+        """Returns serialized tags grouped by article id."""
+        tags = {}
+        rows = Article.tags.through.objects.filter(
+            article_id__in=article_ids).order_by(
+                'article_id', 'tag_id').values_list(
+                    'article_id', 'tag_id', 'tag__name')
+        for article_id, tag_id, name in rows:
+            tags.setdefault(article_id, []).append(
+                {'id': tag_id, 'name': name})
+        return tags
+
+    def get_thumbnail_url(self):
+        """Returns function converting stored file name to thumbnail URL."""
+        storage = Article._meta.get_field('thumbnail').storage
+        request = self.context.get('request')
+
+        def thumbnail_url(name):
+            if not name:
+                return None
+            if request is None:
+                return storage.url(name)
+            return request.build_absolute_uri(storage.url(name))
+
+        return thumbnail_url
+
+    def get_accessors(self, columns, tags):
+        """Returns pairs of field name and function reading it from row."""
+        thumbnail_url = self.get_thumbnail_url()
+        accessors = []
+        for name in self.fields:
+            if name == 'tags':
+                accessors.append((name, lambda row: tags.get(row[0], [])))
+            elif name == 'thumbnail':
+                getter = itemgetter(columns.index(self.columns[name]))
+                accessors.append((name, lambda row, getter=getter:
+                                  thumbnail_url(getter(row))))
+            else:
+                accessors.append(
+                    (name, itemgetter(columns.index(self.columns[name]))))
+        return accessors
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return self.build_data()
+
+    def build_data(self):
+        """Returns list of serialized articles."""
+        columns = ['id'] + [self.columns[name] for name in self.fields
+                            if name in self.columns and name != 'id']
+        rows = list(self.queryset.prefetch_related(None).values_list(*columns))
+        tags = {}
+        if 'tags' in self.fields:
+            tags = self.get_tags([row[0] for row in rows])
+        accessors = self.get_accessors(columns, tags)
+        return [{name: get(row) for name, get in accessors} for row in rows]
+
+
 class ArticleDetailSerializer(ArticleSerializer):
     """Serializer for Article details."""
 
@@ -72,11 +188,34 @@ class ArticleThumbnailSerializer(serializers.ModelSerializer):
         extra_kwargs = {'thumbnail': {'required': 'True'}}
 
 
-class ImageSerializer(serializers.ModelSerializer):
+class ImageSerializer(TimedSerializerMixin, SparseFieldsetSerializerMixin,
+                      serializers.ModelSerializer):
     """Serializer for Image."""
 
     class Meta:
         model = Image
         fields = ['id', 'article', 'photo']
         read_only_fields = ['id',]
+        list_serializer_class = TimedListSerializer
+        extra_kwargs = {'photo': {'required': 'True'}}
+
+
+class ArchivePhotoSerializer(serializers.ModelSerializer):
+    """Serializer validating single photo extracted from archive."""
+
+    class Meta:
+        model = Image
+        fields = ['photo']
         extra_kwargs = {'photo': {'required': 'True'}}
+
+
+class ArchiveUploadSerializer(serializers.Serializer):
+    """Serializer for ZIP archive with article photos."""
+    archive = serializers.FileField()
+
+    def validate_archive(self, value):
+        """Checks if uploaded file is ZIP archive."""
+        if not zipfile.is_zipfile(value):
+            raise serializers.ValidationError('Upload a valid ZIP archive.')
+        value.seek(0)
+        return value
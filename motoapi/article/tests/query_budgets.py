@@ -0,0 +1,19 @@
+"""
+Query budgets of article API endpoints, used with core.custom_testing.
+"""
+QUERY_BUDGETS = {
+    'GET article:article-list': 2,
+    'POST article:article-list': 6,
+    'GET article:article-detail': 2,
+    'PATCH article:article-detail': 9,
+    'PUT article:article-detail': 9,
+    'DELETE article:article-detail': 2,
+    'POST article:article-upload-thumbnail': 3,
+    'POST article:article-upload-photos': 4,
+    'GET article:tag-list': 1,
+    'POST article:tag-list': 1,
+    'PATCH article:tag-detail': 2,
+    'DELETE article:tag-detail': 3,
+    'GET article:image-list': 1,
+    'POST article:image-list': 0,
+}
@@ -0,0 +1,196 @@
+"""
+Tests for uploading photos as ZIP archive.
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image as Im
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from article.archive import get_progress, ingest_archive
+from core.models import Article, Image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def archive_upload_url(article_slug):
+    """Creates and returns archive upload URL."""
+    return reverse('article:article-upload-archive', args=[article_slug])
+
+
+def create_article(user, **params):
+    """Creates and returns sample article."""
+    default_payload = {
+        'header': 'Test header',
+        'lead': 'Test lead',
+        'main_text': 'Test main text',
+    }
+    default_payload.update(params)
+    return Article.objects.create(user=user, **default_payload)
+
+
+def create_archive(entries):
+    """Creates ZIP archive upload with given name to content mapping."""
+    output = BytesIO()
+    with zipfile.ZipFile(output, 'w') as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    return SimpleUploadedFile('gallery.zip', output.getvalue(),
+                              content_type='application/zip')
+
+
+def image_bytes(size=(10, 10)):
+    """Returns sample JPEG image content."""
+    output = BytesIO()
+    Im.new('RGB', size).save(output, format='JPEG')
+    return output.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ArchiveUploadTests(TestCase):
+    """Tests for upload-archive action."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.client.force_authenticate(self.user)
+        self.article = create_article(user=self.user)
+
+    def test_upload_archive_creates_images(self):
+        """Tests if valid photos are created and invalid are reported."""
+        archive = create_archive({
+            'race/1.jpg': image_bytes(),
+            'race/2.jpg': image_bytes((1600, 900)),
+            'race/notes.txt': b'not an image',
+            '__MACOSX/race/._1.jpg': b'metadata',
+        })
+
+        res = self.client.post(archive_upload_url(self.article.slug),
+                               {'archive': archive}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total'], 3)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['failed'], 1)
+        self.assertEqual([result['name'] for result in res.data['results']],
+                         ['race/1.jpg', 'race/2.jpg', 'race/notes.txt'])
+        self.assertEqual(res.data['results'][2]['status'], 'invalid')
+        images = Image.objects.filter(article=self.article)
+        self.assertEqual(images.count(), 2)
+        resized = images.get(id=res.data['results'][1]['id'])
+        self.assertLessEqual(resized.photo.width, 1200)
+
+    def test_upload_archive_progress(self):
+        """Tests if progress of finished upload is reported."""
+        archive = create_archive({'1.jpg': image_bytes()})
+        self.client.post(archive_upload_url(self.article.slug),
+                         {'archive': archive}, format='multipart')
+
+        res = self.client.get(archive_upload_url(self.article.slug))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], 'done')
+        self.assertEqual(res.data['processed'], 1)
+
+    def test_upload_archive_progress_owner_only(self):
+        """Tests if progress is hidden from other users."""
+        other = get_user_model().objects.create_user(
+            'other@example.com', 'pass123')
+        self.client.force_authenticate(other)
+
+        res = self.client.get(archive_upload_url(self.article.slug))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(None)
+        res = self.client.get(archive_upload_url(self.article.slug))
+        self.assertIn(res.status_code, (status.HTTP_401_UNAUTHORIZED,
+                                        status.HTTP_403_FORBIDDEN))
+
+    def test_upload_archive_entry_error(self):
+        """Tests if entry failing in processing does not stop others."""
+        archive = create_archive({'1.jpg': image_bytes(),
+                                  '2.jpg': image_bytes()})
+        prepare_photo = Image.prepare_photo
+
+        def fail_second(image):
+            if image.photo.name.startswith('2'):
+                raise OSError('broken data stream')
+            return prepare_photo(image)
+
+        with mock.patch.object(Image, 'prepare_photo', fail_second), \
+                self.assertLogs('article.archive', 'WARNING'):
+            res = self.client.post(archive_upload_url(self.article.slug),
+                                   {'archive': archive}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['results'][1]['status'], 'failed')
+        self.assertEqual(res.data['results'][1]['errors'],
+                         {'photo': ['broken data stream']})
+        self.assertEqual(Image.objects.count(), 1)
+
+    def test_failed_ingest_deletes_files(self):
+        """Tests if photos stored for rows not created are deleted."""
+        archive = create_archive({'1.jpg': image_bytes(),
+                                  '2.jpg': image_bytes()})
+
+        with mock.patch.object(Image.objects, 'bulk_create',
+                               side_effect=DatabaseError('disk full')), \
+                self.assertRaises(DatabaseError):
+            ingest_archive(self.article, archive)
+
+        stored = [name for _, _, names in os.walk(MEDIA_ROOT)
+                  for name in names]
+        self.assertEqual(stored, [])
+        self.assertEqual(get_progress(self.article)['status'], 'failed')
+
+    def test_upload_archive_not_zip(self):
+        """Tests uploading file which is not ZIP archive."""
+        upload = SimpleUploadedFile('gallery.zip', b'not a zip')
+
+        res = self.client.post(archive_upload_url(self.article.slug),
+                               {'archive': upload}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(ARCHIVE_UPLOAD={**settings.ARCHIVE_UPLOAD,
+                                       'MAX_ENTRIES': 1})
+    def test_upload_archive_too_many_entries(self):
+        """Tests rejecting archive exceeding entries limit."""
+        archive = create_archive({'1.jpg': image_bytes(),
+                                  '2.jpg': image_bytes()})
+
+        res = self.client.post(archive_upload_url(self.article.slug),
+                               {'archive': archive}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Image.objects.exists())
+
+    def test_upload_archive_another_user_article(self):
+        """Tests if uploading to another user article is forbidden."""
+        other = get_user_model().objects.create_user(
+            'other@example.com', 'pass123')
+        article = create_article(user=other, header='Other header')
+        archive = create_archive({'1.jpg': image_bytes()})
+
+        res = self.client.post(archive_upload_url(article.slug),
+                               {'archive': archive}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
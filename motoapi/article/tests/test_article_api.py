@@ -14,6 +14,9 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from article.serializers import ArticleSerializer, ArticleDetailSerializer
 
+from article.tests.query_budgets import QUERY_BUDGETS
+from core.custom_testing import query_budget
+
 ARTICLE_URL = reverse('article:article-list')
 
 
@@ -50,6 +53,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
+@query_budget(QUERY_BUDGETS)
 class PublicArticleApiTests(TestCase):
     """Tests for unauthenticated API requests."""
 
@@ -191,6 +195,7 @@ class PublicArticleApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@query_budget(QUERY_BUDGETS)
 class PrivateArticleApiTests(TestCase):
     """Tests for authenticated requests."""
 
@@ -394,6 +399,7 @@ class PrivateArticleApiTests(TestCase):
         self.assertEqual(article.tags.count(), 0)
 
 
+@query_budget(QUERY_BUDGETS)
 class ThumbnailUploadTests(TestCase):
     """Tests for uploading thumbnail to article."""
 
@@ -0,0 +1,112 @@
+"""
+Tests for async read endpoints.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from core.custom_routers import replica_pool
+from core.models import Article, Image, Tag
+
+ARTICLE_URL = reverse('article:article-list')
+ASYNC_ARTICLE_URL = reverse('article:async-article-list')
+TAGS_URL = reverse('article:tag-list')
+ASYNC_TAGS_URL = reverse('article:async-tag-list')
+IMAGES_URL = reverse('article:image-list')
+ASYNC_IMAGES_URL = reverse('article:async-image-list')
+
+
+def article_detail(slug, prefix='article'):
+    """Creates and returns url to article details."""
+    return reverse(f'article:{prefix}-detail', args=[slug])
+
+
+class AsyncArticleApiTests(TestCase):
+    """Tests if async endpoints return the same data as sync ones."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        tag = Tag.objects.create(name='Test tag')
+        for index, category in enumerate(['newsy', 'testy', 'testy']):
+            article = Article.objects.create(
+                user=user, header=f'Test header {index}', lead='Test lead',
+                main_text='Test main text', category=category)
+            article.tags.add(tag)
+        Image.objects.bulk_create([Image(article=article, photo='a.jpg')])
+        self.article = article
+
+    async def test_article_list_matches_sync(self):
+        """Tests listing articles with filters."""
+        for params in [{}, {'category': 'testy'}, {'tag': 'test', 'limit': 1}]:
+            expected = (
+                await self.async_client.get(ARTICLE_URL, params)).json()
+
+            res = await self.async_client.get(ASYNC_ARTICLE_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.json(), expected)
+
+    async def test_article_detail_matches_sync(self):
+        """Tests retrieving article details."""
+        expected = await self.async_client.get(
+            article_detail(self.article.slug))
+
+        res = await self.async_client.get(
+            article_detail(self.article.slug, 'async-article'))
+
+        self.assertEqual(res.json(), expected.json())
+
+    async def test_article_detail_not_found(self):
+        """Tests if missing article gives 404."""
+        res = await self.async_client.get(
+            article_detail('missing', 'async-article'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_tags_and_images_match_sync(self):
+        """Tests listing tags and images."""
+        for sync_url, async_url, params in [
+                (TAGS_URL, ASYNC_TAGS_URL, {}),
+                (IMAGES_URL, ASYNC_IMAGES_URL,
+                 {'article-id': self.article.id})]:
+            expected = (await self.async_client.get(sync_url, params)).json()
+
+            res = await self.async_client.get(async_url, params)
+
+            self.assertEqual(res.json(), expected)
+
+    async def test_writes_not_allowed(self):
+        """Tests if async endpoints refuse writes."""
+        res = await self.async_client.post(ASYNC_ARTICLE_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @override_settings(REPLICA_ROUTING={**settings.REPLICA_ROUTING,
+                                        'REPLICAS': ['default']})
+    async def test_reads_routed_to_replica(self):
+        """Tests if async reads work when routed to replica."""
+        replica_pool.reset()
+        expected = (await self.async_client.get(ARTICLE_URL)).json()
+
+        res = await self.async_client.get(ASYNC_ARTICLE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), expected)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+            'anon_read': '1/min'}})
+    async def test_reads_throttled(self):
+        """Tests if async reads are limited per client address."""
+        first = await self.async_client.get(ASYNC_TAGS_URL)
+        second = await self.async_client.get(ASYNC_TAGS_URL)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', second)
@@ -0,0 +1,92 @@
+"""
+Tests for embedding related objects with expand parameter.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Image
+
+ARTICLE_URL = reverse('article:article-list')
+
+
+def article_detail(slug):
+    """Creates and returns url to article details."""
+    return reverse('article:article-detail', args=[slug])
+
+
+def create_article(user, index):
+    """Creates and returns article with three images."""
+    article = Article.objects.create(
+        user=user, header=f'Header {index}', lead='Test lead',
+        main_text='Test main text', slug=f'header-{index}')
+    Image.objects.bulk_create(
+        [Image(article=article, photo=f'{index}-{i}.jpg') for i in range(3)])
+    return article
+
+
+class ExpandApiTests(TestCase):
+    """Tests for expand parameter of article API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123', name='Jan', surname='Kowalski')
+        self.article = create_article(self.user, 0)
+
+    def test_expand_detail(self):
+        """Tests if detail embeds images and user."""
+        res = self.client.get(article_detail(self.article.slug),
+                              {'expand': 'images,user'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(data['user'], {
+            'id': self.user.id, 'name': 'Jan', 'surname': 'Kowalski'})
+        image_ids = self.article.image_set.order_by('-id').values_list(
+            'id', flat=True)
+        self.assertEqual([image['id'] for image in data['images']],
+                         list(image_ids))
+        self.assertTrue(
+            data['images'][0]['photo'].startswith('http://testserver/'))
+
+    def test_expand_matches_images_endpoint(self):
+        """Tests if embedded images equal images endpoint output."""
+        images = self.client.get(reverse('article:image-list'),
+                                 {'article-id': self.article.id})
+
+        res = self.client.get(article_detail(self.article.slug),
+                              {'expand': 'images'})
+
+        self.assertEqual(res.json()['images'], images.json())
+        self.assertEqual(res.json()['user'], self.user.id)
+
+    def test_expand_list_queries(self):
+        """Tests if number of queries does not depend on article count."""
+        for index in range(1, 5):
+            create_article(self.user if index % 2 else None, index)
+
+        with self.assertNumQueries(3):
+            res = self.client.get(ARTICLE_URL, {'expand': 'images,user'})
+
+        self.assertEqual(len(res.json()), 5)
+        self.assertIsNone(res.json()[0]['user'])
+
+    @override_settings(ARTICLE_EXPAND={'MAX_DEPTH': 1, 'MAX_IMAGES': 2})
+    def test_images_limit(self):
+        """Tests if embedded images are limited per article."""
+        create_article(self.user, 1)
+
+        res = self.client.get(ARTICLE_URL, {'expand': 'images'})
+
+        self.assertEqual([len(article['images']) for article in res.json()],
+                         [2, 2])
+
+    def test_invalid_expand(self):
+        """Tests if too deep or unknown expansion gives 400."""
+        for expand in ['images.article', 'tags']:
+            res = self.client.get(ARTICLE_URL, {'expand': expand})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,84 @@
+"""
+Tests for article facet counts.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Tag
+
+FACETS_URL = reverse('article:article-facets')
+
+
+def create_article(user, header, category, tags=()):
+    """Creates and returns article with tags."""
+    article = Article.objects.create(
+        user=user, header=header, lead='Test lead', main_text='Test main text',
+        category=category)
+    article.tags.add(*tags)
+    return article
+
+
+class FacetsApiTests(TestCase):
+    """Tests for facets endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.honda = Tag.objects.create(name='Honda')
+        self.yamaha = Tag.objects.create(name='Yamaha')
+        create_article(self.user, 'Honda CB', 'testy', [self.honda])
+        create_article(self.user, 'Honda and Yamaha', 'testy',
+                       [self.honda, self.yamaha])
+        create_article(self.user, 'Yamaha news', 'newsy', [self.yamaha])
+
+    def counts(self, res):
+        """Returns category counts and tag counts of facets response."""
+        data = res.json()
+        return ({item['key']: item['count'] for item in data['categories']},
+                [(item['name'], item['count']) for item in data['tags']])
+
+    def test_facets(self):
+        """Tests if articles are counted by category and tag."""
+        res = self.client.get(FACETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.counts(res), (
+            {'newsy': 1, 'felietony': 0, 'relacje': 0, 'testy': 2},
+            [('Honda', 2), ('Yamaha', 2)]))
+
+    def test_narrowed_facets(self):
+        """Tests if query and tag narrow counts, top limits tags."""
+        by_query = self.client.get(FACETS_URL, {'query': 'honda', 'top': 1})
+        by_tag = self.client.get(FACETS_URL, {'tag': 'a'})
+
+        self.assertEqual(self.counts(by_query), (
+            {'newsy': 0, 'felietony': 0, 'relacje': 0, 'testy': 2},
+            [('Honda', 2)]))
+        self.assertEqual(self.counts(by_tag)[0]['testy'], 2)
+
+    def test_cached_and_invalidated(self):
+        """Tests if facets are cached until articles or tags change."""
+        self.client.get(FACETS_URL)
+        with self.assertNumQueries(0):
+            self.client.get(FACETS_URL)
+
+        article = create_article(self.user, 'Relacja', 'relacje')
+        categories = self.counts(self.client.get(FACETS_URL))[0]
+        self.assertEqual(categories['relacje'], 1)
+
+        article.tags.add(self.yamaha)
+        self.assertEqual(self.counts(self.client.get(FACETS_URL))[1][0],
+                         ('Yamaha', 3))
+
+    def test_invalid_top(self):
+        """Tests if top outside allowed range gives 400."""
+        for top in ['0', 'x', '1000']:
+            res = self.client.get(FACETS_URL, {'top': top})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
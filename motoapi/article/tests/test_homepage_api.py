@@ -0,0 +1,87 @@
+"""
+Tests for homepage endpoint.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from article.homepage import build_homepage
+from core.models import Article, Tag
+
+HOMEPAGE_URL = reverse('article:article-homepage')
+ARTICLE_URL = reverse('article:article-list')
+
+
+@override_settings(ARTICLE_HOMEPAGE={'PER_CATEGORY': 2, 'TIMEOUT': 60})
+class HomepageApiTests(TestCase):
+    """Tests for latest articles per category."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        tag = Tag.objects.create(name='Test tag')
+        for index, category in enumerate(
+                ['newsy', 'testy', 'newsy', 'testy', 'newsy', 'relacje']):
+            article = Article.objects.create(
+                user=self.user, header=f'Header {index}', lead='Test lead',
+                main_text='Test main text', category=category,
+                slug=f'header-{index}')
+            article.tags.add(tag)
+        Article.objects.filter(slug='header-5').update(
+            thumbnail='uploads/article/thumbnails/a.jpeg')
+
+    def test_homepage_matches_category_lists(self):
+        """Tests if categories equal category lists, built with two queries."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(HOMEPAGE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 2)
+        self.assertIn('ROW_NUMBER()', queries[0]['sql'])
+        for category in res.json()['categories']:
+            expected = self.client.get(
+                ARTICLE_URL, {'category': category['key'], 'limit': 2}).json()
+            self.assertEqual(category['articles'], expected)
+
+    def test_cached_and_rebuilt(self):
+        """Tests if homepage is cached until article changes."""
+        self.client.get(HOMEPAGE_URL)
+        with self.assertNumQueries(0):
+            self.client.get(HOMEPAGE_URL)
+
+        Article.objects.create(user=self.user, header='Felieton',
+                               lead='Test lead', main_text='Test main text',
+                               category='felietony', slug='felieton')
+        res = self.client.get(HOMEPAGE_URL)
+
+        felietony = res.json()['categories'][1]['articles']
+        self.assertEqual([article['slug'] for article in felietony],
+                         ['felieton'])
+
+    def test_document_built_before_change_not_served(self):
+        """Tests if document built while article changes is not served
+        after the change."""
+        def build_during_change():
+            homepage = build_homepage()
+            Article.objects.create(
+                user=self.user, header='Felieton', lead='Test lead',
+                main_text='Test main text', category='felietony')
+            return homepage
+
+        with mock.patch('article.homepage.build_homepage',
+                        side_effect=build_during_change):
+            self.client.get(HOMEPAGE_URL)
+        res = self.client.get(HOMEPAGE_URL)
+
+        felietony = res.json()['categories'][1]['articles']
+        self.assertEqual([article['slug'] for article in felietony],
+                         ['felieton'])
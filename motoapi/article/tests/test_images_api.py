@@ -13,6 +13,9 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from article.serializers import ArticleSerializer, ArticleDetailSerializer, ImageSerializer
 
+from article.tests.query_budgets import QUERY_BUDGETS
+from core.custom_testing import query_budget
+
 IMAGES_URL = reverse('article:image-list')
 
 
@@ -47,6 +50,7 @@ def article_detail(article_id):
     return reverse('article:article-detail', args=[article_id])
 
 
+@query_budget(QUERY_BUDGETS)
 class PublicImageApiTests(TestCase):
     """Tests for unauthenticated requests to Image endpoint."""
 
@@ -109,6 +113,7 @@ class PublicImageApiTests(TestCase):
         self.assertEqual(
             res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+@query_budget(QUERY_BUDGETS)
 class PrivateImageApiTests(TestCase):
     """Tests authorized requests to Image Api."""
 
@@ -0,0 +1,73 @@
+"""
+Tests for values based article list serializer.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from article.serializers import ArticleListSerializer, ArticleSerializer
+from article.views import filter_articles
+from core.models import Article, Tag
+
+ARTICLE_URL = reverse('article:article-list')
+
+
+class ArticleListSerializerTests(TestCase):
+    """Tests if fast serializer output equals ArticleSerializer output."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        tags = [Tag.objects.create(name=f'Tag {i}') for i in range(4)]
+        for index in range(6):
+            article = Article.objects.create(
+                user=user if index % 3 else None, header=f'Header {index}',
+                lead='Test lead', main_text='Test main text',
+                slug=f'header-{index}',
+                category='testy' if index % 2 else 'newsy')
+            article.tags.add(*reversed(tags[:index % 4]))
+        Article.objects.filter(slug='header-1').update(
+            thumbnail='uploads/article/thumbnails/ab/cd/zdjęcie 1.jpeg')
+        self.request = APIRequestFactory().get(ARTICLE_URL)
+
+    def assert_same_output(self, queryset, context=None):
+        expected = ArticleSerializer(
+            queryset, many=True, context=context or {}).data
+
+        data = ArticleListSerializer(queryset, context=context).data
+
+        self.assertEqual(data, expected)
+
+    def test_output_matches_serializer(self):
+        """Tests if output equals ArticleSerializer output."""
+        for params in [{}, {'category': 'testy'}, {'tag': 'tag-2'},
+                       {'limit': '2'}, {'query': 'missing'}]:
+            with self.subTest(params=params):
+                queryset = filter_articles(Article.objects.all(), params)
+                self.assert_same_output(queryset)
+                self.assert_same_output(queryset, {'request': self.request})
+
+    def test_absolute_thumbnail_url(self):
+        """Tests if thumbnail URL is absolute with request."""
+        data = ArticleListSerializer(
+            Article.objects.filter(slug='header-1'),
+            context={'request': self.request}).data
+
+        self.assertTrue(data[0]['thumbnail'].startswith('http://testserver/'))
+
+    def test_queries(self):
+        """Tests if tags are fetched with one grouped query."""
+        with self.assertNumQueries(2):
+            ArticleListSerializer(Article.objects.order_by('-id')).data
+
+    def test_list_endpoint(self):
+        """Tests if list endpoint output equals ArticleSerializer output."""
+        res = APIClient().get(ARTICLE_URL, {'category': 'testy'})
+
+        expected = ArticleSerializer(
+            filter_articles(Article.objects.all(), {'category': 'testy'}),
+            many=True, context={'request': res.wsgi_request}).data
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), expected)
@@ -0,0 +1,71 @@
+"""
+Tests for fetching many articles by slugs or ids.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Tag
+
+ARTICLE_URL = reverse('article:article-list')
+
+
+class MultiGetApiTests(TestCase):
+    """Tests for slugs and ids parameters of article list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        tag = Tag.objects.create(name='Test tag')
+        self.articles = []
+        for index in range(4):
+            article = Article.objects.create(
+                user=user, header=f'Header {index}', lead='Test lead',
+                main_text='Test main text', slug=f'header-{index}')
+            article.tags.add(tag)
+            self.articles.append(article)
+
+    def test_slugs_in_request_order(self):
+        """Tests if articles follow order of slugs, reporting missing ones."""
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                ARTICLE_URL, {'slugs': 'header-2,missing,header-0,header-2'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.json()['results']
+        self.assertEqual([article['slug'] for article in results],
+                         ['header-2', 'header-0'])
+        self.assertEqual(results[0]['tags'][0]['name'], 'Test tag')
+        self.assertEqual(res.json()['missing'], ['missing'])
+
+    def test_ids_with_fields(self):
+        """Tests if ids are combined with sparse fields."""
+        ids = [self.articles[3].id, 0, self.articles[1].id]
+
+        res = self.client.get(ARTICLE_URL, {'ids': ','.join(map(str, ids)),
+                                            'fields': 'header'})
+
+        self.assertEqual(res.json(), {
+            'results': [{'id': ids[0], 'header': 'Header 3'},
+                        {'id': ids[2], 'header': 'Header 1'}],
+            'missing': [0]})
+
+    def test_expand(self):
+        """Tests if slugs are combined with expanded relations."""
+        res = self.client.get(ARTICLE_URL, {'slugs': 'header-1',
+                                            'expand': 'user'})
+
+        self.assertEqual(res.json()['results'][0]['user']['id'],
+                         self.articles[1].user_id)
+
+    @override_settings(ARTICLE_MULTI_GET={'MAX_KEYS': 2})
+    def test_invalid_keys(self):
+        """Tests if too many, malformed or mixed keys give 400."""
+        for params in [{'slugs': 'a,b,c'}, {'ids': 'a'}, {'slugs': ''},
+                       {'slugs': 'a', 'ids': '1'}]:
+            res = self.client.get(ARTICLE_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
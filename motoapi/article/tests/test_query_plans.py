@@ -0,0 +1,102 @@
+"""
+Tests checking that article API queries use indexes.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Image, Tag
+
+ARTICLE_URL = reverse('article:article-list')
+IMAGES_URL = reverse('article:image-list')
+
+
+def create_article(user, **params):
+    """Creates and returns sample article."""
+    default_payload = {
+        'header': 'Test header',
+        'lead': 'Test lead',
+        'main_text': 'Test main text',
+    }
+    default_payload.update(params)
+    return Article.objects.create(user=user, **default_payload)
+
+
+def explain(sql):
+    """Returns SQLite query plan of statement as single string."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return ' | '.join(row[-1] for row in cursor.fetchall())
+
+
+class QueryPlanTests(TestCase):
+    """Tests for index usage of endpoint queries."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.tag = Tag.objects.create(name='Test tag')
+        for category, _ in Article.CATEGORY_CHOICES:
+            article = create_article(self.user, header=f'Header {category}',
+                                     category=category)
+            article.tags.add(self.tag)
+
+    def request_plans(self, url, params=None):
+        """Performs request and returns plans of its article queries."""
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [explain(query['sql']) for query in context.captured_queries
+                if query['sql'].startswith('SELECT')]
+
+    def test_category_filter_uses_index(self):
+        """Tests if category list is served from (category, -id) index."""
+        plans = self.request_plans(ARTICLE_URL, {'category': 'Relacje'})
+
+        self.assertIn('article_category_id_idx', plans[0])
+        self.assertNotIn('TEMP B-TREE', plans[0])
+
+    def test_user_articles_use_index(self):
+        """Tests if articles of user are read from (user, -id) index."""
+        queryset = Article.objects.filter(user=self.user).order_by('-id')
+
+        plan = explain(str(queryset.query))
+
+        self.assertIn('article_user_id_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_tag_filter_uses_through_table_index(self):
+        """Tests if tag filter joins articles through (tag, article) index."""
+        plans = self.request_plans(ARTICLE_URL, {'tag': self.tag.slug})
+
+        self.assertIn('article_tags_tag_article_idx', plans[0])
+
+    def test_images_of_article_use_index(self):
+        """Tests if images of article are read from (article, -id) index."""
+        article = Article.objects.first()
+        Image.objects.bulk_create([Image(article=article, photo='a.jpg')])
+
+        plans = self.request_plans(IMAGES_URL, {'article-id': article.id})
+
+        self.assertIn('image_article_id_idx', plans[0])
+        self.assertNotIn('TEMP B-TREE', plans[0])
+
+    def test_category_filter_is_canonicalized(self):
+        """Tests if category given in any case or as label matches."""
+        for category in ['testy', 'TESTY', 'Testy ']:
+            res = self.client.get(ARTICLE_URL, {'category': category})
+
+            self.assertEqual([article['slug'] for article in res.data],
+                             ['header-testy'])
+
+    def test_unknown_category_returns_nothing(self):
+        """Tests filtering by category outside of choices."""
+        res = self.client.get(ARTICLE_URL, {'category': 'unknown'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
@@ -0,0 +1,88 @@
+"""
+Tests for fields and exclude query parameters.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Image, Tag
+
+ARTICLE_URL = reverse('article:article-list')
+TAGS_URL = reverse('article:tag-list')
+IMAGES_URL = reverse('article:image-list')
+
+
+def article_detail(slug):
+    """Creates and returns url to article details."""
+    return reverse('article:article-detail', args=[slug])
+
+
+class SparseFieldsetTests(TestCase):
+    """Tests for trimming output and loaded columns."""
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.article = Article.objects.create(
+            user=user, header='Test header', lead='Test lead',
+            main_text='Test main text', slug='test-header')
+        self.article.tags.add(Tag.objects.create(name='Test tag'))
+        Image.objects.bulk_create([Image(article=self.article, photo='a.jpg')])
+
+    def test_list_fields(self):
+        """Tests if list returns only requested fields."""
+        res = self.client.get(ARTICLE_URL, {'fields': 'slug,id,header'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), [
+            {'id': self.article.id, 'header': 'Test header',
+             'slug': 'test-header'}])
+
+    def test_list_without_tags_skips_tag_query(self):
+        """Tests if excluding tags skips prefetch query."""
+        with self.assertNumQueries(1):
+            res = self.client.get(ARTICLE_URL, {'exclude': 'tags,thumbnail'})
+
+        self.assertEqual(list(res.json()[0]),
+                         ['id', 'header', 'user', 'slug'])
+
+    def test_detail_fields_limit_columns(self):
+        """Tests if main_text is neither rendered nor selected."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(article_detail(self.article.slug),
+                                  {'fields': 'id,header,slug,thumbnail'})
+
+        self.assertEqual(res.json(), {
+            'id': self.article.id, 'header': 'Test header',
+            'slug': 'test-header', 'thumbnail': None})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('main_text', queries[0]['sql'])
+
+    def test_detail_exclude(self):
+        """Tests if excluded fields are dropped from detail."""
+        res = self.client.get(article_detail(self.article.slug),
+                              {'exclude': 'main_text,lead'})
+
+        self.assertNotIn('main_text', res.json())
+        self.assertEqual(res.json()['tags'][0]['name'], 'Test tag')
+
+    def test_unknown_field(self):
+        """Tests if unknown field gives 400."""
+        res = self.client.get(ARTICLE_URL, {'fields': 'id,password'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', res.json()['fields'][0])
+
+    def test_tags_and_images(self):
+        """Tests if tags and images endpoints accept fields and exclude."""
+        tags = self.client.get(TAGS_URL, {'fields': 'name'})
+        images = self.client.get(IMAGES_URL, {'exclude': 'photo'})
+
+        self.assertEqual(tags.json(), [{'name': 'Test tag'}])
+        self.assertEqual(images.json(), [
+            {'id': Image.objects.get().id, 'article': self.article.id}])
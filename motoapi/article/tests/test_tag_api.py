@@ -7,6 +7,9 @@ from article.serializers import TagSerializer
 
 from django.urls import reverse
 from django.test import TestCase
+
+from article.tests.query_budgets import QUERY_BUDGETS
+from core.custom_testing import query_budget
 from django.contrib.auth import get_user_model
 
 from rest_framework import status
@@ -25,6 +28,7 @@ def create_user(email='user@example.com', password='pass123'):
     return get_user_model().objects.create(email=email, password=password)
 
 
+@query_budget(QUERY_BUDGETS)
 class PublicTagsApiTests(TestCase):
     """Tests for unauthenticated requests."""
 
@@ -87,6 +91,7 @@ class PublicTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@query_budget(QUERY_BUDGETS)
 class PrivateTagsApiTests(TestCase):
     """Tests for authenticated requests."""
 
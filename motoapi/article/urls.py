@@ -4,7 +4,7 @@ URL mappings for article app.
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
 
-from article import views
+from article import views, async_views
 
 router = DefaultRouter()
 router.register('articles', views.ArticleViewSet)
@@ -14,5 +14,11 @@ router.register('images', views.ImagesViewSet)
 app_name = 'article'
 
 urlpatterns = [
+    path('async/articles/', async_views.article_list,
+         name='async-article-list'),
+    path('async/articles/<slug:slug>/', async_views.article_detail,
+         name='async-article-detail'),
+    path('async/tags/', async_views.tag_list, name='async-tag-list'),
+    path('async/images/', async_views.image_list, name='async-image-list'),
     path('', include(router.urls)),
 ]
@@ -2,26 +2,60 @@
 Views for article API.
 """
 
+from django.conf import settings
+from django.db.models import Prefetch
 from rest_framework import viewsets, status, generics, mixins
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
+import zipfile
 
+from core.custom_authentication import CachedTokenAuthentication
+from core.custom_mixins import (
+    SparseFieldsetMixin, TimedViewMixin, parse_field_list)
 from core.custom_permissions import IsOwnerOrReadOnly
+from core.custom_throttling import UploadRateThrottle
 from core.models import Article, Tag, Image
 from article import serializers
+from article.archive import ingest_archive, get_progress
+from article.facets import get_facets
+from article.homepage import get_homepage
 
 
-class ArticleViewSet(viewsets.ModelViewSet):
+def filter_articles(queryset, params):
+    """Filters articles by tag, query, category and limit parameters."""
+    tag = params.get('tag')
+    query = params.get('query')
+    limit = params.get('limit')
+    category = params.get('category')
+    if tag:
+        queryset = queryset.filter(
+            tags__in=Tag.objects.filter(slug__icontains=tag))
+    if query:
+        queryset = queryset.filter(header__icontains=query)
+    if category:
+        queryset = queryset.filter(
+            category=Article.canonical_category(category))
+    queryset = queryset.order_by('-id')
+    if limit:
+        queryset = queryset[:int(limit)]
+    return queryset
+
+
+class ArticleViewSet(TimedViewMixin, SparseFieldsetMixin,
+                     viewsets.ModelViewSet):
     """View for manage article API."""
     serializer_class = serializers.ArticleDetailSerializer
     queryset = Article.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     lookup_field = 'slug'
+    use_read_replica = True
+    sparse_prefetch = ('tags',)
+    expandable = ('images', 'user')
 
     def get_serializer_class(self):
         """Returns serializer class for request."""
@@ -32,32 +66,142 @@ class ArticleViewSet(viewsets.ModelViewSet):
             return serializers.ArticleThumbnailSerializer
         if self.action == 'upload_photos':
             return serializers.ImageSerializer
+        if self.action == 'upload_archive':
+            return serializers.ArchiveUploadSerializer
 
         return self.serializer_class
 
+    def get_expand(self):
+        """Returns related objects requested with expand parameter."""
+        if self.action not in ('list', 'retrieve'):
+            return []
+        names = parse_field_list(self.request.query_params.get('expand', ''))
+        max_depth = settings.ARTICLE_EXPAND['MAX_DEPTH']
+        for name in names:
+            if name.count('.') >= max_depth:
+                raise ValidationError(
+                    {'expand': [f'Maximum expansion depth is {max_depth}.']})
+            if name not in self.expandable:
+                raise ValidationError(
+                    {'expand': [f'Cannot expand {name}.']})
+        return names
+
+    def get_multi_get_keys(self):
+        """Returns field and keys given as slugs or ids parameter, if any."""
+        if self.action != 'list':
+            return None
+        params = self.request.query_params
+        given = [field for field in ('slugs', 'ids') if field in params]
+        if not given:
+            return None
+        if len(given) > 1:
+            raise ValidationError({'slugs': ['Use either slugs or ids.']})
+        keys = list(dict.fromkeys(parse_field_list(params[given[0]])))
+        max_keys = settings.ARTICLE_MULTI_GET['MAX_KEYS']
+        if not keys or len(keys) > max_keys:
+            raise ValidationError(
+                {given[0]: [f'Give between 1 and {max_keys} keys.']})
+        if given[0] == 'slugs':
+            return 'slug', keys
+        try:
+            return 'id', [int(key) for key in keys]
+        except ValueError:
+            raise ValidationError({'ids': ['Ids must be integers.']})
+
+    def get_sparse_fields(self):
+        """Returns selected fields, always including multi-get key."""
+        fields = super().get_sparse_fields()
+        lookup = self.get_multi_get_keys()
+        if fields is None or lookup is None or lookup[0] in fields:
+            return fields
+        return [name for name in serializers.ArticleSerializer.Meta.fields
+                if name in fields or name == lookup[0]]
+
+    def get_serializer_context(self):
+        """Adds expanded relations to serializer context."""
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+    def list(self, request, *args, **kwargs):
+        """Lists articles using values based serializer."""
+        lookup = self.get_multi_get_keys()
+        if lookup is not None:
+            return self.multi_get(*lookup)
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        return Response(self.serialize_list(self.get_queryset()))
+
+    def serialize_list(self, queryset):
+        """Serializes list of articles, with values based serializer if
+        no related objects are expanded."""
+        queryset = self.filter_queryset(queryset)
+        if self.get_expand():
+            return self.get_serializer(queryset, many=True).data
+        return serializers.ArticleListSerializer(
+            queryset,
+            context=self.get_serializer_context(),
+            fields=self.get_sparse_fields()).data
+
+    def multi_get(self, field, keys):
+        """Returns articles with given slugs or ids in order of keys,
+        together with keys that were not found."""
+        found = {article[field]: article
+                 for article in self.serialize_list(self.get_queryset())}
+        return Response({
+            'results': [found[key] for key in keys if key in found],
+            'missing': [key for key in keys if key not in found],
+        })
+
     def perform_create(self, serializer):
         """Creates a new article."""
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
         """Returns articles and filters for tags if specified as parameter."""
-        tag = self.request.query_params.get('tag')
-        query = self.request.query_params.get('query')
-        limit = self.request.query_params.get('limit')
-        category = self.request.query_params.get('category')
-        queryset = self.queryset
-        if tag:
-            queryset = queryset.filter(tags__slug__icontains=tag)
-        if query:
-            queryset = queryset.filter(header__icontains=query)
-        if category:
-            queryset = queryset.filter(category__iexact=category)
-        queryset = queryset.order_by('-id')
-        if limit:
-            queryset = queryset[:int(limit)]
-        return queryset
+        queryset = self.sparse_queryset(self.queryset)
+        expand = self.get_expand()
+        fields = self.get_sparse_fields()
+        if 'user' in expand and (fields is None or 'user' in fields):
+            queryset = queryset.select_related('user')
+        if 'images' in expand:
+            images = Image.objects.order_by('-id')[
+                :settings.ARTICLE_EXPAND['MAX_IMAGES']]
+            queryset = queryset.prefetch_related(
+                Prefetch('image_set', queryset=images,
+                         to_attr='expanded_images'))
+        lookup = self.get_multi_get_keys()
+        if lookup is not None:
+            field, keys = lookup
+            return queryset.filter(**{f'{field}__in': keys})
+        return filter_articles(queryset, self.request.query_params)
 
-    @action(methods=['POST'], detail=True, url_path='upload-thumbnail')
+    @action(methods=['GET'], detail=False, url_path='facets')
+    def facets(self, request):
+        """Returns article counts per category and top tags, narrowed by
+        query and tag parameters."""
+        options = settings.ARTICLE_FACETS
+        try:
+            top = int(request.query_params.get('top', options['TOP_TAGS']))
+        except ValueError:
+            raise ValidationError({'top': ['A valid integer is required.']})
+        if not 0 < top <= options['MAX_TOP_TAGS']:
+            raise ValidationError({'top': [
+                f'Give value between 1 and {options["MAX_TOP_TAGS"]}.']})
+
+        params = {name: request.query_params[name] for name in ('query', 'tag')
+                  if request.query_params.get(name)}
+        articles = filter_articles(Article.objects.all(), params)
+        return Response(get_facets(articles, params, top),
+                        status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_path='homepage')
+    def homepage(self, request):
+        """Returns latest articles of every category."""
+        return Response(get_homepage(request), status=status.HTTP_200_OK)
+
+    @action(methods=['POST'], detail=True, url_path='upload-thumbnail',
+            throttle_classes=[UploadRateThrottle])
     def upload_thumbnail(self, request, slug=None):
         """Upload image to article."""
         article = self.get_object()
@@ -69,7 +213,8 @@ class ArticleViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(methods=['POST'], detail=True, url_path='upload-photos')
+    @action(methods=['POST'], detail=True, url_path='upload-photos',
+            throttle_classes=[UploadRateThrottle])
     def upload_photos(self, request, slug=None):
         article = self.get_object()
         data = [{'photo': photo, 'article': article.id}
@@ -82,21 +227,51 @@ class ArticleViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(methods=['GET', 'POST'], detail=True, url_path='upload-archive',
+            throttle_classes=[UploadRateThrottle])
+    def upload_archive(self, request, slug=None):
+        """Upload ZIP archive with photos or check progress of the upload."""
+        article = self.get_object()
+        if request.method == 'GET':
+            if article.user_id is None or article.user_id != request.user.id:
+                self.permission_denied(request)
+            return Response(get_progress(article), status=status.HTTP_200_OK)
+
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
 
-class TagViewSet(viewsets.ModelViewSet):
+        try:
+            summary = ingest_archive(
+                article, serializer.validated_data['archive'])
+        except (ValueError, zipfile.BadZipFile) as error:
+            return Response({'archive': [str(error)]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class TagViewSet(TimedViewMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """View for manage tags API."""
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all().order_by('-id')
     permission_classes = [IsAuthenticatedOrReadOnly]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    use_read_replica = True
+
+    def get_queryset(self):
+        """Returns tags, loading only columns of selected fields."""
+        return self.sparse_queryset(self.queryset)
 
 
-class ImagesViewSet(viewsets.ReadOnlyModelViewSet):
+class ImagesViewSet(TimedViewMixin, SparseFieldsetMixin,
+                    viewsets.ReadOnlyModelViewSet):
     serializer_class = serializers.ImageSerializer
     queryset = Image.objects.all().order_by('-id')
+    use_read_replica = True
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.sparse_queryset(self.queryset)
         article_id = self.request.query_params.get('article-id', None)
         if article_id:
             return queryset.filter(article__id__exact=article_id).order_by('-id')
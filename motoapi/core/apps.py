@@ -1,6 +1,30 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.test.signals import setting_changed
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from rest_framework.authtoken.models import Token
+        from core.custom_authentication import (
+            invalidate_token, invalidate_user_tokens)
+        from core.custom_db import configure_sqlite_connection
+        from core.custom_metrics import install_query_metrics
+        from core.custom_slow_queries import install_slow_query_log
+        from core.custom_throttling import reset_counters
+        from core.custom_timing import install_query_timer
+
+        user_model = self.get_model('User')
+        post_save.connect(invalidate_token, sender=Token)
+        post_delete.connect(invalidate_token, sender=Token)
+        post_save.connect(invalidate_user_tokens, sender=user_model)
+        post_delete.connect(invalidate_user_tokens, sender=user_model)
+        connection_created.connect(configure_sqlite_connection)
+        connection_created.connect(install_query_timer)
+        connection_created.connect(install_query_metrics)
+        connection_created.connect(install_slow_query_log)
+        setting_changed.connect(reset_counters)
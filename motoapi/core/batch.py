@@ -0,0 +1,133 @@
+"""
+Execution of batched API sub-requests.
+
+Sub-requests are dispatched straight to resolved views and reuse the
+authentication of the batch request. Consecutive reads run concurrently
+in worker threads, writes run one by one in given order.
+"""
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+COPIED_META = ('REMOTE_ADDR', 'SERVER_NAME', 'SERVER_PORT', 'HTTP_HOST',
+               'HTTP_X_FORWARDED_FOR', 'HTTP_ACCEPT_LANGUAGE')
+BATCH_VIEW_NAME = 'api-batch'
+
+
+def request_cost(item):
+    """Returns cost of sub-request set in BATCH_REQUESTS['COSTS']."""
+    kind = 'read' if item['method'] in SAFE_METHODS else 'write'
+    return settings.BATCH_REQUESTS['COSTS'][kind]
+
+
+def build_request(batch_request, item):
+    """Creates Django request for sub-request, authenticated as batch one."""
+    url = urlsplit(item['path'])
+    body = b''
+    if item.get('body') is not None:
+        body = json.dumps(item['body']).encode()
+    environ = {key: batch_request.META[key] for key in COPIED_META
+               if key in batch_request.META}
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': BytesIO(body),
+        'wsgi.url_scheme': batch_request.scheme,
+    })
+    request = WSGIRequest(environ)
+    if batch_request.user.is_authenticated:
+        request._force_auth_user = batch_request.user
+        request._force_auth_token = batch_request.auth
+    return request
+
+
+def error_response(status, detail):
+    return {'status': status, 'headers': {'Content-Type': 'application/json'},
+            'body': {'detail': detail}}
+
+
+def serialize_response(response):
+    """Returns status, headers and decoded body of response."""
+    body = None
+    if not response.streaming and response.content:
+        body = response.content.decode(response.charset)
+        if 'json' in response.get('Content-Type', ''):
+            body = json.loads(body)
+    return {'status': response.status_code, 'headers': dict(response.items()),
+            'body': body}
+
+
+def execute(batch_request, item):
+    """Dispatches sub-request to its view and returns serialized response."""
+    request = build_request(batch_request, item)
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return error_response(404, 'Not found.')
+    if match.view_name == BATCH_VIEW_NAME:
+        return error_response(400, 'Batch requests cannot be nested.')
+
+    request.resolver_match = match
+    try:
+        if iscoroutinefunction(match.func):
+            response = async_to_sync(match.func)(
+                request, *match.args, **match.kwargs)
+        else:
+            response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+    except Exception as exc:
+        response = response_for_exception(request, exc)
+    return serialize_response(response)
+
+
+def _execute_in_worker(context, batch_request, item):
+    try:
+        return context.run(execute, batch_request, item)
+    finally:
+        connections.close_all()
+
+
+def run_batch(batch_request, items):
+    """Executes sub-requests and returns their responses in given order."""
+    responses = [None] * len(items)
+    workers = settings.BATCH_REQUESTS['WORKERS']
+    reads = []
+
+    def run_reads():
+        if workers > 1 and len(reads) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    index: executor.submit(
+                        _execute_in_worker, contextvars.copy_context(),
+                        batch_request, items[index])
+                    for index in reads}
+            for index, future in futures.items():
+                responses[index] = future.result()
+        else:
+            for index in reads:
+                responses[index] = execute(batch_request, items[index])
+        reads.clear()
+
+    for index, item in enumerate(items):
+        if item['method'] in SAFE_METHODS:
+            reads.append(index)
+            continue
+        run_reads()
+        responses[index] = execute(batch_request, item)
+    run_reads()
+    return responses
@@ -0,0 +1,143 @@
+"""
+Custom authentication classes.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from core.custom_metrics import count_cache_lookup
+
+
+class TokenCache:
+    """Thread-safe LRU cache of token key -> (user, token) with TTL.
+
+    Entries are kept per process, so TTL bounds how long a change made by
+    another process may go unnoticed.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key, user, token):
+        options = settings.TOKEN_AUTH
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + options['CACHE_TTL'],
+                                  user, token)
+            self._user_keys.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > options['CACHE_SIZE']:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._user_keys.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._user_keys.get(entry[1].pk, set())
+            keys.discard(key)
+            if not keys:
+                self._user_keys.pop(entry[1].pk, None)
+
+
+token_cache = TokenCache()
+
+
+def token_expires_at(token):
+    """Returns datetime after which token is no longer accepted."""
+    return token.created + timedelta(
+        seconds=settings.TOKEN_AUTH['EXPIRES_AFTER'])
+
+
+def token_expired(token):
+    return token_expires_at(token) <= timezone.now()
+
+
+def token_payload(token):
+    """Returns response data describing token."""
+    return {'token': token.key, 'expires': token_expires_at(token)}
+
+
+def get_valid_token(user):
+    """Returns current token of user, replacing it if already expired."""
+    with transaction.atomic():
+        token, created = Token.objects.get_or_create(user=user)
+        if not created and token_expired(token):
+            token.delete()
+            token = Token.objects.create(user=user)
+    return token
+
+
+def rotate_token(token):
+    """Replaces token with new one for the same user."""
+    with transaction.atomic():
+        user = token.user
+        token.delete()
+        return Token.objects.create(user=user)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication with expiry and in-process token cache.
+
+    Cached requests are authenticated without touching the database.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        count_cache_lookup('token', cached is not None)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+        else:
+            user, token = cached
+
+        if token_expired(token):
+            token_cache.invalidate(key)
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+
+        # Views may modify request.user, so cached instance is not shared.
+        return copy.copy(user), token
+
+
+def invalidate_token(sender, instance, **kwargs):
+    """Drops cached entry of saved or deleted token."""
+    token_cache.invalidate(instance.key)
+
+
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """Drops cached entries of changed or deleted user."""
+    token_cache.invalidate_user(instance.pk)
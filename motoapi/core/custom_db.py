@@ -0,0 +1,23 @@
+"""
+Database connection tuning.
+"""
+from django.conf import settings
+
+
+def apply_pragmas(cursor, pragmas):
+    """Executes PRAGMA statements for given name to value mapping."""
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Applies SQLITE_PRAGMAS to every new SQLite connection.
+
+    WAL journal lets readers work while a write is in progress, and
+    synchronous=NORMAL is durable enough in WAL mode while avoiding fsync
+    on every commit.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
@@ -0,0 +1,125 @@
+"""
+Prometheus metrics of the API.
+
+Metrics are prometheus_client collectors in the default registry. With
+several worker processes PROMETHEUS_MULTIPROC_DIR environment variable
+must point to a directory shared by them, set before the workers start:
+prometheus_client then keeps samples of every process in memory-mapped
+files there and the metrics endpoint sums them. The directory has to be
+emptied whenever the server restarts.
+"""
+import os
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from prometheus_client import (
+    REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+    multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+
+_request_queries = ContextVar('request_queries', default=None)
+
+REQUESTS = Counter(
+    'http_requests_total',
+    'Handled requests by view, action, method and status.',
+    ['view', 'action', 'method', 'status'])
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency by view and action.',
+    ['view', 'action'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Duration of database queries.',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+             1))
+REQUEST_QUERIES = Histogram(
+    'db_queries_per_request',
+    'Database queries per request by view and action.',
+    ['view', 'action'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+IMAGE_DURATION = Histogram(
+    'image_processing_seconds', 'Image encoding time by profile.',
+    ['profile'], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+IMAGE_BYTES = Histogram(
+    'image_processing_bytes', 'Size of encoded images by profile.',
+    ['profile'],
+    buckets=(10 ** 4, 5 * 10 ** 4, 10 ** 5, 2.5 * 10 ** 5, 5 * 10 ** 5,
+             10 ** 6, 2.5 * 10 ** 6, 5 * 10 ** 6))
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by cache and result.',
+    ['cache', 'result'])
+THROTTLE_REQUESTS = Counter(
+    'throttle_requests_total', 'Throttle decisions by scope and outcome.',
+    ['scope', 'outcome'])
+ADMISSION_REQUESTS = Counter(
+    'admission_requests_total',
+    'Admission control decisions by request class and outcome.',
+    ['class', 'outcome'])
+
+
+def count_cache_lookup(cache_name, hit):
+    """Counts hit or miss of named cache."""
+    CACHE_REQUESTS.labels(cache=cache_name,
+                          result='hit' if hit else 'miss').inc()
+
+
+class HitRatioCollector:
+    """Passes metrics of source through, adding cache_hit_ratio gauge
+    computed from summed cache_requests_total samples."""
+
+    def __init__(self, source):
+        self.source = source
+
+    def collect(self):
+        lookups = defaultdict(lambda: [0.0, 0.0])
+        for family in self.source.collect():
+            yield family
+            for sample in family.samples:
+                if sample.name == 'cache_requests_total':
+                    hit = sample.labels['result'] == 'hit'
+                    lookups[sample.labels['cache']][hit] += sample.value
+        ratio = GaugeMetricFamily('cache_hit_ratio',
+                                  'Share of cache lookups that hit.',
+                                  labels=['cache'])
+        for cache_name, (misses, hits) in sorted(lookups.items()):
+            ratio.add_metric([cache_name], hits / (hits + misses))
+        yield ratio
+
+
+def exposition():
+    """Returns metrics of all worker processes in Prometheus text format."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        source = CollectorRegistry()
+        multiprocess.MultiProcessCollector(source)
+    else:
+        source = REGISTRY
+    registry = CollectorRegistry()
+    registry.register(HitRatioCollector(source))
+    return generate_latest(registry)
+
+
+def start_request_queries():
+    """Starts counting queries of current request, returns counter."""
+    counter = [0]
+    return counter, _request_queries.set(counter)
+
+
+def stop_request_queries(token):
+    _request_queries.reset(token)
+
+
+def observe_query(execute, sql, params, many, context):
+    """Database execute wrapper observing query durations and counts."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        QUERY_DURATION.observe(time.perf_counter() - started)
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+def install_query_metrics(sender, connection, **kwargs):
+    """Adds observe_query to wrappers of every new database connection."""
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_query)
@@ -0,0 +1,403 @@
+"""
+Custom middleware.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async)
+from django.conf import settings
+from django.core import signing
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+from core.custom_metrics import (
+    ADMISSION_REQUESTS, REQUEST_DURATION, REQUEST_QUERIES, REQUESTS,
+    start_request_queries, stop_request_queries)
+from core.custom_profiling import (
+    aprofile_request, is_staff_request, profile_request, profiling_requested)
+from core.custom_routers import (
+    replica_pool, reset_read_database, use_read_database)
+from core.custom_slow_queries import reset_current_request, set_current_request
+from core.custom_timing import current_timing, start_timing, stop_timing
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_PATH_RE = re.compile(r'/upload-[\w-]+/?$')
+DOCS_PATH_RE = re.compile(r'^/api/(schema|docs)')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'read_primary'
+STICKY_HEADER = 'X-Read-Primary'
+STICKY_SALT = 'core.custom_middleware.ReplicaRoutingMiddleware'
+
+
+def classify_request(request):
+    """Returns admission class of request: upload, docs, write or read."""
+    if (request.method not in SAFE_METHODS
+            and UPLOAD_PATH_RE.search(request.path)):
+        return 'upload'
+    if DOCS_PATH_RE.match(request.path):
+        return 'docs'
+    if request.method not in SAFE_METHODS:
+        return 'write'
+    return 'read'
+
+
+def _count(request_class, outcome):
+    ADMISSION_REQUESTS.labels(request_class, outcome).inc()
+
+
+class AdmissionGate:
+    """Concurrency limit with bounded queue of waiting requests."""
+
+    def __init__(self, concurrency, queue, timeout):
+        self.queue = queue
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    def acquire(self):
+        """Takes free slot, waiting in queue at most timeout seconds."""
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self._waiting >= self.queue:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self):
+        self._slots.release()
+
+
+class AdmissionControlMiddleware:
+    """Limits concurrent requests separately for every request class.
+
+    Cheap reads keep their own slots, so bursts of image uploads can only
+    saturate upload class, which then answers quickly with 503.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        options = settings.ADMISSION_CONTROL
+        self.retry_after = options['RETRY_AFTER']
+        self.gates = {
+            name: AdmissionGate(limits['CONCURRENCY'], limits['QUEUE'],
+                                limits['TIMEOUT'])
+            for name, limits in options['CLASSES'].items()
+        }
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_class = classify_request(request)
+        gate = self.gates.get(request_class)
+        if gate is None:
+            return self.get_response(request)
+
+        if not gate.acquire():
+            return self.reject(request_class)
+
+        _count(request_class, 'admitted')
+        try:
+            return self.get_response(request)
+        finally:
+            gate.release()
+
+    async def __acall__(self, request):
+        request_class = classify_request(request)
+        gate = self.gates.get(request_class)
+        if gate is None:
+            return await self.get_response(request)
+
+        # Waiting for slot blocks, so it must not happen in event loop.
+        if not await sync_to_async(gate.acquire, thread_sensitive=False)():
+            return self.reject(request_class)
+
+        _count(request_class, 'admitted')
+        try:
+            return await self.get_response(request)
+        finally:
+            gate.release()
+
+    def reject(self, request_class):
+        """Returns response for request not admitted to saturated class."""
+        _count(request_class, 'rejected')
+        response = JsonResponse(
+            {'detail': 'Server is busy, try again later.'}, status=503)
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Sends reads of views with use_read_replica to read replicas.
+
+    After a successful write the client stays on the primary database for
+    STICKY_SECONDS, so it always reads its own writes. The marker is signed
+    and carried by the client, in a cookie or echoed X-Read-Primary header,
+    so it reaches whichever worker serves the next request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REPLICA_ROUTING['REPLICAS']:
+            return self.get_response(request)
+        token = use_read_database(self.choose_database(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_database(token)
+        self.mark_sticky(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REPLICA_ROUTING['REPLICAS']:
+            return await self.get_response(request)
+        # Database is chosen here rather than in process_view, which runs
+        # in a copy of the context under ASGI, so the view would not see it.
+        alias = await sync_to_async(self.choose_database)(request)
+        token = use_read_database(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_read_database(token)
+        self.mark_sticky(request, response)
+        return response
+
+    def choose_database(self, request):
+        """Returns replica for reads of request, None for primary database."""
+        if request.method not in SAFE_METHODS:
+            return None
+        try:
+            match = resolve(request.path_info,
+                            getattr(request, 'urlconf', None))
+        except Resolver404:
+            return None
+        view = getattr(match.func, 'cls', match.func)
+        if (not getattr(view, 'use_read_replica', False)
+                or self.is_sticky(request)):
+            return None
+        return replica_pool.choose()
+
+    def is_sticky(self, request):
+        """Returns if client wrote within last STICKY_SECONDS."""
+        value = (request.COOKIES.get(STICKY_COOKIE)
+                 or request.headers.get(STICKY_HEADER))
+        if not value:
+            return False
+        try:
+            signing.TimestampSigner(salt=STICKY_SALT).unsign(
+                value, max_age=settings.REPLICA_ROUTING['STICKY_SECONDS'])
+        except signing.BadSignature:
+            return False
+        return True
+
+    def mark_sticky(self, request, response):
+        """Keeps client on primary database after successful write."""
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return
+        value = signing.TimestampSigner(salt=STICKY_SALT).sign('primary')
+        response.set_cookie(
+            STICKY_COOKIE, value,
+            max_age=settings.REPLICA_ROUTING['STICKY_SECONDS'],
+            httponly=True, samesite='Lax')
+        response[STICKY_HEADER] = value
+
+
+class ServerTimingMiddleware:
+    """Measures phases of sampled requests.
+
+    Sampled responses get Server-Timing header and one JSON log line with
+    durations of database queries, view, serialization, rendering and
+    image processing. SERVER_TIMING['SAMPLE_RATE'] sets share of sampled
+    requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        token = start_timing()
+        try:
+            response = self.get_response(request)
+            self.report(request, response, current_timing())
+        finally:
+            stop_timing(token)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        token = start_timing()
+        try:
+            response = await self.get_response(request)
+            self.report(request, response, current_timing())
+        finally:
+            stop_timing(token)
+        return response
+
+    def sampled(self):
+        rate = settings.SERVER_TIMING['SAMPLE_RATE']
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def report(self, request, response, timing):
+        """Adds Server-Timing header and logs timing of request."""
+        if settings.SERVER_TIMING['HEADER']:
+            response['Server-Timing'] = timing.header()
+        if settings.SERVER_TIMING['LOG']:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': timing.label,
+                'status': response.status_code,
+                'total_ms': round(timing.total() * 1000, 2),
+                'phases': timing.as_dict(),
+            }))
+
+
+def view_labels(request):
+    """Returns view and action labels of resolved request.
+
+    Viewsets are labelled with class and action name, other views with
+    class or function name and HTTP method.
+    """
+    match = getattr(request, 'resolver_match', None)
+    method = request.method.lower()
+    if match is None:
+        return 'unresolved', method
+    view = getattr(match.func, 'cls', None)
+    if view is None:
+        return getattr(match.func, '__name__', 'unknown'), method
+    actions = getattr(match.func, 'actions', None) or {}
+    return view.__name__, actions.get(method, method)
+
+
+class MetricsMiddleware:
+    """Records request count, latency and query count per view and action."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        queries, token = start_request_queries()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_request_queries(token)
+        self.record(request, response, time.perf_counter() - started,
+                    queries[0])
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        queries, token = start_request_queries()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_request_queries(token)
+        self.record(request, response, time.perf_counter() - started,
+                    queries[0])
+        return response
+
+    def record(self, request, response, duration, queries):
+        view, action = view_labels(request)
+        REQUESTS.labels(view=view, action=action, method=request.method,
+                        status=response.status_code).inc()
+        REQUEST_DURATION.labels(view=view, action=action).observe(duration)
+        REQUEST_QUERIES.labels(view=view, action=action).observe(queries)
+
+
+class ProfilingMiddleware:
+    """Profiles requests of staff users asking for it with header or query
+    parameter (core.custom_profiling). Other requests only pay for checking
+    them."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if profiling_requested(request) and is_staff_request(request):
+            return profile_request(request, self.get_response)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if (profiling_requested(request)
+                and await sync_to_async(is_staff_request)(request)):
+            return await aprofile_request(request, self.get_response)
+        return await self.get_response(request)
+
+
+class SlowQueryMiddleware:
+    """Makes request available to slow query log for labelling queries
+    with view and action (core.custom_slow_queries)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = set_current_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_request(token)
+
+    async def __acall__(self, request):
+        token = set_current_request(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            reset_current_request(token)
@@ -2,24 +2,256 @@
 Contains custom mixins.
 """
 
+import time
 import uuid
 from PIL import Image
 from io import BytesIO
+from django.conf import settings
 from django.core.files import File
+from django.core.exceptions import FieldDoesNotExist
 from django.core.files.base import ContentFile
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import ListSerializer
+
+from core.custom_metrics import IMAGE_BYTES, IMAGE_DURATION
+from core.custom_timing import current_timing, timed
+
+ENCODER_PROFILES = {
+    'photo': {
+        'format': 'JPEG',
+        'options': {'quality': 82, 'optimize': True, 'progressive': True,
+                    'subsampling': '4:2:0'},
+    },
+    'thumbnail': {
+        'format': 'JPEG',
+        'options': {'quality': 78, 'optimize': True, 'progressive': True,
+                    'subsampling': '4:2:0'},
+    },
+    'graphic': {
+        'format': 'PNG',
+        'options': {'optimize': True},
+    },
+    'webp': {
+        'format': 'WEBP',
+        'options': {'quality': 80, 'method': 6},
+        'fallback': 'photo',
+    },
+    'avif': {
+        'format': 'AVIF',
+        'options': {'quality': 60, 'speed': 6},
+        'fallback': 'webp',
+    },
+}
+
+FORMAT_EXTENSIONS = {
+    'JPEG': 'jpeg',
+    'PNG': 'png',
+    'WEBP': 'webp',
+    'AVIF': 'avif',
+}
+
+DEFAULT_PROFILE = 'photo'
+GRAPHIC_PROFILE = 'graphic'
+
+
+def get_encoder_profiles():
+    """Returns encoder profiles merged with IMAGE_ENCODER_PROFILES setting."""
+    profiles = dict(ENCODER_PROFILES)
+    profiles.update(getattr(settings, 'IMAGE_ENCODER_PROFILES', {}))
+    return profiles
+
+
+def format_available(image_format):
+    """Checks if installed Pillow is able to save given format."""
+    Image.init()
+    return image_format in Image.SAVE
+
+
+def resolve_profile(name):
+    """Returns profile, following fallbacks for unavailable formats."""
+    profiles = get_encoder_profiles()
+    seen = set()
+    while name not in seen:
+        seen.add(name)
+        profile = profiles[name]
+        if format_available(profile['format']):
+            return profile
+        name = profile.get('fallback', DEFAULT_PROFILE)
+    raise ValueError(f'No encoder available for profile {name}.')
+
+
+def has_transparency(image):
+    """Checks if image is a graphic that should not be flattened to JPEG."""
+    return (image.mode in ('RGBA', 'LA', 'PA')
+            or (image.mode == 'P' and 'transparency' in image.info))
+
+
+def encode_image(image, size, profile_name=DEFAULT_PROFILE):
+    """Scales image down to size and encodes it with given profile.
+
+    Returns buffer with encoded image and file extension.
+    """
+    profile = resolve_profile(profile_name)
+    transparent = has_transparency(image)
+    if profile['format'] == 'JPEG' and transparent:
+        profile = resolve_profile(GRAPHIC_PROFILE)
+
+    source_image = image.convert('RGBA' if transparent else 'RGB')
+    source_image.thumbnail(size)
+    output = BytesIO()
+    source_image.save(output, format=profile['format'], **profile['options'])
+    output.seek(0)
+
+    return output, FORMAT_EXTENSIONS.get(profile['format'],
+                                         profile['format'].lower())
 
 
 class ResizeImageMixin:
-    def resize(self, image_field, size):
-        im = Image.open(image_field)
-        source_image = im.convert('RGB')
-        source_image.thumbnail(size)
-        output = BytesIO()
-        source_image.save(output, format='JPEG')
-        output.seek(0)
+    def get_encoder_profile_name(self, image_field):
+        """Returns profile chosen for field in IMAGE_FIELD_PROFILES."""
+        label = f'{self._meta.label}.{image_field.field.name}'
+        field_profiles = getattr(settings, 'IMAGE_FIELD_PROFILES', {})
+        return field_profiles.get(label, DEFAULT_PROFILE)
+
+    def resize(self, image_field, size, profile=None):
+        if profile is None:
+            profile = self.get_encoder_profile_name(image_field)
+        started = time.perf_counter()
+        with timed('image'):
+            im = Image.open(image_field)
+            output, extension = encode_image(im, size, profile)
+        IMAGE_DURATION.labels(profile).observe(time.perf_counter() - started)
+        IMAGE_BYTES.labels(profile).observe(output.getbuffer().nbytes)
 
         content_file = ContentFile(output.read())
         file = File(content_file)
 
-        random_name = f'{uuid.uuid4()}.jpeg'
-        image_field.save(random_name, file, save=False)
\ No newline at end of file
+        random_name = f'{uuid.uuid4()}.{extension}'
+        image_field.save(random_name, file, save=False)
+
+
+def parse_field_list(value):
+    """Returns names from comma separated query parameter value."""
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class TimedListSerializer(ListSerializer):
+    """List serializer recording building of output as serialize phase."""
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """Serializer mixin recording building of output as serialize phase.
+
+    Serializers using it set TimedListSerializer as list_serializer_class.
+    """
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class SparseFieldsetSerializerMixin:
+    """Serializer mixin rendering only fields given in fields argument."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    Viewset mixin handling fields and exclude query parameters.
+
+    Selected fields are passed to serializer, and queryset loads only the
+    columns they read and prefetches only relations they render.
+    """
+    sparse_actions = ('list', 'retrieve')
+    sparse_prefetch = ()
+
+    def get_sparse_fields(self):
+        """Returns selected serializer field names, None for all fields."""
+        if getattr(self, '_sparse_fields', False) is not False:
+            return self._sparse_fields
+        self._sparse_fields = None
+        request = getattr(self, 'request', None)
+        if request is None or self.action not in self.sparse_actions:
+            return None
+
+        fields = parse_field_list(request.query_params.get('fields', ''))
+        exclude = parse_field_list(request.query_params.get('exclude', ''))
+        if not fields and not exclude:
+            return None
+        available = list(self.get_serializer_class()().fields)
+        unknown = set(fields + exclude) - set(available)
+        if unknown:
+            raise ValidationError(
+                {'fields': [f'Unknown fields: {", ".join(sorted(unknown))}.']})
+        self._sparse_fields = [name for name in available
+                               if (not fields or name in fields)
+                               and name not in exclude]
+        return self._sparse_fields
+
+    def get_sparse_columns(self, model, fields):
+        """Returns model fields loaded for serializer fields, or None if
+        some field does not map to a single column."""
+        serializer_fields = self.get_serializer_class()().fields
+        columns = {model._meta.pk.name, self.lookup_field}
+        for name in fields:
+            source = serializer_fields[name].source
+            if source in self.sparse_prefetch:
+                continue
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            columns.add(model_field.name)
+        return columns
+
+    def sparse_queryset(self, queryset):
+        """Limits loaded columns and prefetched relations to selected
+        fields."""
+        if self.action not in self.sparse_actions:
+            return queryset
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset.prefetch_related(*self.sparse_prefetch)
+        prefetch = [name for name in self.sparse_prefetch if name in fields]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        columns = self.get_sparse_columns(queryset.model, fields)
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class TimedViewMixin:
+    """
+    Viewset mixin recording handling of request as view phase, labelled
+    with viewset and action.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        timing = current_timing()
+        if timing is not None:
+            timing.label = f'{type(self).__name__}.{self.action}'
+        super().initial(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        with timed('view'):
+            return super().dispatch(request, *args, **kwargs)
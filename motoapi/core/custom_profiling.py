@@ -0,0 +1,194 @@
+"""
+On-demand profiling of single requests of staff users.
+
+Request with PROFILING['HEADER'] header or PROFILING['QUERY_PARAM']
+parameter runs under cProfile and tracemalloc. Stats are saved in
+PROFILING['DIRECTORY'] as '<id>.prof' (pstats, e.g. for snakeviz or
+'python -m pstats') with '<id>.json' summary of slowest functions and
+top allocations. Only one request is profiled at a time, others run
+normally.
+"""
+import cProfile
+import glob
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import exceptions
+
+from core.custom_authentication import CachedTokenAuthentication
+
+PROFILE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+_profiling_lock = threading.Lock()
+
+
+def profiling_requested(request):
+    """Returns True when request asks to be profiled."""
+    options = settings.PROFILING
+    header = 'HTTP_' + options['HEADER'].upper().replace('-', '_')
+    return bool(request.META.get(header)
+                or options['QUERY_PARAM'] in request.GET)
+
+
+def is_staff_request(request):
+    """Returns True when request is made by staff user with session or
+    token."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            user = (CachedTokenAuthentication().authenticate(request)
+                    or (None,))[0]
+        except exceptions.AuthenticationFailed:
+            return False
+    return user is not None and user.is_staff
+
+
+def profile_path(profile_id, extension):
+    return os.path.join(settings.PROFILING['DIRECTORY'],
+                        f'{profile_id}.{extension}')
+
+
+class RequestProfiler:
+    """Collects cProfile stats and memory allocations of one request."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(settings.PROFILING['TRACEBACK_FRAMES'])
+        tracemalloc.reset_peak()
+        self.before = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self.started
+        self.after = tracemalloc.take_snapshot()
+        self.peak = tracemalloc.get_traced_memory()[1]
+        if self.started_tracing:
+            tracemalloc.stop()
+
+    def save(self, request, response):
+        """Writes pstats file and JSON summary, returns summary."""
+        options = settings.PROFILING
+        os.makedirs(options['DIRECTORY'], exist_ok=True)
+        self.profiler.dump_stats(profile_path(self.id, 'prof'))
+        summary = {
+            'id': self.id,
+            'created': time.time(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(self.duration * 1000, 2),
+            'peak_memory_bytes': self.peak,
+            'functions': self.top_functions(options['TOP_FUNCTIONS']),
+            'allocations': self.top_allocations(options['TOP_ALLOCATIONS']),
+        }
+        with open(profile_path(self.id, 'json'), 'w') as file:
+            json.dump(summary, file)
+        prune_profiles(options['MAX_PROFILES'])
+        return summary
+
+    def top_functions(self, limit):
+        stats = pstats.Stats(self.profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3],
+                      reverse=True)[:limit]
+        return [{
+            'function': pstats.func_std_string(function),
+            'calls': calls,
+            'total_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        } for function, (_, calls, total, cumulative, _) in rows]
+
+    def top_allocations(self, limit):
+        differences = self.after.compare_to(self.before, 'lineno')
+        return [{
+            'location': str(difference.traceback[0]),
+            'size_bytes': difference.size_diff,
+            'count': difference.count_diff,
+        } for difference in differences[:limit] if difference.size_diff > 0]
+
+
+def profile_request(request, get_response):
+    """Returns response of request, profiled when no other request is."""
+    if not _profiling_lock.acquire(blocking=False):
+        return get_response(request)
+    try:
+        with RequestProfiler() as profiler:
+            response = get_response(request)
+        profiler.save(request, response)
+    finally:
+        _profiling_lock.release()
+    return add_profile_headers(request, response, profiler.id)
+
+
+async def aprofile_request(request, get_response):
+    """Async variant of profile_request. cProfile sees only code running in
+    event loop thread, including other requests served meanwhile."""
+    if not _profiling_lock.acquire(blocking=False):
+        return await get_response(request)
+    try:
+        with RequestProfiler() as profiler:
+            response = await get_response(request)
+        await sync_to_async(profiler.save)(request, response)
+    finally:
+        _profiling_lock.release()
+    return add_profile_headers(request, response, profiler.id)
+
+
+def add_profile_headers(request, response, profile_id):
+    response['X-Profile-Id'] = profile_id
+    response['X-Profile-URL'] = request.build_absolute_uri(
+        reverse('profile-detail', args=[profile_id]))
+    return response
+
+
+def load_summary(profile_id):
+    """Returns saved summary of profile, None when it does not exist."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(profile_path(profile_id, 'json')) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def list_summaries():
+    """Returns summaries of saved profiles, newest first."""
+    summaries = []
+    for path in glob.glob(os.path.join(settings.PROFILING['DIRECTORY'],
+                                       '*.json')):
+        summary = load_summary(os.path.basename(path)[:-len('.json')])
+        if summary is not None:
+            summaries.append({key: summary[key] for key in (
+                'id', 'created', 'method', 'path', 'status', 'duration_ms')})
+    return sorted(summaries, key=lambda summary: summary['created'],
+                  reverse=True)
+
+
+def prune_profiles(keep):
+    """Removes files of all but keep newest profiles."""
+    paths = sorted(
+        glob.glob(os.path.join(settings.PROFILING['DIRECTORY'], '*.json')),
+        key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        for extension in ('json', 'prof'):
+            try:
+                os.remove(path[:-len('json')] + extension)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,86 @@
+"""
+Database routers.
+"""
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+_read_database = ContextVar('read_database', default=None)
+
+
+class ReplicaPool:
+    """Chooses healthy read replica in round-robin order."""
+
+    def __init__(self):
+        self._health = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def check(self, alias):
+        """Returns if replica answers simple query."""
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except DatabaseError:
+            return False
+
+    def is_healthy(self, alias):
+        """Returns health of replica, rechecked every HEALTH_CHECK_INTERVAL."""
+        now = time.monotonic()
+        with self._lock:
+            checked_at, healthy = self._health.get(alias, (None, True))
+        if checked_at is None or now - checked_at >= \
+                settings.REPLICA_ROUTING['HEALTH_CHECK_INTERVAL']:
+            healthy = self.check(alias)
+            with self._lock:
+                self._health[alias] = (now, healthy)
+        return healthy
+
+    def choose(self):
+        """Returns alias of healthy replica or None to use primary."""
+        healthy = [alias for alias in settings.REPLICA_ROUTING['REPLICAS']
+                   if self.is_healthy(alias)]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def reset(self):
+        with self._lock:
+            self._health.clear()
+
+
+replica_pool = ReplicaPool()
+
+
+def use_read_database(alias):
+    """Sets database used for reads in current context, returns reset token."""
+    return _read_database.set(alias)
+
+
+def reset_read_database(token):
+    _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """Routes reads to replica chosen for current request.
+
+    Replica is chosen by ReplicaRoutingMiddleware, outside of it every
+    query goes to the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
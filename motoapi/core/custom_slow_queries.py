@@ -0,0 +1,174 @@
+"""
+Log of slow database queries.
+
+Queries running longer than SLOW_QUERIES['THRESHOLD_MS'] are logged with
+their query plan, originating view and action and redacted parameters.
+Queries of the same shape, differing only in literals and parameters,
+are aggregated in memory of the process, with the plan captured once
+per shape.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SHAPE_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH')
+
+_shapes = {}
+_lock = threading.Lock()
+_current_request = ContextVar('slow_query_request', default=None)
+
+
+def query_shape(sql):
+    """Returns SQL with literals, parameters and IN lists collapsed."""
+    for pattern, replacement in SHAPE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def redact_value(value):
+    """Returns type of value, with length for text and binary values."""
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes, memoryview)):
+        return f'<{type(value).__name__}:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def redact(params):
+    """Returns parameters with every value replaced by its type."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact_value(value) for key, value in params.items()}
+    return [redact_value(value) for value in params]
+
+
+def explain(connection, sql, params):
+    """Returns query plan of statement, bypassing execute wrappers.
+
+    Failure to explain is reported in the plan, never raised, so logging
+    cannot change outcome of the query.
+    """
+    if not sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+        return None
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor, connection.wrap_database_errors:
+            cursor.cursor.execute(f'{prefix} {sql}', params)
+            return [' '.join(str(column) for column in row)
+                    for row in cursor.cursor.fetchall()]
+    except Exception as error:
+        return [f'EXPLAIN failed: {error}']
+
+
+def current_view():
+    """Returns 'View.action' label of request being handled, if any."""
+    from core.custom_middleware import view_labels
+
+    request = _current_request.get()
+    if request is None:
+        return None
+    return '.'.join(view_labels(request))
+
+
+def set_current_request(request):
+    return _current_request.set(request)
+
+
+def reset_current_request(token):
+    _current_request.reset(token)
+
+
+def record_slow_query(connection, sql, params, duration, failed=False):
+    """Aggregates slow query by shape and logs it. Failed query is not
+    explained."""
+    options = settings.SLOW_QUERIES
+    shape = query_shape(sql)
+    view = current_view()
+    redacted = redact(params)
+    with _lock:
+        entry = _shapes.get(shape)
+        if entry is None and len(_shapes) >= options['MAX_SHAPES']:
+            oldest = min(_shapes, key=lambda key: _shapes[key]['last_seen'])
+            del _shapes[oldest]
+        if entry is None:
+            entry = _shapes[shape] = {
+                'shape': shape, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'plan': None, 'views': Counter(), 'first_seen': time.time()}
+        entry['count'] += 1
+        entry['total_ms'] += duration * 1000
+        entry['max_ms'] = max(entry['max_ms'], duration * 1000)
+        entry['views'][view or 'unknown'] += 1
+        entry['last_seen'] = time.time()
+        entry['sql'] = sql
+        entry['params'] = redacted
+        plan = entry['plan']
+    if plan is None and options['EXPLAIN'] and not failed:
+        plan = explain(connection, sql, params)
+        with _lock:
+            if entry['plan'] is None:
+                entry['plan'] = plan
+            plan = entry['plan']
+    logger.warning(json.dumps({
+        'duration_ms': round(duration * 1000, 2),
+        'view': view,
+        'sql': sql,
+        'params': redacted,
+        'plan': plan,
+        'failed': failed,
+    }, default=str))
+
+
+def log_slow_query(execute, sql, params, many, context):
+    """Database execute wrapper recording queries over threshold."""
+    threshold = settings.SLOW_QUERIES['THRESHOLD_MS']
+    started = time.perf_counter()
+    failed = True
+    try:
+        result = execute(sql, params, many, context)
+        failed = False
+        return result
+    finally:
+        duration = time.perf_counter() - started
+        if (threshold is not None and not many
+                and duration * 1000 >= threshold):
+            record_slow_query(context['connection'], sql, params, duration,
+                              failed)
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """Adds log_slow_query to wrappers of every new database connection."""
+    if log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_query)
+
+
+def slow_query_report():
+    """Returns aggregated slow query shapes, by total time descending."""
+    with _lock:
+        entries = [{**entry, 'views': dict(entry['views'])}
+                   for entry in _shapes.values()]
+    for entry in entries:
+        entry['total_ms'] = round(entry['total_ms'], 2)
+        entry['max_ms'] = round(entry['max_ms'], 2)
+        entry['mean_ms'] = round(entry['total_ms'] / entry['count'], 2)
+    return sorted(entries, key=lambda entry: entry['total_ms'], reverse=True)
+
+
+def clear_slow_queries():
+    with _lock:
+        _shapes.clear()
@@ -0,0 +1,180 @@
+"""
+Test runner and query budgets for API tests.
+
+TestRunner runs the suite with throttle rates disabled, so counters of
+one test never limit requests of another. Tests of throttling enable
+their rates with override_settings.
+
+query_budget records every SQL query of requests handled by test client
+and fails the test when a request runs more queries than its endpoint
+budget, or repeats the same query shape, which usually means an N+1
+query in a serializer. Budgets are fixed numbers, so they hold only when
+queries do not grow with page size. It works as context manager and as
+decorator of test methods or whole test case classes:
+
+    @query_budget({'article:article-list': 2, 'POST article:article-list': 6})
+    class ArticleApiTests(TestCase):
+        ...
+"""
+import functools
+import inspect
+import re
+import traceback
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.urls import Resolver404, resolve
+
+from core.custom_slow_queries import query_shape
+
+IGNORED_QUERIES = re.compile(
+    r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b')
+
+
+class TestRunner(DiscoverRunner):
+    """Runs tests without throttling."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        rates = dict.fromkeys(
+            settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'])
+        self.unthrottled = override_settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates})
+        self.unthrottled.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.unthrottled.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+def project_stack():
+    """Returns formatted frames of project code calling the database."""
+    root = str(settings.BASE_DIR)
+    frames = traceback.extract_stack()
+    for index, frame in enumerate(frames):
+        if '/django/db/' in frame.filename:
+            frames = frames[:index]
+            break
+    return ''.join(traceback.format_list(
+        [frame for frame in frames if frame.filename.startswith(root)
+         and '/site-packages/' not in frame.filename]))
+
+
+class RecordedRequest:
+    """Queries run while handling one request."""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.queries = []
+        try:
+            self.url_name = resolve(path).view_name
+        except Resolver404:
+            self.url_name = None
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.url_name})'
+
+    def duplicates(self):
+        """Returns queries whose shape was already run in this request."""
+        seen, repeated = set(), []
+        for query in self.queries:
+            if query['shape'] in seen:
+                repeated.append(query)
+            seen.add(query['shape'])
+        return repeated
+
+
+class query_budget:
+    """Fails when a request handled inside runs more queries than budget.
+
+    budget is a number of queries allowed for every request, or a dict of
+    budgets by URL name, optionally prefixed by method ('POST name').
+    Requests to endpoints missing in dict fail, so every endpoint used by
+    a test has to declare its budget.
+    """
+
+    def __init__(self, budget, allow_duplicates=False):
+        self.budget = budget
+        self.allow_duplicates = allow_duplicates
+        self.requests = []
+        self.current = None
+
+    def __call__(self, decorated):
+        if inspect.isclass(decorated):
+            for name, method in list(vars(decorated).items()):
+                if name.startswith('test') and callable(method):
+                    setattr(decorated, name, self.decorate(method))
+            return decorated
+        return self.decorate(decorated)
+
+    def decorate(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with query_budget(self.budget, self.allow_duplicates):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        request_started.connect(self.start_request)
+        request_finished.connect(self.finish_request)
+        self.stack.callback(request_started.disconnect, self.start_request)
+        self.stack.callback(request_finished.disconnect, self.finish_request)
+        self.stack.enter_context(connection.execute_wrapper(self.record))
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stack.close()
+        if exc_type is None:
+            self.check()
+
+    def start_request(self, sender, environ=None, **kwargs):
+        environ = environ or {}
+        self.current = RecordedRequest(environ.get('REQUEST_METHOD', ''),
+                                       environ.get('PATH_INFO', ''))
+        self.requests.append(self.current)
+
+    def finish_request(self, sender, **kwargs):
+        self.current = None
+
+    def record(self, execute, sql, params, many, context):
+        if self.current is not None and not IGNORED_QUERIES.match(sql):
+            self.current.queries.append({'sql': sql,
+                                         'shape': query_shape(sql),
+                                         'stack': project_stack()})
+        return execute(sql, params, many, context)
+
+    def budget_for(self, request):
+        if not isinstance(self.budget, dict):
+            return self.budget
+        for key in (f'{request.method} {request.url_name}', request.url_name):
+            if key in self.budget:
+                return self.budget[key]
+        raise AssertionError(f'No query budget declared for {request}.')
+
+    def check(self):
+        """Raises AssertionError describing requests over their budget."""
+        failures = []
+        for request in self.requests:
+            budget = self.budget_for(request)
+            if len(request.queries) > budget:
+                failures.append(
+                    f'{request} ran {len(request.queries)} queries, budget is '
+                    f'{budget}:\n' + format_queries(request.queries))
+            duplicates = request.duplicates()
+            if duplicates and not self.allow_duplicates:
+                failures.append(
+                    f'{request} repeated {len(duplicates)} queries:\n'
+                    + format_queries(duplicates))
+        if failures:
+            raise AssertionError('\n\n'.join(failures))
+
+
+def format_queries(queries):
+    return '\n'.join(f'{number}. {query["sql"]}\n{query["stack"]}'
+                     for number, query in enumerate(queries, 1))
@@ -0,0 +1,206 @@
+"""
+Request throttling with sliding-window counters.
+
+Every client key keeps only two counters: requests in current and in
+previous fixed window. Request rate is estimated as previous count weighted
+by the part of previous window still inside the sliding window plus current
+count, which gives smooth limits without storing request timestamps.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.custom_metrics import THROTTLE_REQUESTS
+
+
+class MemoryCounterStore:
+    """Counters kept in process memory, checked and updated atomically."""
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, window_index, allow):
+        """Increments counter of key if allow(previous, current) is true.
+
+        Returns (allowed, previous, current) counts before increment.
+        """
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[0] < window_index - 1:
+                counter = [window_index, 0, 0]
+            elif counter[0] == window_index - 1:
+                counter = [window_index, counter[2], 0]
+            previous, current = counter[1], counter[2]
+            allowed = allow(previous, current)
+            if allowed:
+                counter[2] += 1
+            self._counters[key] = counter
+            if len(self._counters) > settings.THROTTLE_STORE['MAX_KEYS']:
+                self._prune(window_index)
+            return allowed, previous, current
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def _prune(self, window_index):
+        """Drops counters which no longer affect any sliding window."""
+        self._counters = {key: counter
+                          for key, counter in self._counters.items()
+                          if counter[0] >= window_index - 1}
+
+
+class CacheCounterStore:
+    """Counters kept in Django cache shared by all worker processes.
+
+    Current counter is incremented before the check, so concurrent requests
+    always see each other; rejected request takes its increment back.
+    """
+
+    def hit(self, key, window_index, allow):
+        current_key = f'{key}:{window_index}'
+        previous_key = f'{key}:{window_index - 1}'
+        cache.add(current_key, 0, key_timeout())
+        try:
+            current = cache.incr(current_key) - 1
+        except ValueError:
+            # Counter expired between add and incr.
+            cache.set(current_key, 1, key_timeout())
+            current = 0
+        previous = cache.get(previous_key, 0)
+        allowed = allow(previous, current)
+        if not allowed:
+            cache.decr(current_key)
+        return allowed, previous, current
+
+
+def key_timeout():
+    """Returns seconds counters live in cache, two of the longest windows,
+    as counter of current window is still read during the next one."""
+    durations = [SimpleRateThrottle.parse_rate(None, rate)[1]
+                 for rate in api_settings.DEFAULT_THROTTLE_RATES.values()]
+    return 2 * max(filter(None, durations), default=60)
+
+
+memory_store = MemoryCounterStore()
+cache_store = CacheCounterStore()
+
+
+def get_counter_store():
+    """Returns counter store chosen in THROTTLE_STORE setting."""
+    if settings.THROTTLE_STORE['BACKEND'] == 'cache':
+        return cache_store
+    return memory_store
+
+
+def reset_counters(setting, **kwargs):
+    """Drops in-memory counters when throttle settings change."""
+    if setting in ('REST_FRAMEWORK', 'THROTTLE_STORE'):
+        memory_store.clear()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Base throttle using sliding-window counters instead of history."""
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def get_rate(self):
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def applies_to(self, request, view):
+        """Returns if request is subject to this throttle."""
+        return True
+
+    def get_cache_key(self, request, view):
+        if not self.applies_to(request, view):
+            return None
+        if request.user and request.user.is_authenticated:
+            ident = f'user-{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window_index, offset = divmod(now, self.duration)
+        self.elapsed = offset / self.duration
+
+        def allow(previous, current):
+            return self.estimate(previous, current) < self.num_requests
+
+        allowed, self.previous, self.current = get_counter_store().hit(
+            self.key, int(window_index), allow)
+        THROTTLE_REQUESTS.labels(
+            self.scope, 'allowed' if allowed else 'throttled').inc()
+        return allowed
+
+    def estimate(self, previous, current):
+        """Returns estimated number of requests within sliding window."""
+        return previous * (1 - self.elapsed) + current
+
+    def wait(self):
+        """Returns seconds until estimated count drops below the limit."""
+        limit = self.num_requests
+        if self.current < limit and self.previous:
+            # Previous window weight decays until estimate fits the limit.
+            fraction = 1 - (limit - self.current) / self.previous
+            return max(fraction - self.elapsed, 0) * self.duration
+        remaining = (1 - self.elapsed) * self.duration
+        if self.current >= limit:
+            remaining += max(1 - limit / self.current, 0) * self.duration
+        return remaining
+
+
+class LoginRateThrottle(SlidingWindowThrottle):
+    """Limits password checks per client address."""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope,
+                                    'ident': self.get_ident(request)}
+
+
+class UploadRateThrottle(SlidingWindowThrottle):
+    """Limits image uploads per user."""
+    scope = 'upload'
+
+    def applies_to(self, request, view):
+        return request.method not in SAFE_METHODS
+
+
+class AnonReadRateThrottle(SlidingWindowThrottle):
+    """Limits reads of anonymous clients."""
+    scope = 'anon_read'
+
+    def applies_to(self, request, view):
+        return (request.method in SAFE_METHODS
+                and not request.user.is_authenticated)
+
+
+class UserWriteRateThrottle(SlidingWindowThrottle):
+    """Limits writes of authenticated users."""
+    scope = 'user_write'
+
+    def applies_to(self, request, view):
+        return (request.method not in SAFE_METHODS
+                and request.user.is_authenticated)
+
+
+class AddressReadRateThrottle(SlidingWindowThrottle):
+    """Limits reads per client address, used where user is not resolved."""
+    scope = 'anon_read'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope,
+                                    'ident': self.get_ident(request)}
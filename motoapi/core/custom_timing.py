@@ -0,0 +1,92 @@
+"""
+Per-request timing of processing phases for Server-Timing header.
+
+Timing is collected only for requests sampled by ServerTimingMiddleware.
+Outside of them timed() and the query wrapper cost one context variable
+lookup.
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+_current_timing = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Durations and counts of phases of single request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.label = None
+        self._lock = threading.Lock()
+
+    def add(self, phase, duration):
+        with self._lock:
+            total, count = self.phases.get(phase, (0.0, 0))
+            self.phases[phase] = (total + duration, count + 1)
+
+    def total(self):
+        """Returns seconds since start of request."""
+        return time.perf_counter() - self.started
+
+    def header(self):
+        """Returns value of Server-Timing header."""
+        entries = []
+        for phase, (duration, count) in self.phases.items():
+            entry = f'{phase};dur={duration * 1000:.1f}'
+            if phase == 'db':
+                entry += f';desc="{count} queries"'
+            entries.append(entry)
+        entries.append(f'total;dur={self.total() * 1000:.1f}')
+        return ', '.join(entries)
+
+    def as_dict(self):
+        """Returns phases in milliseconds for structured log."""
+        return {phase: {'ms': round(duration * 1000, 2), 'count': count}
+                for phase, (duration, count) in self.phases.items()}
+
+
+def start_timing():
+    """Starts timing of current request, returns token to stop it."""
+    return _current_timing.set(RequestTiming())
+
+
+def stop_timing(token):
+    _current_timing.reset(token)
+
+
+def current_timing():
+    """Returns timing of current request, None if it is not sampled."""
+    return _current_timing.get()
+
+
+class timed:
+    """Context manager adding duration of block to phase of request."""
+
+    __slots__ = ('phase', 'timing', 'started')
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def __enter__(self):
+        self.timing = _current_timing.get()
+        if self.timing is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timing is not None:
+            self.timing.add(self.phase, time.perf_counter() - self.started)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper timing queries as db phase."""
+    with timed('db'):
+        return execute(sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """Adds time_query to wrappers of every new database connection."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
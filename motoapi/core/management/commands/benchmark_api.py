@@ -0,0 +1,225 @@
+"""
+Drives API endpoints in process and reports latency percentiles,
+throughput and query counts, optionally compared with stored baseline.
+"""
+import json
+import math
+import os
+import platform
+import random
+import time
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image as Im
+
+from core.custom_authentication import get_valid_token
+from core.custom_throttling import memory_store
+from core.models import THUMBNAIL_DIR, Article
+
+ARTICLES_URL = '/api/articles/articles/'
+
+
+def percentile(values, percent):
+    """Returns nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def jpeg_bytes(size=(900, 700)):
+    output = BytesIO()
+    Im.new('RGB', size, (200, 80, 40)).save(output, format='JPEG')
+    return output.getvalue()
+
+
+def stored_files(directory):
+    """Returns paths of files stored below directory of default storage."""
+    root = default_storage.path(directory)
+    return {os.path.join(path, name) for path, _, names in os.walk(root)
+            for name in names}
+
+
+def scenarios(slugs, article, token):
+    """Returns request functions of benchmarked endpoints by name."""
+    photo = jpeg_bytes()
+    auth = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+
+    def upload(client, index):
+        file = BytesIO(photo)
+        file.name = f'benchmark-{index}.jpg'
+        return client.post(f'{ARTICLES_URL}{article.slug}/upload-thumbnail/',
+                           {'thumbnail': file}, **auth)
+
+    return {
+        'list': lambda client, index: client.get(ARTICLES_URL, {'limit': 100}),
+        'detail': lambda client, index: client.get(
+            f'{ARTICLES_URL}{slugs[index % len(slugs)]}/'),
+        'filter-category': lambda client, index: client.get(
+            ARTICLES_URL, {'category': 'testy', 'limit': 50}),
+        'filter-tag': lambda client, index: client.get(
+            ARTICLES_URL, {'tag': 'honda', 'limit': 50}),
+        'search': lambda client, index: client.get(
+            ARTICLES_URL, {'query': 'yamaha', 'limit': 50}),
+        'homepage': lambda client, index: client.get(
+            f'{ARTICLES_URL}homepage/'),
+        'upload': upload,
+    }
+
+
+def run_scenario(client, make_request, requests, warmup):
+    """Runs requests of scenario, returns its measurements."""
+    for index in range(warmup):
+        make_request(client, index)
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for index in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = make_request(client, index)
+            latencies.append(time.perf_counter() - request_started)
+        queries.append(len(captured))
+        errors += response.status_code >= 400
+    elapsed = time.perf_counter() - started
+    return {
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'rps': round(requests / elapsed, 1),
+        'queries': round(sum(queries) / requests, 2),
+        'errors': errors,
+    }
+
+
+def compare(report, baseline, tolerance, min_delta_ms):
+    """Returns regressions of report against baseline as messages. Latency
+    regresses when p95 exceeds baseline both relatively and absolutely."""
+    regressions = []
+    for name, result in report['scenarios'].items():
+        expected = baseline.get('scenarios', {}).get(name)
+        if expected is None:
+            continue
+        delta = result['p95_ms'] - expected['p95_ms']
+        if (result['p95_ms'] > expected['p95_ms'] * (1 + tolerance)
+                and delta > min_delta_ms):
+            regressions.append(
+                f'{name}: p95 {result["p95_ms"]}ms > baseline '
+                f'{expected["p95_ms"]}ms')
+        if result['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: {result["queries"]} queries > baseline '
+                f'{expected["queries"]}')
+        if result['errors'] > expected['errors']:
+            regressions.append(
+                f'{name}: {result["errors"]} errors > baseline '
+                f'{expected["errors"]}')
+    return regressions
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks list, detail, filter, search, homepage and upload '
+            'endpoints on data created by seed_perf.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--scenario', action='append',
+                            help='Runs only given scenario, may be repeated.')
+        parser.add_argument('--output', help='Writes JSON report to file.')
+        parser.add_argument('--baseline', help='Compares with JSON report.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed relative p95 increase over '
+                                 'baseline.')
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help='Ignored absolute p95 increase over '
+                                 'baseline.')
+        parser.add_argument('--fail-on-regression', action='store_true')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not Article.objects.filter(slug__startswith='perf-').exists():
+            raise CommandError('No generated articles, run seed_perf first.')
+
+        rates = dict.fromkeys(
+            settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'])
+        rest_framework = {**settings.REST_FRAMEWORK,
+                          'DEFAULT_THROTTLE_RATES': rates}
+        thumbnails_before = stored_files(THUMBNAIL_DIR)
+        results = {}
+        with override_settings(DEBUG=False, REST_FRAMEWORK=rest_framework,
+                               ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS,
+                                              'testserver'],
+                               SERVER_TIMING={**settings.SERVER_TIMING,
+                                              'SAMPLE_RATE': 0}):
+            with transaction.atomic():
+                memory_store.clear()
+                slugs = self.sample_slugs(options['seed'])
+                article = Article.objects.filter(
+                    slug__startswith='perf-',
+                    user__isnull=False).earliest('id')
+                token = get_valid_token(article.user)
+                client = Client()
+                for name, make_request in scenarios(
+                        slugs, article, token).items():
+                    if options['scenario'] and name not in options['scenario']:
+                        continue
+                    results[name] = run_scenario(
+                        client, make_request, options['requests'],
+                        options['warmup'])
+                transaction.set_rollback(True)
+        for path in stored_files(THUMBNAIL_DIR) - thumbnails_before:
+            os.remove(path)
+
+        report = {
+            'meta': {
+                'articles': Article.objects.count(),
+                'requests': options['requests'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'scenarios': results,
+        }
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+                file.write('\n')
+
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                regressions = compare(report, json.load(file),
+                                      options['tolerance'],
+                                      options['min_delta_ms'])
+            for message in regressions:
+                self.stdout.write(self.style.WARNING(f'Regression: {message}'))
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} regressions found.')
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS('No regressions.'))
+
+    def sample_slugs(self, seed):
+        """Returns slugs of random generated articles."""
+        ids = list(Article.objects.filter(
+            slug__startswith='perf-').values_list('id', flat=True))
+        sample = random.Random(seed).sample(ids, min(len(ids), 200))
+        return list(Article.objects.filter(id__in=sample).values_list(
+            'slug', flat=True))
+
+    def print_report(self, report):
+        self.stdout.write(f'{report["meta"]["articles"]} articles, '
+                          f'{report["meta"]["requests"]} requests per '
+                          f'scenario')
+        self.stdout.write(f'{"scenario":<18}{"p50 ms":>9}{"p95 ms":>9}'
+                          f'{"p99 ms":>9}{"req/s":>9}{"queries":>9}'
+                          f'{"errors":>8}')
+        for name, row in report['scenarios'].items():
+            self.stdout.write(
+                f'{name:<18}{row["p50_ms"]:>9}{row["p95_ms"]:>9}'
+                f'{row["p99_ms"]:>9}{row["rps"]:>9}{row["queries"]:>9}'
+                f'{row["errors"]:>8}')
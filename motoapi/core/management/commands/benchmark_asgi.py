@@ -0,0 +1,199 @@
+"""
+Compares async ASGI read endpoints with sync WSGI ones.
+
+Every server and endpoint runs in its own forked process, so resident
+memory measured there includes thread stacks of the WSGI worker pool
+and nothing left from other runs.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+
+ENDPOINTS = [
+    ('/api/articles/articles/', '/api/articles/async/articles/'),
+    ('/api/articles/tags/', '/api/articles/async/tags/'),
+    ('/api/articles/images/', '/api/articles/async/images/'),
+]
+
+
+def wsgi_request(application, path):
+    """Calls WSGI application with GET request, returns status code."""
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': '127.0.0.1', 'SERVER_PORT': '8000',
+        'REMOTE_ADDR': '127.0.0.1', 'HTTP_HOST': '127.0.0.1',
+        'wsgi.input': BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+    }
+    status = []
+    body = application(environ, lambda code, headers: status.append(code))
+    b''.join(body)
+    body.close()
+    return int(status[0].split()[0])
+
+
+async def asgi_request(application, path):
+    """Calls ASGI application with GET request, returns status code."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'127.0.0.1')],
+        'server': ('127.0.0.1', 8000), 'client': ('127.0.0.1', 50000),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+def current_rss():
+    """Returns resident memory of current process in bytes."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # ru_maxrss is peak, not current, in KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_wsgi(path, requests, concurrency):
+    wsgi = WSGIHandler()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda _: wsgi_request(wsgi, path),
+                                 range(requests)))
+
+
+def run_asgi(path, requests, concurrency):
+    asgi = ASGIHandler()
+
+    async def run_requests():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with semaphore:
+                return await asgi_request(asgi, path)
+
+        return await asyncio.gather(*(limited() for _ in range(requests)))
+
+    return asyncio.run(run_requests())
+
+
+SERVERS = {'wsgi': run_wsgi, 'asgi': run_asgi}
+
+
+def measure(server, path, requests, concurrency):
+    """Runs benchmark in current process, returns throughput and resident
+    memory sampled while it runs."""
+    baseline = peak = current_rss()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(0.005):
+            peak = max(peak, current_rss())
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        statuses = SERVERS[server](path, requests, concurrency)
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        sampler.join()
+    peak = max(peak, current_rss())
+    return {
+        'rps': round(requests / elapsed, 1),
+        'rss_mib': round(peak / 2 ** 20, 1),
+        'rss_kib_per_connection': round((peak - baseline) / 1024 / concurrency,
+                                        1),
+        'errors': sum(1 for status in statuses if status >= 400),
+    }
+
+
+def _measure_in_child(pipe, *args):
+    try:
+        pipe.send(measure(*args))
+    except Exception as error:
+        pipe.send({'error': repr(error)})
+    finally:
+        pipe.close()
+
+
+def measure_in_process(*args):
+    """Runs measure in forked process, returns its result."""
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure_in_child, args=(sender, *args))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+    if 'error' in result:
+        raise CommandError(f'Benchmark of {args[1]} failed: {result["error"]}')
+    return result
+
+
+class Command(BaseCommand):
+    help = ('Measures requests per second and resident memory per '
+            'concurrent connection of sync WSGI and async ASGI read '
+            'endpoints.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--json', action='store_true',
+                            help='Outputs report as JSON.')
+
+    def handle(self, *args, **options):
+        requests, concurrency = options['requests'], options['concurrency']
+        rates = dict.fromkeys(
+            settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'])
+        rest_framework = {**settings.REST_FRAMEWORK,
+                          'DEFAULT_THROTTLE_RATES': rates}
+        report = {}
+
+        with override_settings(DEBUG=False, REST_FRAMEWORK=rest_framework):
+            for sync_path, async_path in ENDPOINTS:
+                report[sync_path] = {
+                    'wsgi': measure_in_process(
+                        'wsgi', sync_path, requests, concurrency),
+                    'asgi': measure_in_process(
+                        'asgi', async_path, requests, concurrency),
+                }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{requests} requests, {concurrency} concurrent')
+        self.stdout.write(f'{"endpoint":<28}{"server":<6}{"req/s":>9}'
+                          f'{"RSS MiB":>9}{"KiB/conn":>10}{"errors":>8}')
+        for path, servers in report.items():
+            for server, row in servers.items():
+                self.stdout.write(
+                    f'{path:<28}{server:<6}{row["rps"]:>9}{row["rss_mib"]:>9}'
+                    f'{row["rss_kib_per_connection"]:>10}{row["errors"]:>8}')
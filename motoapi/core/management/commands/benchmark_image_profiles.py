@@ -0,0 +1,141 @@
+"""
+Benchmark of encoder profiles: output bytes versus SSIM on sample corpus.
+"""
+import json
+import os
+from io import BytesIO
+
+from PIL import Image
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.custom_mixins import encode_image, get_encoder_profiles
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp')
+SSIM_SIZE = (256, 256)
+SSIM_WINDOW = 8
+
+
+def corpus_paths(corpus):
+    """Returns sorted paths of images in corpus and its subdirectories,
+    which include hash-sharded upload directories."""
+    return sorted(
+        os.path.join(directory, name)
+        for directory, _, names in os.walk(corpus)
+        for name in names if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def encode_baseline(image, size):
+    """Encodes image the way resize did before profiles were introduced."""
+    source_image = image.convert('RGB')
+    source_image.thumbnail(size)
+    output = BytesIO()
+    source_image.save(output, format='JPEG')
+    output.seek(0)
+    return output
+
+
+def structural_similarity(first, second):
+    """Returns mean SSIM of two images computed on 8x8 luma windows."""
+    first = first.convert('L')
+    first.thumbnail(SSIM_SIZE)
+    second = second.convert('L').resize(first.size)
+    width, height = first.size
+    first_data, second_data = first.tobytes(), second.tobytes()
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    scores = []
+
+    for top in range(0, height - SSIM_WINDOW + 1, SSIM_WINDOW):
+        for left in range(0, width - SSIM_WINDOW + 1, SSIM_WINDOW):
+            xs, ys = [], []
+            for row in range(top, top + SSIM_WINDOW):
+                start = row * width + left
+                xs.extend(first_data[start:start + SSIM_WINDOW])
+                ys.extend(second_data[start:start + SSIM_WINDOW])
+            count = len(xs)
+            mean_x, mean_y = sum(xs) / count, sum(ys) / count
+            var_x = sum((x - mean_x) ** 2 for x in xs) / count
+            var_y = sum((y - mean_y) ** 2 for y in ys) / count
+            cov = sum((x - mean_x) * (y - mean_y)
+                      for x, y in zip(xs, ys)) / count
+            scores.append(
+                ((2 * mean_x * mean_y + c1) * (2 * cov + c2))
+                / ((mean_x ** 2 + mean_y ** 2 + c1) * (var_x + var_y + c2)))
+
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+class Command(BaseCommand):
+    help = 'Reports bytes versus SSIM tradeoff of image encoder profiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corpus',
+            default=os.path.join(settings.MEDIA_ROOT, 'uploads', 'article'),
+            help='Directory with sample images.')
+        parser.add_argument('--width', type=int, default=1200)
+        parser.add_argument('--height', type=int, default=800)
+        parser.add_argument('--profiles', nargs='*',
+                            help='Profiles to compare, all by default.')
+        parser.add_argument('--json', action='store_true',
+                            help='Outputs report as JSON.')
+
+    def handle(self, *args, **options):
+        corpus = options['corpus']
+        if not os.path.isdir(corpus):
+            raise CommandError(f'Corpus directory {corpus} does not exist.')
+        paths = corpus_paths(corpus)
+        if not paths:
+            raise CommandError(f'No images found in {corpus}.')
+
+        size = (options['width'], options['height'])
+        profiles = options['profiles'] or list(get_encoder_profiles())
+        results = {name: {'bytes': 0, 'ssim': []}
+                   for name in ['baseline'] + profiles}
+
+        for path in paths:
+            with Image.open(path) as image:
+                image.load()
+                reference = image.convert('RGB')
+                reference.thumbnail(size)
+                outputs = {'baseline': encode_baseline(image, size)}
+                for name in profiles:
+                    outputs[name] = encode_image(image, size, name)[0]
+
+            for name, output in outputs.items():
+                results[name]['bytes'] += output.getbuffer().nbytes
+                with Image.open(output) as encoded:
+                    results[name]['ssim'].append(
+                        structural_similarity(reference, encoded))
+
+        baseline_bytes = results['baseline']['bytes']
+        report = {
+            'images': len(paths),
+            'size': list(size),
+            'profiles': {
+                name: {
+                    'total_bytes': result['bytes'],
+                    'mean_bytes': result['bytes'] // len(paths),
+                    'bytes_vs_baseline': round(
+                        result['bytes'] / baseline_bytes, 4),
+                    'mean_ssim': round(sum(result['ssim']) / len(paths), 4),
+                    'min_ssim': round(min(result['ssim']), 4),
+                }
+                for name, result in results.items()
+            },
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{report["images"]} images scaled to '
+                          f'{size[0]}x{size[1]}')
+        self.stdout.write(f'{"profile":<12}{"mean bytes":>12}'
+                          f'{"vs baseline":>13}{"mean SSIM":>11}'
+                          f'{"min SSIM":>10}')
+        for name, row in report['profiles'].items():
+            self.stdout.write(
+                f'{name:<12}{row["mean_bytes"]:>12}'
+                f'{row["bytes_vs_baseline"]:>13.2%}'
+                f'{row["mean_ssim"]:>11.4f}{row["min_ssim"]:>10.4f}')
@@ -0,0 +1,100 @@
+"""
+Compares serialization time and payload size of API renderers.
+"""
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from article import serializers
+from core.custom_renderers import MessagePackRenderer, ORJSONRenderer
+from core.models import Article, Image, Tag
+
+RENDERERS = {
+    'json': JSONRenderer,
+    'orjson': ORJSONRenderer,
+    'msgpack': MessagePackRenderer,
+}
+
+
+def endpoint_payloads():
+    """Returns serialized data of list endpoints, keyed by endpoint name."""
+    articles = Article.objects.prefetch_related('tags').order_by('-id')
+    return {
+        'articles': serializers.ArticleSerializer(articles, many=True).data,
+        'article-detail': serializers.ArticleDetailSerializer(
+            articles.first()).data,
+        'tags': serializers.TagSerializer(
+            Tag.objects.order_by('-id'), many=True).data,
+        'images': serializers.ImageSerializer(
+            Image.objects.order_by('-id'), many=True).data,
+    }
+
+
+def create_rows(count):
+    """Creates synthetic articles with tags for benchmarking."""
+    user = get_user_model().objects.create_user(
+        'benchmark-renderers@example.com', 'benchmark')
+    tags = Tag.objects.bulk_create(
+        [Tag(name=f'Benchmark tag {i}', slug=f'benchmark-tag-{i}')
+         for i in range(10)])
+    articles = Article.objects.bulk_create(
+        [Article(user=user, header=f'Benchmark header {i}',
+                 slug=f'benchmark-header-{i}', lead='Lead ' * 20,
+                 main_text='Zażółć gęślą jaźń. ' * 100, category='testy')
+         for i in range(count)])
+    through = Article.tags.through
+    through.objects.bulk_create(
+        [through(article_id=article.id, tag_id=tags[i % len(tags)].id)
+         for i, article in enumerate(articles)])
+
+
+def time_renderer(renderer_class, data, repeat):
+    """Returns mean render time in milliseconds and payload size in bytes."""
+    renderer = renderer_class()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        content = renderer.render(data)
+    elapsed = time.perf_counter() - started
+    return {'ms': round(elapsed / repeat * 1000, 3), 'bytes': len(content)}
+
+
+class Command(BaseCommand):
+    help = ('Measures render time and payload size of JSON, orjson and '
+            'MessagePack renderers for API endpoints.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--rows', type=int, default=200,
+                            help='Synthetic articles created when database '
+                                 'has none. They are rolled back afterwards.')
+        parser.add_argument('--json', action='store_true',
+                            help='Outputs report as JSON.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not Article.objects.exists():
+                create_rows(options['rows'])
+            payloads = endpoint_payloads()
+            report = {
+                endpoint: {
+                    name: time_renderer(renderer, data, options['repeat'])
+                    for name, renderer in RENDERERS.items()
+                }
+                for endpoint, data in payloads.items()
+            }
+            transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{"endpoint":<16}{"renderer":<10}{"ms":>10}'
+                          f'{"bytes":>10}')
+        for endpoint, renderers in report.items():
+            for name, row in renderers.items():
+                self.stdout.write(f'{endpoint:<16}{name:<10}{row["ms"]:>10}'
+                                  f'{row["bytes"]:>10}')
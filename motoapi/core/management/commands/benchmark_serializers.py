@@ -0,0 +1,62 @@
+"""
+Compares ArticleSerializer with values based ArticleListSerializer.
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from article.serializers import ArticleListSerializer, ArticleSerializer
+from core.management.commands.benchmark_renderers import create_rows
+from core.models import Article
+
+
+def time_serializer(serialize, repeat):
+    """Returns mean time of serializing in milliseconds."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serialize()
+    return round((time.perf_counter() - started) / repeat * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = ('Measures time of serializing article list page with model '
+            'serializer and values based serializer.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Synthetic articles created for the page. '
+                                 'They are rolled back afterwards.')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--json', action='store_true',
+                            help='Outputs report as JSON.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        request = APIRequestFactory().get('/api/articles/articles/')
+        context = {'request': request}
+
+        with transaction.atomic():
+            create_rows(rows)
+            queryset = Article.objects.order_by('-id')[:rows]
+            report = {
+                'rows': rows,
+                'model_serializer_ms': time_serializer(
+                    lambda: ArticleSerializer(
+                        queryset.prefetch_related('tags'), many=True,
+                        context=context).data, repeat),
+                'values_serializer_ms': time_serializer(
+                    lambda: ArticleListSerializer(
+                        queryset, context=context).data, repeat),
+            }
+            transaction.set_rollback(True)
+        report['speedup'] = round(
+            report['model_serializer_ms'] / report['values_serializer_ms'], 1)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for key, value in report.items():
+            self.stdout.write(f'{key:<24}{value:>10}')
@@ -0,0 +1,119 @@
+"""
+Read/write contention benchmark of SQLite with default and tuned pragmas.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.custom_db import apply_pragmas
+
+CATEGORIES = ['newsy', 'felietony', 'relacje', 'testy']
+
+
+def prepare_database(path, rows):
+    """Creates article-like table filled with sample rows."""
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE article (id INTEGER PRIMARY KEY, category TEXT, '
+        'header TEXT, main_text TEXT)')
+    connection.execute(
+        'CREATE INDEX article_category_id ON article (category, id)')
+    connection.executemany(
+        'INSERT INTO article (category, header, main_text) VALUES (?, ?, ?)',
+        ((CATEGORIES[i % 4], f'Header {i}', 'Text ' * 200)
+         for i in range(rows)))
+    connection.commit()
+    connection.close()
+
+
+def run_workload(path, pragmas, readers, writers, duration):
+    """Runs reader and writer threads, returns operation counts."""
+    counts = {'reads': 0, 'writes': 0, 'busy': 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def worker(write):
+        connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+        apply_pragmas(connection.cursor(), pragmas)
+        done = busy = 0
+        index = 0
+        while time.monotonic() < stop:
+            index += 1
+            try:
+                if write:
+                    connection.execute('BEGIN IMMEDIATE')
+                    connection.execute(
+                        'INSERT INTO article (category, header, main_text) '
+                        'VALUES (?, ?, ?)',
+                        (CATEGORIES[index % 4], 'Header', 'Text ' * 200))
+                    connection.execute('COMMIT')
+                else:
+                    connection.execute(
+                        'SELECT id, header FROM article WHERE category = ? '
+                        'ORDER BY id DESC LIMIT 20',
+                        (CATEGORIES[index % 4],)).fetchall()
+                done += 1
+            except sqlite3.OperationalError:
+                busy += 1
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+        connection.close()
+        with lock:
+            counts['writes' if write else 'reads'] += done
+            counts['busy'] += busy
+
+    threads = [threading.Thread(target=worker, args=(write,))
+               for write in [False] * readers + [True] * writers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {name: count / duration if name != 'busy' else count
+            for name, count in counts.items()}
+
+
+class Command(BaseCommand):
+    help = ('Compares read/write throughput of SQLite with default pragmas '
+            'and SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--json', action='store_true',
+                            help='Outputs report as JSON.')
+
+    def handle(self, *args, **options):
+        report = {}
+        for name, pragmas in (('default', {}),
+                              ('tuned', settings.SQLITE_PRAGMAS)):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                prepare_database(path, options['rows'])
+                report[name] = run_workload(
+                    path, pragmas, options['readers'], options['writers'],
+                    options['duration'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{options["readers"]} readers, '
+                          f'{options["writers"]} writers, '
+                          f'{options["duration"]}s per run')
+        self.stdout.write(f'{"pragmas":<10}{"reads/s":>12}{"writes/s":>12}'
+                          f'{"busy":>8}')
+        for name, row in report.items():
+            self.stdout.write(f'{name:<10}{row["reads"]:>12.0f}'
+                              f'{row["writes"]:>12.0f}{row["busy"]:>8}')
+        if report['default']['reads']:
+            gain = report['tuned']['reads'] / report['default']['reads']
+            self.stdout.write(f'read throughput gain: {gain:.2f}x')
@@ -0,0 +1,170 @@
+"""
+Generates synthetic dataset for performance testing.
+"""
+import random
+import time
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import slugify
+from PIL import Image as Im
+
+from core.models import (
+    IMAGE_DIR, THUMBNAIL_DIR, Article, Image, Tag, article_slug, sharded_path)
+
+PREFIX = 'perf'
+BRANDS = ['Honda', 'Yamaha', 'Suzuki', 'Kawasaki', 'Ducati', 'BMW', 'KTM',
+          'Triumph', 'Aprilia', 'Harley-Davidson']
+MODELS = ['CB500F', 'MT-07', 'V-Strom', 'Z900', 'Monster', 'R 1250 GS',
+          'Duke', 'Tiger', 'Tuareg', 'Sportster']
+TOPICS = ['test', 'premiera', 'relacja z targów', 'porównanie', 'long term',
+          'serwis', 'trasa', 'felieton', 'nowości', 'ceny']
+SENTENCES = [
+    'Silnik chętnie wkręca się na obroty i dobrze ciągnie od dołu.',
+    'Zawieszenie jest zestrojone raczej komfortowo niż sportowo.',
+    'Pozycja za kierownicą pozwala na długie przejazdy bez zmęczenia.',
+    'Hamulce działają pewnie, a ABS nie wtrąca się zbyt wcześnie.',
+    'Spalanie w trasie nie przekracza pięciu litrów na sto kilometrów.',
+    'Wykończenie stoi na dobrym poziomie, choć nie brak tanich plastików.',
+]
+CATEGORY_WEIGHTS = {'newsy': 40, 'testy': 30, 'relacje': 20, 'felietony': 10}
+
+
+def create_media(count, size, directory):
+    """Saves sample JPEG files and returns their storage names."""
+    names = []
+    for index in range(count):
+        output = BytesIO()
+        color = (index * 40 % 256, 120, 255 - index * 30 % 256)
+        Im.new('RGB', size, color).save(output, format='JPEG', quality=80)
+        name = sharded_path(directory, f'{PREFIX}-{index}.jpeg')
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        names.append(
+            default_storage.save(name, ContentFile(output.getvalue())))
+    return names
+
+
+def zipf_weights(count, exponent=1.1):
+    """Returns weights of ranks following Zipf distribution."""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class Command(BaseCommand):
+    help = ('Creates users, tags, articles and images for performance tests '
+            'with bulk inserts. Data is reproducible for given seed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--images-per-article', type=float, default=3,
+                            help='Average number of images per article.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--clear', action='store_true',
+                            help='Removes previously generated data first.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rng = random.Random(options['seed'])
+        if options['clear']:
+            self.clear()
+
+        users = self.create_users(options['users'])
+        tags = self.create_tags(options['tags'])
+        photos = create_media(8, (1200, 800), IMAGE_DIR)
+        thumbnails = create_media(4, (800, 600), THUMBNAIL_DIR)
+        tag_weights = zipf_weights(len(tags))
+        categories = list(CATEGORY_WEIGHTS)
+        category_weights = list(CATEGORY_WEIGHTS.values())
+        offset = Article.objects.filter(slug__startswith=f'{PREFIX}-').count()
+
+        created = {'articles': 0, 'images': 0, 'tags': 0}
+        for start in range(0, options['articles'], options['batch_size']):
+            count = min(options['batch_size'], options['articles'] - start)
+            with transaction.atomic():
+                articles = Article.objects.bulk_create([
+                    self.build_article(rng, offset + start + index, users,
+                                       categories, category_weights,
+                                       thumbnails)
+                    for index in range(count)])
+                through = [
+                    Article.tags.through(article_id=article.id, tag_id=tag.id)
+                    for article in articles
+                    for tag in set(rng.choices(tags, tag_weights,
+                                               k=rng.randint(0, 5)))]
+                Article.tags.through.objects.bulk_create(through)
+                images = [
+                    Image(article_id=article.id, photo=rng.choice(photos))
+                    for article in articles
+                    for _ in range(round(rng.expovariate(
+                        1 / options['images_per_article'])
+                        if options['images_per_article'] else 0))]
+                Image.objects.bulk_create(images,
+                                          batch_size=options['batch_size'])
+            created['articles'] += len(articles)
+            created['tags'] += len(through)
+            created['images'] += len(images)
+            self.stdout.write(
+                f'{created["articles"]}/{options["articles"]} articles')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created["articles"]} articles, '
+            f'{created["images"]} images and {created["tags"]} article '
+            f'tags in {time.perf_counter() - started:.1f}s.'))
+
+    def build_article(self, rng, number, users, categories, category_weights,
+                      thumbnails):
+        """Returns unsaved article with generated texts. Header starts with
+        prefix and number, so slug derived from it on save stays unique."""
+        header = (f'{PREFIX.title()} {number} {rng.choice(BRANDS)} '
+                  f'{rng.choice(MODELS)} {rng.choice(TOPICS)}')
+        return Article(
+            user=rng.choice(users),
+            header=header,
+            slug=article_slug(header),
+            lead=' '.join(rng.choices(SENTENCES, k=2)),
+            main_text='\n\n'.join(' '.join(rng.choices(SENTENCES, k=5))
+                                  for _ in range(rng.randint(2, 6))),
+            category=rng.choices(categories, category_weights)[0],
+            thumbnail=rng.choice(thumbnails) if rng.random() < 0.8 else None,
+        )
+
+    def create_users(self, count):
+        """Returns generated users, creating missing ones."""
+        user_model = get_user_model()
+        emails = [f'{PREFIX}-{index}@example.com' for index in range(count)]
+        existing = set(user_model.objects.filter(
+            email__in=emails).values_list('email', flat=True))
+        password = make_password(None)
+        user_model.objects.bulk_create([
+            user_model(email=email, password=password, name='Perf',
+                       surname=str(index))
+            for index, email in enumerate(emails) if email not in existing])
+        return list(user_model.objects.filter(email__in=emails))
+
+    def create_tags(self, count):
+        """Returns generated tags, creating missing ones."""
+        names = [f'{PREFIX.title()} {BRANDS[index % len(BRANDS)]} {index}'
+                 for index in range(count)]
+        slugs = [slugify(name) for name in names]
+        existing = set(Tag.objects.filter(slug__in=slugs).values_list(
+            'slug', flat=True))
+        Tag.objects.bulk_create([
+            Tag(name=name, slug=slug) for name, slug in zip(names, slugs)
+            if slug not in existing])
+        tags = {tag.slug: tag for tag in Tag.objects.filter(slug__in=slugs)}
+        return [tags[slug] for slug in slugs]
+
+    def clear(self):
+        """Removes previously generated articles, tags and users."""
+        Article.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+        Tag.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+        get_user_model().objects.filter(
+            email__startswith=f'{PREFIX}-').delete()
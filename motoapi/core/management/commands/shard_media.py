@@ -0,0 +1,80 @@
+"""
+Moves media files stored in flat directories into hash-sharded layout.
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Article, Image, IMAGE_DIR, THUMBNAIL_DIR, sharded_path
+
+SHARDED_FIELDS = [
+    (Article, 'thumbnail', THUMBNAIL_DIR),
+    (Image, 'photo', IMAGE_DIR),
+]
+
+
+class Command(BaseCommand):
+    help = ('Moves uploaded images into sharded directories in batches and '
+            'rewrites database references.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only reports files which would be moved.')
+
+    def handle(self, *args, **options):
+        for model, field_name, directory in SHARDED_FIELDS:
+            counts = self.migrate_field(model, field_name, directory, options)
+            self.stdout.write(
+                f'{model._meta.label}.{field_name}: moved {counts["moved"]}, '
+                f'already sharded {counts["sharded"]}, '
+                f'missing {counts["missing"]}, changed {counts["changed"]}')
+
+    def migrate_field(self, model, field_name, directory, options):
+        """Moves files of one field, batch by batch ordered by primary key."""
+        storage = model._meta.get_field(field_name).storage
+        counts = {'moved': 0, 'sharded': 0, 'missing': 0, 'changed': 0}
+        last_pk = 0
+
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .exclude(**{f'{field_name}__isnull': True})
+                .exclude(**{field_name: ''})
+                .order_by('pk')
+                .values_list('pk', field_name)[:options['batch_size']])
+            if not batch:
+                return counts
+            last_pk = batch[-1][0]
+
+            for pk, name in batch:
+                new_name = sharded_path(directory, os.path.basename(name))
+                if name == new_name:
+                    counts['sharded'] += 1
+                    continue
+                if not storage.exists(name):
+                    counts['missing'] += 1
+                    continue
+                if options['dry_run']:
+                    counts['moved'] += 1
+                    continue
+
+                # Copy first and switch reference only if row still points to
+                # old file, so readers never see a missing image.
+                with storage.open(name) as old_file:
+                    saved_name = storage.save(new_name, old_file)
+                updated = model.objects.filter(
+                    pk=pk, **{field_name: name}).update(
+                        **{field_name: saved_name})
+                if updated:
+                    storage.delete(name)
+                    counts['moved'] += 1
+                else:
+                    storage.delete(saved_name)
+                    counts['changed'] += 1
+
+            if options['sleep']:
+                time.sleep(options['sleep'])
@@ -0,0 +1,36 @@
+"""
+Copies primary SQLite database into local replica files.
+"""
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ('Copies default SQLite database into SQLite replicas listed in '
+            "REPLICA_ROUTING['REPLICAS'], for testing replica routing "
+            'locally.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('replicas', nargs='*',
+                            help='Replica aliases, all configured by default.')
+
+    def handle(self, *args, **options):
+        replicas = options['replicas'] or settings.REPLICA_ROUTING['REPLICAS']
+        if not replicas:
+            raise CommandError('No replicas configured.')
+
+        primary = connections['default']
+        for alias in replicas:
+            replica = connections[alias]
+            if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+                raise CommandError('Only SQLite databases can be copied.')
+            source = sqlite3.connect(primary.settings_dict['NAME'])
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            with target:
+                source.backup(target)
+            source.close()
+            target.close()
+            self.stdout.write(f'Copied default database to {alias}.')
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_article_photos_source'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['category', '-id'], name='article_category_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['user', '-id'], name='article_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['article', '-id'], name='image_article_id_idx'),
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX article_tags_tag_article_idx '
+                'ON core_article_tags (tag_id, article_id);',
+            reverse_sql='DROP INDEX article_tags_tag_article_idx;',
+        ),
+    ]
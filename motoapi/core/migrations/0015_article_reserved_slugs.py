@@ -0,0 +1,21 @@
+from django.db import migrations
+
+RESERVED_SLUGS = ['facets', 'homepage']
+
+
+def rename_reserved_slugs(apps, schema_editor):
+    """Moves articles off slugs taken by list routes."""
+    Article = apps.get_model('core', 'Article')
+    for slug in RESERVED_SLUGS:
+        Article.objects.filter(slug=slug).update(slug=f'{slug}-article')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_article_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_reserved_slugs, migrations.RunPython.noop),
+    ]
@@ -7,17 +7,38 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils.text import slugify
 from motoapi import settings
+import hashlib
 import os
 import uuid
 from core.custom_mixins import ResizeImageMixin
 
+IMAGE_DIR = os.path.join('uploads', 'article')
+THUMBNAIL_DIR = os.path.join('uploads', 'article', 'thumbnails')
+# Paths of list routes of ArticleViewSet, articles must not take them.
+RESERVED_ARTICLE_SLUGS = {'facets', 'homepage'}
+
+
+def sharded_path(directory, filename):
+    """Returns path of file inside hash-sharded subdirectories (ab/cd/)."""
+    digest = hashlib.md5(filename.encode(), usedforsecurity=False).hexdigest()
+
+    return os.path.join(directory, digest[:2], digest[2:4], filename)
+
+
+def article_slug(header):
+    """Returns slug of article header, suffixed when it is reserved."""
+    slug = slugify(header)
+    if slug in RESERVED_ARTICLE_SLUGS:
+        slug = f'{slug}-article'
+    return slug
+
 
 def thumbnail_file_path(instance, filename):
     """Generates file path for thumbnail."""
     ext = os.path.splitext(filename)[1]
     filename = f'{uuid.uuid4()}_thumbnail{ext}'
 
-    return os.path.join('uploads', 'article', 'thumbnails', filename)
+    return sharded_path(THUMBNAIL_DIR, filename)
 
 
 def image_file_path(instance, filename):
@@ -25,7 +46,7 @@ def image_file_path(instance, filename):
     ext = os.path.splitext(filename)[1]
     filename = f'{uuid.uuid4()}{ext}'
 
-    return os.path.join('uploads', 'article', filename)
+    return sharded_path(IMAGE_DIR, filename)
 
 
 class Tag(models.Model):
@@ -98,11 +119,27 @@ class Article(models.Model, ResizeImageMixin):
     photos_source = models.CharField(
         max_length=255, default='materiały producenta')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', '-id'],
+                         name='article_category_id_idx'),
+            models.Index(fields=['user', '-id'], name='article_user_id_idx'),
+        ]
+
     def __str__(self) -> str:
         return self.header
 
+    @classmethod
+    def canonical_category(cls, category):
+        """Returns stored value of category matching given key or label."""
+        lookup = {}
+        for key, label in cls.CATEGORY_CHOICES:
+            lookup[key.lower()] = key
+            lookup[label.lower()] = key
+        return lookup.get(category.strip().lower())
+
     def save(self, *args, **kwargs):
-        self.slug = slugify(self.header)
+        self.slug = article_slug(self.header)
         if self.thumbnail and (self.thumbnail.width > 800 or self.thumbnail.height > 600):
             self.resize(self.thumbnail, (800, 600))
         return super().save(*args, **kwargs)
@@ -113,7 +150,18 @@ class Image(models.Model, ResizeImageMixin):
     article = models.ForeignKey(Article, on_delete=models.CASCADE)
     photo = models.ImageField(upload_to=image_file_path)
 
-    def save(self, *args, **kwargs):
-        if self.pk is None and (self.photo.width > 1200 or self.photo.height > 800):
+    class Meta:
+        indexes = [
+            models.Index(fields=['article', '-id'],
+                         name='image_article_id_idx'),
+        ]
+
+    def prepare_photo(self):
+        """Scales down photo exceeding maximum size."""
+        if self.photo.width > 1200 or self.photo.height > 800:
             self.resize(self.photo, (1200, 800))
+
+    def save(self, *args, **kwargs):
+        if self.pk is None:
+            self.prepare_photo()
         return super().save(*args, **kwargs)
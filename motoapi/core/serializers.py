@@ -0,0 +1,23 @@
+"""
+Serializers for core API views.
+"""
+from rest_framework import serializers
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """Serializer for single sub-request of batch request."""
+    method = serializers.ChoiceField(
+        choices=['GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and isinstance(data.get('method'), str):
+            data = {**data, 'method': data['method'].upper()}
+        return super().to_internal_value(data)
+
+    def validate_path(self, value):
+        """Checks if path points to API route."""
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError('Path must start with /api/.')
+        return value
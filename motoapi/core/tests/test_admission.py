@@ -0,0 +1,96 @@
+"""
+Tests for admission control middleware.
+"""
+import threading
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.custom_middleware import (
+    AdmissionControlMiddleware, AdmissionGate, classify_request)
+
+ADMISSION_CONTROL = {
+    'RETRY_AFTER': 3,
+    'CLASSES': {
+        'read': {'CONCURRENCY': 1, 'QUEUE': 0, 'TIMEOUT': 0},
+        'upload': {'CONCURRENCY': 1, 'QUEUE': 0, 'TIMEOUT': 0},
+    },
+}
+
+
+class ClassifyRequestTests(SimpleTestCase):
+    """Tests for assigning requests to admission classes."""
+
+    def test_classify_request(self):
+        """Tests if requests are classified by method and path."""
+        factory = RequestFactory()
+        cases = [
+            (factory.get('/api/articles/articles/'), 'read'),
+            (factory.post('/api/articles/articles/'), 'write'),
+            (factory.post('/api/articles/articles/a/upload-photos/'),
+             'upload'),
+            (factory.get('/api/articles/articles/a/upload-archive/'), 'read'),
+            (factory.get('/api/schema'), 'docs'),
+        ]
+
+        for request, expected in cases:
+            self.assertEqual(classify_request(request), expected)
+
+
+class AdmissionGateTests(SimpleTestCase):
+    """Tests for concurrency gate."""
+
+    def test_waiting_request_gets_released_slot(self):
+        """Tests if queued request is admitted once slot is free."""
+        gate = AdmissionGate(concurrency=1, queue=1, timeout=5)
+        gate.acquire()
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(gate.acquire()))
+        waiter.start()
+
+        gate.release()
+        waiter.join()
+
+        self.assertEqual(results, [True])
+
+    def test_full_queue_rejects(self):
+        """Tests if request is rejected when queue is full."""
+        gate = AdmissionGate(concurrency=1, queue=0, timeout=5)
+        gate.acquire()
+
+        self.assertFalse(gate.acquire())
+
+
+@override_settings(ADMISSION_CONTROL=ADMISSION_CONTROL)
+class AdmissionControlMiddlewareTests(SimpleTestCase):
+    """Tests for shedding requests of saturated class."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = AdmissionControlMiddleware(
+            lambda request: HttpResponse())
+
+    def test_saturated_class_returns_503(self):
+        """Tests fast rejection with Retry-After."""
+        self.middleware.gates['upload'].acquire()
+
+        res = self.middleware(
+            self.factory.post('/api/articles/articles/a/upload-photos/'))
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res['Retry-After'], '3')
+
+    def test_reads_admitted_during_upload_storm(self):
+        """Tests if reads do not share slots with uploads."""
+        self.middleware.gates['upload'].acquire()
+
+        res = self.middleware(self.factory.get('/api/articles/articles/'))
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_slot_released_after_response(self):
+        """Tests if finished request frees its slot."""
+        for _ in range(2):
+            res = self.middleware(self.factory.get('/api/articles/articles/'))
+            self.assertEqual(res.status_code, 200)
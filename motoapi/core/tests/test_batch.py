@@ -0,0 +1,120 @@
+"""
+Tests for batch request endpoint.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Tag
+
+BATCH_URL = reverse('api-batch')
+ARTICLE_URL = reverse('article:article-list')
+TAGS_URL = reverse('article:tag-list')
+SEQUENTIAL = {'MAX_REQUESTS': 3, 'MAX_COST': 8, 'WORKERS': 1,
+              'COSTS': {'read': 1, 'write': 5}}
+
+
+def get(path):
+    """Returns GET sub-request of path."""
+    return {'method': 'GET', 'path': path}
+
+
+def create_article(user, **params):
+    """Creates and returns sample article."""
+    defaults = {'header': 'Test header', 'lead': 'Test lead',
+                'main_text': 'Test main text', 'category': 'testy'}
+    defaults.update(params)
+    return Article.objects.create(user=user, **defaults)
+
+
+@override_settings(BATCH_REQUESTS=SEQUENTIAL)
+class BatchApiTests(TestCase):
+    """Tests for batch request endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        create_article(self.user)
+        Tag.objects.create(name='Test tag')
+
+    def test_read_requests(self):
+        """Tests if sub-responses equal responses of direct requests."""
+        paths = [f'{ARTICLE_URL}?category=testy', TAGS_URL, '/api/missing/']
+
+        res = self.client.post(BATCH_URL, [get(path) for path in paths],
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for path, sub_response in zip(paths[:2], res.json()):
+            self.assertEqual(sub_response['status'], status.HTTP_200_OK)
+            self.assertEqual(sub_response['body'],
+                             self.client.get(path).json())
+        self.assertEqual(res.json()[2]['status'], status.HTTP_404_NOT_FOUND)
+
+    def test_write_uses_batch_authentication(self):
+        """Tests if write runs as user of batch request."""
+        self.client.force_authenticate(self.user)
+        payload = {'method': 'post', 'path': ARTICLE_URL,
+                   'body': {'header': 'Batch header', 'lead': 'Test lead',
+                            'main_text': 'Test main text'}}
+
+        res = self.client.post(BATCH_URL, [payload, get(ARTICLE_URL)],
+                               format='json')
+
+        created, listed = res.json()
+        self.assertEqual(created['status'], status.HTTP_201_CREATED)
+        self.assertEqual(Article.objects.get(header='Batch header').user,
+                         self.user)
+        self.assertEqual(listed['body'][0]['header'], 'Batch header')
+
+    def test_write_unauthenticated(self):
+        """Tests if write of anonymous user gives 401."""
+        res = self.client.post(
+            BATCH_URL, [{'method': 'DELETE', 'path': ARTICLE_URL}],
+            format='json')
+
+        self.assertEqual(res.json()[0]['status'], status.HTTP_401_UNAUTHORIZED)
+
+    def test_limits(self):
+        """Tests if too many, too costly or malformed sub-requests give 400."""
+        writes = [{'method': 'POST', 'path': ARTICLE_URL, 'body': {}}] * 2
+        for payload in [[get(TAGS_URL)] * 4, writes, [], {'method': 'GET'},
+                        [get('/admin/')]]:
+            res = self.client.post(BATCH_URL, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Article.objects.filter(header='').exists())
+
+    def test_nested_batch(self):
+        """Tests if batch inside batch is refused."""
+        res = self.client.post(
+            BATCH_URL, [{'method': 'POST', 'path': BATCH_URL, 'body': []}],
+            format='json')
+
+        self.assertEqual(res.json()[0]['status'], status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentBatchApiTests(TransactionTestCase):
+    """Tests for reads executed in worker threads."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        for index in range(3):
+            create_article(user, header=f'Header {index}',
+                           slug=f'header-{index}')
+
+    def test_concurrent_reads(self):
+        """Tests if reads in worker threads keep request order."""
+        client = APIClient()
+        paths = [reverse('article:article-detail', args=[f'header-{index}'])
+                 for index in range(3)]
+
+        res = client.post(BATCH_URL, [get(path) for path in paths],
+                          format='json')
+
+        self.assertEqual([sub['body']['header'] for sub in res.json()],
+                         ['Header 0', 'Header 1', 'Header 2'])
@@ -0,0 +1,150 @@
+"""
+Tests for management commands.
+"""
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core.management.commands.benchmark_api import compare
+from core.models import (
+    Article, Image, IMAGE_DIR, THUMBNAIL_DIR, Tag, sharded_path)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ShardMediaCommandTests(TestCase):
+    """Tests for moving media into sharded directories."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.article = Article.objects.create(
+            user=user, header='Test header', lead='Test lead',
+            main_text='Test main text')
+
+    def _create_flat_file(self, directory, name):
+        """Saves file the way old upload paths did."""
+        return default_storage.save(
+            os.path.join(directory, name), ContentFile(b'image-bytes'))
+
+    def test_moves_files_and_rewrites_references(self):
+        """Tests if files are moved and rows point to new paths."""
+        photo = self._create_flat_file(IMAGE_DIR, 'flat.jpg')
+        thumbnail = self._create_flat_file(THUMBNAIL_DIR, 'flat_thumbnail.jpg')
+        image = Image.objects.bulk_create(
+            [Image(article=self.article, photo=photo)])[0]
+        Article.objects.filter(pk=self.article.pk).update(thumbnail=thumbnail)
+
+        call_command('shard_media', '--batch-size', '1', stdout=StringIO())
+
+        image.refresh_from_db()
+        self.article.refresh_from_db()
+        self.assertEqual(image.photo.name, sharded_path(IMAGE_DIR, 'flat.jpg'))
+        self.assertEqual(self.article.thumbnail.name,
+                         sharded_path(THUMBNAIL_DIR, 'flat_thumbnail.jpg'))
+        self.assertTrue(default_storage.exists(image.photo.name))
+        self.assertFalse(default_storage.exists(photo))
+        self.assertFalse(default_storage.exists(thumbnail))
+
+    def test_dry_run_keeps_files(self):
+        """Tests if dry run does not touch files nor database."""
+        photo = self._create_flat_file(IMAGE_DIR, 'dry.jpg')
+        image = Image.objects.bulk_create(
+            [Image(article=self.article, photo=photo)])[0]
+        out = StringIO()
+
+        call_command('shard_media', '--dry-run', stdout=out)
+
+        image.refresh_from_db()
+        self.assertEqual(image.photo.name, photo)
+        self.assertTrue(default_storage.exists(photo))
+        self.assertIn('core.Image.photo: moved 1', out.getvalue())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PerfCommandTests(TestCase):
+    """Tests for synthetic data generator and API benchmark."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def seed(self, *args):
+        call_command('seed_perf', '--articles', '30', '--tags', '10',
+                     '--users', '3', '--batch-size', '20', *args,
+                     stdout=StringIO())
+
+    def test_seed_is_reproducible(self):
+        """Tests if generator creates requested data, same for same seed."""
+        self.seed()
+        first = list(Article.objects.order_by('id').values_list(
+            'header', 'category', 'user__email'))
+        self.seed('--clear')
+
+        self.assertEqual(Article.objects.count(), 30)
+        self.assertEqual(Tag.objects.count(), 10)
+        self.assertEqual(get_user_model().objects.count(), 3)
+        self.assertEqual(list(Article.objects.order_by('id').values_list(
+            'header', 'category', 'user__email')), first)
+        article = Article.objects.exclude(thumbnail='').exclude(
+            thumbnail=None).first()
+        self.assertTrue(default_storage.exists(article.thumbnail.name))
+
+    def test_benchmark_report_and_baseline(self):
+        """Tests if benchmark writes report and detects regressions."""
+        self.seed()
+        report_path = os.path.join(MEDIA_ROOT, 'report.json')
+
+        call_command('benchmark_api', '--requests', '2', '--warmup', '0',
+                     '--output', report_path, stdout=StringIO())
+
+        with open(report_path) as file:
+            report = json.load(file)
+        self.assertEqual(set(report['scenarios']), {
+            'list', 'detail', 'filter-category', 'filter-tag', 'search',
+            'homepage', 'upload'})
+        for result in report['scenarios'].values():
+            self.assertEqual(result['errors'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(Article.objects.count(), 30)
+
+        # Latency of test runs varies, only query count may regress here.
+        report['scenarios']['list'].update(queries=0, p95_ms=float('inf'))
+        with open(report_path, 'w') as file:
+            json.dump(report, file)
+        with self.assertRaisesMessage(CommandError, '1 regressions found.'):
+            call_command('benchmark_api', '--requests', '2', '--warmup', '0',
+                         '--scenario', 'list', '--baseline', report_path,
+                         '--fail-on-regression', stdout=StringIO())
+
+    def test_compare_latency(self):
+        """Tests if p95 regresses only over both relative and absolute
+        tolerance."""
+        def report(p95_ms):
+            return {'scenarios': {'list': {
+                'p95_ms': p95_ms, 'queries': 2, 'errors': 0}}}
+
+        self.assertEqual(compare(report(11.5), report(10), 0.2, 2), [])
+        self.assertEqual(compare(report(1.5), report(1), 0.2, 2), [])
+        self.assertEqual(compare(report(13), report(10), 0.2, 2),
+                         ['list: p95 13ms > baseline 10ms'])
+
+    def test_benchmark_requires_data(self):
+        """Tests if benchmark fails without generated data."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', stdout=StringIO())
@@ -0,0 +1,58 @@
+"""
+Tests for SQLite connection tuning.
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+
+class SqlitePragmaTests(TestCase):
+    """Tests for pragmas applied to connections."""
+
+    def pragma(self, name, using=connection):
+        """Returns value of pragma on connection."""
+        with using.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def connect(self):
+        """Opens new connection to test database, closed after test."""
+        new_connection = connection.copy()
+        self.addCleanup(new_connection.close)
+        new_connection.ensure_connection()
+        return new_connection
+
+    def test_pragmas_applied_from_settings(self):
+        """Tests if connection hook executes configured pragmas, leaving
+        connections opened after settings change with defaults."""
+        with override_settings(SQLITE_PRAGMAS={'cache_size': -1024,
+                                               'busy_timeout': 1234}):
+            tuned = self.connect()
+
+            self.assertEqual(self.pragma('cache_size', tuned), -1024)
+            self.assertEqual(self.pragma('busy_timeout', tuned), 1234)
+
+        restored = self.connect()
+        self.assertEqual(self.pragma('cache_size', restored), -64 * 1024)
+        self.assertEqual(self.pragma('busy_timeout', restored), 5000)
+
+    def test_default_pragmas_on_connection(self):
+        """Tests if default pragmas are active on test connection."""
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('temp_store'), 2)
+
+
+class SqliteBenchmarkTests(SimpleTestCase):
+    """Tests for contention benchmark command."""
+
+    def test_benchmark_reports_both_configurations(self):
+        """Tests if benchmark reports tuned and default pragmas."""
+        out = StringIO()
+
+        call_command('benchmark_sqlite', '--duration', '0.2', '--rows', '100',
+                     '--readers', '2', '--writers', '1', '--json', stdout=out)
+
+        self.assertIn('"tuned"', out.getvalue())
+        self.assertIn('"default"', out.getvalue())
@@ -0,0 +1,77 @@
+"""
+Tests for image encoder profiles.
+"""
+import os
+import tempfile
+from unittest import mock
+
+from PIL import Image as Im
+from django.test import TestCase, override_settings
+
+from core import custom_mixins
+from core.custom_mixins import encode_image
+from core.management.commands.benchmark_image_profiles import (
+    corpus_paths, structural_similarity)
+
+
+class EncoderProfileTests(TestCase):
+    """Tests encoding images with named profiles."""
+
+    def test_photo_profile_saves_progressive_jpeg(self):
+        """Tests if photo profile creates optimized progressive JPEG."""
+        output, extension = encode_image(
+            Im.new('RGB', (100, 100), 'red'), (50, 50), 'photo')
+
+        with Im.open(output) as encoded:
+            self.assertEqual(encoded.format, 'JPEG')
+            self.assertTrue(encoded.info.get('progressive'))
+            self.assertEqual(encoded.size, (50, 50))
+        self.assertEqual(extension, 'jpeg')
+
+    def test_transparent_graphic_is_not_flattened_to_jpeg(self):
+        """Tests if image with alpha channel is saved as PNG."""
+        output, extension = encode_image(
+            Im.new('RGBA', (20, 20), (0, 0, 0, 0)), (10, 10), 'photo')
+
+        with Im.open(output) as encoded:
+            self.assertEqual(encoded.format, 'PNG')
+            self.assertEqual(encoded.mode, 'RGBA')
+        self.assertEqual(extension, 'png')
+
+    def test_unavailable_format_falls_back(self):
+        """Tests if profile falls back when Pillow lacks encoder."""
+        with mock.patch.object(
+                custom_mixins, 'format_available',
+                side_effect=lambda image_format: image_format == 'JPEG'):
+            output, extension = encode_image(
+                Im.new('RGB', (20, 20)), (10, 10), 'avif')
+
+        self.assertEqual(extension, 'jpeg')
+
+    @override_settings(IMAGE_ENCODER_PROFILES={
+        'photo': {'format': 'PNG', 'options': {}}})
+    def test_profiles_overridden_in_settings(self):
+        """Tests if profiles from settings replace defaults."""
+        output, extension = encode_image(Im.new('RGB', (20, 20)), (10, 10))
+
+        self.assertEqual(extension, 'png')
+
+    def test_structural_similarity(self):
+        """Tests SSIM of identical and different images."""
+        image = Im.effect_noise((64, 64), 50)
+
+        self.assertAlmostEqual(structural_similarity(image, image), 1.0)
+        self.assertLess(
+            structural_similarity(image, Im.new('L', (64, 64), 255)), 0.5)
+
+    def test_corpus_includes_sharded_directories(self):
+        """Tests if benchmark corpus is collected from subdirectories."""
+        with tempfile.TemporaryDirectory() as corpus:
+            os.makedirs(os.path.join(corpus, 'ab', 'cd'))
+            for name in ['flat.jpg', os.path.join('ab', 'cd', 'sharded.png'),
+                         'notes.txt']:
+                open(os.path.join(corpus, name), 'wb').close()
+
+            self.assertEqual(corpus_paths(corpus), [
+                os.path.join(corpus, 'ab', 'cd', 'sharded.png'),
+                os.path.join(corpus, 'flat.jpg')])
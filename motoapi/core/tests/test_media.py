@@ -0,0 +1,144 @@
+"""
+Tests for serving media files.
+"""
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+def media_url(path):
+    """Returns URL of media file."""
+    return reverse('media', args=[path])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ServeMediaTests(TestCase):
+    """Tests for media serving view."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, 'uploads'), exist_ok=True)
+        path = os.path.join(MEDIA_ROOT, 'uploads', 'photo.jpg')
+        with open(path, 'wb') as file:
+            file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_serve_file_with_immutable_cache(self):
+        """Tests serving whole file with caching headers."""
+        res = self.client.get(media_url('uploads/photo.jpg'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT)
+        self.assertEqual(res['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', res['Cache-Control'])
+        self.assertEqual(res['Accept-Ranges'], 'bytes')
+        self.assertTrue(res.has_header('ETag'))
+
+    def test_not_modified_for_matching_etag(self):
+        """Tests returning 304 when client has current version."""
+        etag = self.client.get(media_url('uploads/photo.jpg'))['ETag']
+
+        res = self.client.get(media_url('uploads/photo.jpg'),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_byte_range(self):
+        """Tests serving part of file."""
+        res = self.client.get(media_url('uploads/photo.jpg'),
+                              HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT[10:20])
+        self.assertEqual(res['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+
+    def test_suffix_byte_range(self):
+        """Tests serving last bytes of file."""
+        res = self.client.get(media_url('uploads/photo.jpg'),
+                              HTTP_RANGE='bytes=-5')
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        """Tests rejecting range starting after end of file."""
+        res = self.client.get(media_url('uploads/photo.jpg'),
+                              HTTP_RANGE=f'bytes={len(CONTENT)}-')
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_precompressed_sidecar(self):
+        """Tests serving precompressed file accepted by client."""
+        path = os.path.join(MEDIA_ROOT, 'uploads', 'icon.svg')
+        for name, content in ((path, b'<svg/>'), (path + '.gz', b'gz')):
+            with open(name, 'wb') as file:
+                file.write(content)
+
+        res = self.client.get(media_url('uploads/icon.svg'),
+                              HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(b''.join(res.streaming_content), b'gz')
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(res['Content-Type'], 'image/svg+xml')
+
+    def test_sidecar_refused_with_zero_quality(self):
+        """Tests if encoding with q=0 is not served."""
+        path = os.path.join(MEDIA_ROOT, 'uploads', 'logo.svg')
+        for name, content in ((path, b'<svg/>'), (path + '.gz', b'gz'),
+                              (path + '.br', b'br')):
+            with open(name, 'wb') as file:
+                file.write(content)
+
+        res = self.client.get(media_url('uploads/logo.svg'),
+                              HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        preferred = self.client.get(media_url('uploads/logo.svg'),
+                                    HTTP_ACCEPT_ENCODING='br;q=0.5, gzip')
+
+        self.assertEqual(b''.join(res.streaming_content), b'<svg/>')
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(preferred['Content-Encoding'], 'gzip')
+
+    def test_etag_compared_as_list(self):
+        """Tests if If-None-Match is matched against listed etags, not as
+        substring."""
+        etag = self.client.get(media_url('uploads/photo.jpg'))['ETag']
+
+        listed = self.client.get(media_url('uploads/photo.jpg'),
+                                 HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+        substring = self.client.get(media_url('uploads/photo.jpg'),
+                                    HTTP_IF_NONE_MATCH=f'"a{etag}"')
+
+        self.assertEqual(listed.status_code, 304)
+        self.assertEqual(substring.status_code, 200)
+
+    @override_settings(MEDIA_SERVING={**settings.MEDIA_SERVING,
+                                      'OFFLOAD': 'x-accel-redirect'})
+    def test_x_accel_redirect_offload(self):
+        """Tests leaving file transfer to front-end server."""
+        res = self.client.get(media_url('uploads/photo.jpg'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['X-Accel-Redirect'],
+                         '/protected-media/uploads/photo.jpg')
+        self.assertEqual(res.content, b'')
+        self.assertIn('immutable', res['Cache-Control'])
+
+    def test_missing_file_and_traversal(self):
+        """Tests returning 404 outside of media root and for missing files."""
+        self.assertEqual(
+            self.client.get(media_url('uploads/missing.jpg')).status_code, 404)
+        self.assertEqual(
+            self.client.get(media_url('../settings.py')).status_code, 404)
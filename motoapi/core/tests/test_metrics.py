@@ -0,0 +1,115 @@
+"""
+Tests for Prometheus metrics.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework.test import APIClient
+
+from core import custom_metrics
+
+METRICS_URL = reverse('metrics')
+ARTICLE_URL = reverse('article:article-list')
+TOKEN = 'metrics-token'
+
+
+def sample(text, name, **labels):
+    """Returns value of sample in exposition text, 0 when missing."""
+    labels = {key: str(value) for key, value in labels.items()}
+    for family in text_string_to_metric_families(text):
+        for metric in family.samples:
+            if metric.name == name and metric.labels == labels:
+                return metric.value
+    return 0
+
+
+@override_settings(METRICS={'TOKEN': TOKEN})
+class MetricsApiTests(TestCase):
+    """Tests for metrics endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+            'anon_read': '600/min'}})
+    def test_request_metrics(self):
+        """Tests if requests, queries and throttling are counted per view."""
+        before = self.client.get(METRICS_URL).content.decode()
+
+        self.client.get(ARTICLE_URL)
+        res = self.client.get(METRICS_URL)
+
+        text = res.content.decode()
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        labels = {'view': 'ArticleViewSet', 'action': 'list'}
+        requests = {'name': 'http_requests_total', 'method': 'GET',
+                    'status': 200, **labels}
+        self.assertEqual(
+            sample(text, **requests) - sample(before, **requests), 1)
+        self.assertGreater(sample(text, 'http_request_duration_seconds_bucket',
+                                  le='+Inf', **labels), 0)
+        self.assertGreater(
+            sample(text, 'db_queries_per_request_count', **labels), 0)
+        self.assertIn('# TYPE db_query_duration_seconds histogram', text)
+        self.assertGreater(sample(text, 'throttle_requests_total',
+                                  scope='anon_read', outcome='allowed'), 0)
+
+    def test_cache_hit_ratio(self):
+        """Tests if hit ratio is computed from cache lookups."""
+        for hit in [True, False, True, True]:
+            custom_metrics.count_cache_lookup('test', hit)
+
+        text = self.client.get(METRICS_URL).content.decode()
+
+        self.assertEqual(sample(text, 'cache_hit_ratio', cache='test'), 0.75)
+
+    def test_token_required(self):
+        """Tests if missing or wrong token gives 404, also from proxy
+        address."""
+        for authorization in ['', 'Bearer wrong', f'Token {TOKEN}']:
+            self.client.credentials(HTTP_AUTHORIZATION=authorization)
+
+            res = self.client.get(METRICS_URL, REMOTE_ADDR='127.0.0.1')
+
+            self.assertEqual(res.status_code, 404)
+
+    @override_settings(METRICS={'TOKEN': None})
+    def test_disabled_without_token(self):
+        """Tests if endpoint is disabled without configured token."""
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ')
+
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 404)
+
+
+class MultiprocessMetricsTests(SimpleTestCase):
+    """Tests for summing samples of worker processes."""
+
+    def test_exposition_sums_processes(self):
+        """Tests if samples written by separate processes are summed."""
+        script = ('from core import custom_metrics\n'
+                  'custom_metrics.count_cache_lookup("multiprocess", True)\n'
+                  'custom_metrics.count_cache_lookup("multiprocess", False)\n')
+        with tempfile.TemporaryDirectory() as directory:
+            environ = {'PROMETHEUS_MULTIPROC_DIR': directory}
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', script], check=True,
+                               cwd=settings.BASE_DIR,
+                               env={**os.environ, **environ})
+            with mock.patch.dict(os.environ, environ):
+                text = custom_metrics.exposition().decode()
+
+        self.assertEqual(sample(text, 'cache_requests_total',
+                                cache='multiprocess', result='hit'), 2)
+        self.assertEqual(sample(text, 'cache_hit_ratio', cache='multiprocess'),
+                         0.5)
@@ -4,7 +4,9 @@ Tests for models.
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-from core.models import Article, Tag
+from article.views import ArticleViewSet
+from core.models import (
+    Article, RESERVED_ARTICLE_SLUGS, Tag, image_file_path, thumbnail_file_path)
 
 
 class ModelTests(TestCase):
@@ -62,6 +64,20 @@ class ModelTests(TestCase):
         )
         self.assertEqual(str(article), article.header)
 
+    def test_article_slug_not_reserved(self):
+        """Tests if article does not take slug of list route."""
+        article = Article.objects.create(
+            header='Homepage', lead='Test lead', main_text='Test main text')
+
+        self.assertEqual(article.slug, 'homepage-article')
+
+    def test_reserved_slugs_cover_list_routes(self):
+        """Tests if every list route of articles is reserved."""
+        routes = {action.url_path
+                  for action in ArticleViewSet.get_extra_actions()
+                  if not action.detail}
+        self.assertEqual(routes, RESERVED_ARTICLE_SLUGS)
+
     def test_create_tag(self):
         """Tests creation of tag."""
         tag = Tag.objects.create(
@@ -70,3 +86,18 @@ class ModelTests(TestCase):
         )
 
         self.assertEqual(str(tag), tag.name)
+
+    def test_image_file_path_is_sharded(self):
+        """Tests if uploaded images are spread into hash directories."""
+        path = image_file_path(None, 'photo.jpg')
+
+        self.assertRegex(path, r'^uploads/article/[0-9a-f]{2}/[0-9a-f]{2}/'
+                               r'[0-9a-f-]{36}\.jpg$')
+
+    def test_thumbnail_file_path_is_sharded(self):
+        """Tests if thumbnails are spread into hash directories."""
+        path = thumbnail_file_path(None, 'thumb.png')
+
+        self.assertRegex(
+            path, r'^uploads/article/thumbnails/[0-9a-f]{2}/[0-9a-f]{2}/'
+                  r'[0-9a-f-]{36}_thumbnail\.png$')
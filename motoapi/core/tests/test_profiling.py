@@ -0,0 +1,108 @@
+"""
+Tests for on-demand profiling of requests.
+"""
+import marshal
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.custom_authentication import token_cache
+
+ARTICLE_URL = reverse('article:article-list')
+PROFILE_LIST_URL = reverse('profile-list')
+PROFILES_DIR = tempfile.mkdtemp()
+
+
+@override_settings(PROFILING={**settings.PROFILING, 'DIRECTORY': PROFILES_DIR})
+class ProfilingTests(TestCase):
+    """Tests for profiling requests of staff users."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(PROFILES_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user(
+            'staff@example.com', 'pass123', is_staff=True)
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+
+    def authenticate(self, user):
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_profile_staff_request(self):
+        """Tests if staff request with header is profiled and its stats can
+        be downloaded."""
+        self.authenticate(self.staff)
+
+        res = self.client.get(ARTICLE_URL, HTTP_X_PROFILE='1')
+
+        self.assertEqual(res.status_code, 200)
+        profile_id = res['X-Profile-Id']
+        self.assertTrue(
+            res['X-Profile-URL'].endswith(f'/api/profiles/{profile_id}'))
+        summary = self.client.get(res['X-Profile-URL']).json()
+        self.assertEqual(summary['path'], ARTICLE_URL)
+        self.assertTrue(summary['functions'])
+        self.assertIn('allocations', summary)
+        download = self.client.get(summary['download'])
+        self.assertEqual(download['Content-Disposition'],
+                         f'attachment; filename="{profile_id}.prof"')
+        self.assertIsInstance(
+            marshal.loads(b''.join(download.streaming_content)), dict)
+        self.assertEqual(self.client.get(PROFILE_LIST_URL).json()[0]['id'],
+                         profile_id)
+
+    def test_profile_with_query_param(self):
+        """Tests if query parameter turns profiling on."""
+        self.client.force_login(self.staff)
+
+        res = self.client.get(ARTICLE_URL, {'profile': '1'})
+
+        self.assertIn('X-Profile-Id', res)
+
+    def test_not_profiled_without_flag_or_staff(self):
+        """Tests if normal requests and requests of other users are not
+        profiled."""
+        self.authenticate(self.user)
+
+        self.assertNotIn('X-Profile-Id', self.client.get(ARTICLE_URL))
+        self.assertNotIn('X-Profile-Id',
+                         self.client.get(ARTICLE_URL, HTTP_X_PROFILE='1'))
+        self.assertEqual(self.client.get(PROFILE_LIST_URL).status_code, 403)
+
+    def test_unknown_profile(self):
+        """Tests if missing or malformed profile id gives 404."""
+        self.authenticate(self.staff)
+
+        for profile_id in ['0' * 32, '..settings']:
+            res = self.client.get(reverse('profile-detail', args=[profile_id]))
+
+            self.assertEqual(res.status_code, 404)
+
+    def test_old_profiles_pruned(self):
+        """Tests if only MAX_PROFILES newest profiles are kept."""
+        self.authenticate(self.staff)
+        options = {**settings.PROFILING, 'DIRECTORY': PROFILES_DIR,
+                   'MAX_PROFILES': 1}
+
+        with override_settings(PROFILING=options):
+            first = self.client.get(ARTICLE_URL, HTTP_X_PROFILE='1')
+            os.utime(os.path.join(PROFILES_DIR,
+                                  f'{first["X-Profile-Id"]}.json'), (0, 0))
+            second = self.client.get(ARTICLE_URL, HTTP_X_PROFILE='1')
+
+        profile_id = second['X-Profile-Id']
+        self.assertEqual(sorted(os.listdir(PROFILES_DIR)),
+                         [f'{profile_id}.json', f'{profile_id}.prof'])
@@ -0,0 +1,100 @@
+"""
+Tests for query budget assertions.
+"""
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from article.tests.query_budgets import QUERY_BUDGETS
+from core.custom_testing import query_budget, query_shape
+from core.models import Article, Image, Tag
+
+ARTICLE_URL = reverse('article:article-list')
+
+
+def handle_request(path, queries):
+    """Runs queries the way a request to path would."""
+    request_started.send(None, environ={'REQUEST_METHOD': 'GET',
+                                        'PATH_INFO': path})
+    for query in queries:
+        query()
+    request_finished.send(None)
+
+
+class QueryBudgetTests(TestCase):
+    """Tests for recording queries of requests."""
+
+    def test_over_budget_reports_queries(self):
+        """Tests if exceeding budget fails with queries and their stack."""
+        with self.assertRaises(AssertionError) as context:
+            with query_budget(1):
+                handle_request(ARTICLE_URL, [lambda: Tag.objects.count(),
+                                             lambda: Article.objects.count()])
+
+        message = str(context.exception)
+        self.assertIn('GET /api/articles/articles/ (article:article-list) '
+                      'ran 2 queries, budget is 1', message)
+        self.assertIn('FROM "core_article"', message)
+        self.assertIn('test_query_budget.py', message)
+
+    def test_repeated_query_shape(self):
+        """Tests if same query with other parameters is flagged."""
+        with self.assertRaisesMessage(AssertionError, 'repeated 1 queries'):
+            with query_budget(5):
+                handle_request(ARTICLE_URL, [
+                    lambda: Tag.objects.filter(name='a').first(),
+                    lambda: Tag.objects.filter(name='b').first()])
+
+        with query_budget(5, allow_duplicates=True):
+            handle_request(ARTICLE_URL, [
+                lambda: Tag.objects.filter(name='a').first(),
+                lambda: Tag.objects.filter(name='b').first()])
+
+    def test_undeclared_endpoint(self):
+        """Tests if request to endpoint without budget fails."""
+        with self.assertRaisesMessage(AssertionError,
+                                      'No query budget declared'):
+            with query_budget({'GET article:tag-list': 1}):
+                handle_request(ARTICLE_URL, [])
+
+    def test_queries_outside_requests_ignored(self):
+        """Tests if queries of test itself do not count."""
+        with query_budget(0):
+            Tag.objects.count()
+
+    def test_query_shape(self):
+        """Tests if literals and IN lists are collapsed."""
+        self.assertEqual(
+            query_shape(
+                "SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 'y'"),
+            query_shape('SELECT * FROM t WHERE id IN (%s) AND x = 5'))
+
+
+class ListBudgetTests(TestCase):
+    """Tests if list budget does not depend on number of articles."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.tags = [Tag.objects.create(name=f'Tag {i}') for i in range(3)]
+
+    def create_articles(self, count):
+        for index in range(count):
+            article = Article.objects.create(
+                user=self.user, header=f'Header {Article.objects.count()}',
+                lead='Lead', main_text='Text')
+            article.tags.set(self.tags)
+            Image.objects.bulk_create([Image(article=article, photo='a.jpg')])
+
+    def test_budget_holds_for_any_page_size(self):
+        """Tests if list with and without expanded relations keeps its
+        budget for one and many articles."""
+        for count in (1, 30):
+            self.create_articles(count)
+            with query_budget(QUERY_BUDGETS):
+                self.client.get(ARTICLE_URL)
+            with query_budget(3):
+                self.client.get(ARTICLE_URL, {'expand': 'images,user'})
@@ -0,0 +1,117 @@
+"""
+Tests for JSON and MessagePack renderers and parsers.
+"""
+import datetime
+import decimal
+import uuid
+from io import BytesIO
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from core.custom_parsers import MessagePackParser, ORJSONParser
+from core.custom_renderers import MessagePackRenderer, ORJSONRenderer
+from core.models import Article
+
+ARTICLE_URL = reverse('article:article-list')
+SAMPLE = ReturnList([{
+    'id': 1,
+    'header': 'Zażółć gęślą jaźń  ',
+    'ratio': 0.1,
+    'big': 2 ** 40,
+    'negative': -129,
+    'created': datetime.datetime(2023, 10, 24, 9, 50, 1, 123456,
+                                 tzinfo=datetime.timezone.utc),
+    'price': decimal.Decimal('1.50'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'tags': [{'name': 'tag'}],
+    'thumbnail': None,
+    'active': True,
+}], serializer=None)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Tests for orjson based renderer and parser."""
+
+    def test_output_identical_to_json_renderer(self):
+        """Tests if output matches bytes of JSONRenderer."""
+        self.assertEqual(ORJSONRenderer().render(SAMPLE),
+                         JSONRenderer().render(SAMPLE))
+
+    def test_indented_output_uses_json_renderer(self):
+        """Tests if indented output matches JSONRenderer."""
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(ORJSONRenderer().render(SAMPLE, media_type),
+                         JSONRenderer().render(SAMPLE, media_type))
+
+    def test_parse_json(self):
+        """Tests if JSON body is parsed."""
+        data = ORJSONParser().parse(BytesIO(b'{"header": "Test", "tags": []}'))
+
+        self.assertEqual(data, {'header': 'Test', 'tags': []})
+
+    def test_parse_invalid_json(self):
+        """Tests if invalid JSON raises ParseError."""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"header":'))
+
+
+class MessagePackTests(SimpleTestCase):
+    """Tests for MessagePack encoding."""
+
+    def test_round_trip(self):
+        """Tests if rendered data is parsed back unchanged."""
+        data = {'list': [1, -1, -33, 300, -40000, 2 ** 33, 1.5, None, True],
+                'text': 'x' * 40, 'long': 'y' * 70000, 'bytes': b'\x00\x01',
+                'map': {str(i): i for i in range(20)}}
+        packed = MessagePackRenderer().render(data)
+
+        self.assertEqual(MessagePackParser().parse(BytesIO(packed)), data)
+
+    def test_parse_invalid_data(self):
+        """Tests if truncated data raises ParseError."""
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(BytesIO(b'\x92\x01'))
+
+
+class ContentNegotiationTests(TestCase):
+    """Tests for choosing format by Accept and Content-Type headers."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        Article.objects.create(user=self.user, header='Test header',
+                               lead='Test lead', main_text='Test main text')
+
+    def test_list_as_msgpack(self):
+        """Tests if list is returned as smaller MessagePack body."""
+        json_res = self.client.get(ARTICLE_URL)
+
+        res = self.client.get(ARTICLE_URL, HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(res.content), json_res.json())
+        self.assertLess(len(res.content), len(json_res.content))
+
+    def test_create_from_msgpack(self):
+        """Tests if article is created from MessagePack body."""
+        self.client.force_authenticate(self.user)
+        payload = {'header': 'Packed header', 'lead': 'Test lead',
+                   'main_text': 'Test main text', 'tags': [{'name': 'Tag'}]}
+
+        res = self.client.post(ARTICLE_URL, msgpack.packb(payload),
+                               content_type='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Article.objects.filter(header='Packed header').exists())
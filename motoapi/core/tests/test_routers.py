@@ -0,0 +1,142 @@
+"""
+Tests for read replica routing.
+"""
+import time
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.custom_middleware import (
+    STICKY_COOKIE, STICKY_HEADER, ReplicaRoutingMiddleware)
+from core.custom_routers import (
+    ReplicaRouter, replica_pool, reset_read_database, use_read_database)
+from core.models import Article
+
+REPLICA_ROUTING = {
+    'REPLICAS': ['replica1', 'replica2'],
+    'STICKY_SECONDS': 5,
+    'HEALTH_CHECK_INTERVAL': 10,
+}
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Tests for choosing database of query."""
+
+    def test_reads_use_primary_by_default(self):
+        """Tests if reads and writes use primary outside views."""
+        self.assertIsNone(ReplicaRouter().db_for_read(Article))
+        self.assertEqual(ReplicaRouter().db_for_write(Article), 'default')
+
+    def test_reads_use_replica_chosen_for_context(self):
+        """Tests if reads use replica set for current context."""
+        token = use_read_database('replica1')
+        try:
+            self.assertEqual(ReplicaRouter().db_for_read(Article), 'replica1')
+        finally:
+            reset_read_database(token)
+        self.assertIsNone(ReplicaRouter().db_for_read(Article))
+
+
+@override_settings(REPLICA_ROUTING=REPLICA_ROUTING)
+class ReplicaPoolTests(SimpleTestCase):
+    """Tests for choosing healthy replica."""
+
+    def setUp(self):
+        replica_pool.reset()
+
+    def test_round_robin_over_healthy_replicas(self):
+        """Tests if healthy replicas are chosen in turn."""
+        with mock.patch.object(replica_pool, 'check', return_value=True):
+            chosen = {replica_pool.choose() for _ in range(4)}
+
+        self.assertEqual(chosen, {'replica1', 'replica2'})
+
+    def test_unhealthy_replica_skipped(self):
+        """Tests if replica failing health check is skipped."""
+        with mock.patch.object(replica_pool, 'check',
+                               side_effect=lambda alias: alias == 'replica2'):
+            chosen = {replica_pool.choose() for _ in range(4)}
+
+        self.assertEqual(chosen, {'replica2'})
+
+    def test_primary_used_when_no_replica_healthy(self):
+        """Tests if primary is used when all replicas fail."""
+        with mock.patch.object(replica_pool, 'check', return_value=False):
+            self.assertIsNone(replica_pool.choose())
+
+
+@override_settings(REPLICA_ROUTING=REPLICA_ROUTING)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    """Tests for routing requests of views to replicas."""
+
+    def setUp(self):
+        replica_pool.reset()
+        self.factory = RequestFactory()
+        patcher = mock.patch.object(replica_pool, 'check', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_database(self, request):
+        """Runs request through middleware, returns database used for reads."""
+        return self.handle(request)[0]
+
+    def handle(self, request):
+        """Runs request through middleware, returns database used for reads
+        and response."""
+        used = []
+
+        def get_response(request):
+            used.append(ReplicaRouter().db_for_read(Article))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return used[0], response
+
+    def test_safe_request_uses_replica(self):
+        """Tests if reads of flagged view go to replica."""
+        request = self.factory.get('/api/articles/articles/')
+
+        self.assertIn(self.read_database(request), REPLICA_ROUTING['REPLICAS'])
+        self.assertIsNone(ReplicaRouter().db_for_read(Article))
+
+    def test_views_without_flag_use_primary(self):
+        """Tests if reads of other views go to primary database."""
+        request = self.factory.get('/api/user/profile/')
+
+        self.assertIsNone(self.read_database(request))
+
+    def test_reads_after_write_stick_to_primary(self):
+        """Tests if client carrying marker of its write reads from primary,
+        by cookie or by header."""
+        _, response = self.handle(self.factory.post('/api/articles/articles/'))
+        cookie = response.cookies[STICKY_COOKIE].value
+
+        request = self.factory.get('/api/articles/articles/')
+        request.COOKIES[STICKY_COOKIE] = cookie
+        by_cookie = self.read_database(request)
+        by_header = self.read_database(self.factory.get(
+            '/api/articles/articles/',
+            HTTP_X_READ_PRIMARY=response[STICKY_HEADER]))
+        other_client = self.read_database(
+            self.factory.get('/api/articles/articles/'))
+
+        self.assertIsNone(by_cookie)
+        self.assertIsNone(by_header)
+        self.assertIsNotNone(other_client)
+
+    def test_forged_or_expired_marker_ignored(self):
+        """Tests if unsigned or old marker does not pin client to primary."""
+        _, response = self.handle(self.factory.post('/api/articles/articles/'))
+        value = response[STICKY_HEADER]
+
+        forged = self.read_database(self.factory.get(
+            '/api/articles/articles/', HTTP_X_READ_PRIMARY='primary'))
+        with mock.patch('django.core.signing.time.time',
+                        return_value=time.time() + 60):
+            expired = self.read_database(self.factory.get(
+                '/api/articles/articles/', HTTP_X_READ_PRIMARY=value))
+
+        self.assertIsNotNone(forged)
+        self.assertIsNotNone(expired)
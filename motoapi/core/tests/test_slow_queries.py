@@ -0,0 +1,120 @@
+"""
+Tests for slow query log.
+"""
+import json
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.custom_authentication import token_cache
+from core.custom_slow_queries import (
+    clear_slow_queries, redact, slow_query_report)
+from core.models import Article
+
+ARTICLE_URL = reverse('article:article-list')
+REPORT_URL = reverse('slow-query-report')
+LOG_ALL = {**settings.SLOW_QUERIES, 'THRESHOLD_MS': 0}
+LOG_NONE = {**settings.SLOW_QUERIES, 'THRESHOLD_MS': None}
+
+
+def article_queries():
+    """Returns report entries of queries selecting articles."""
+    return [entry for entry in slow_query_report()
+            if entry['shape'].startswith('SELECT "core_article"."id"')
+            and 'LIKE' in entry['shape']]
+
+
+@override_settings(SLOW_QUERIES=LOG_NONE)
+class SlowQueryLogTests(TestCase):
+    """Tests for logging and aggregating slow queries."""
+
+    def setUp(self):
+        token_cache.clear()
+        clear_slow_queries()
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        Article.objects.create(user=user, header='Yamaha MT-07',
+                               lead='Lead', main_text='Text')
+
+    @contextmanager
+    def log_all(self):
+        """Logs every query inside block, capturing log."""
+        with self.settings(SLOW_QUERIES=LOG_ALL), self.assertLogs(
+                'core.custom_slow_queries', 'WARNING') as logs:
+            yield logs
+
+    def test_logs_query_with_plan(self):
+        """Tests if slow query is logged with plan, view and redacted
+        parameters."""
+        with self.log_all() as logs:
+            self.client.get(ARTICLE_URL, {'query': 'yamaha'})
+
+        lines = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        line = next(line for line in lines if 'LIKE' in line['sql'])
+        self.assertEqual(line['view'], 'ArticleViewSet.list')
+        self.assertIn('<str:8>', line['params'])
+        self.assertNotIn('%yamaha%', json.dumps(line))
+        self.assertTrue(any('core_article' in row for row in line['plan']))
+
+    def test_same_shapes_aggregated(self):
+        """Tests if queries differing only in parameters share entry."""
+        with self.log_all():
+            self.client.get(ARTICLE_URL, {'query': 'yamaha'})
+            self.client.get(ARTICLE_URL, {'query': 'honda'})
+
+        entries = article_queries()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['count'], 2)
+        self.assertEqual(entries[0]['views'], {'ArticleViewSet.list': 2})
+        self.assertIsNotNone(entries[0]['plan'])
+
+    def test_disabled(self):
+        """Tests if nothing is recorded without threshold."""
+        self.client.get(ARTICLE_URL, {'query': 'yamaha'})
+
+        self.assertEqual(slow_query_report(), [])
+
+    def test_report_for_staff_only(self):
+        """Tests if only staff reads and clears report."""
+        staff = get_user_model().objects.create_user(
+            'staff@example.com', 'pass123', is_staff=True)
+        user = get_user_model().objects.get(email='user@example.com')
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+        self.assertEqual(self.client.get(REPORT_URL).status_code, 403)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=staff).key}')
+        with self.log_all():
+            self.client.get(ARTICLE_URL, {'query': 'yamaha'})
+        res = self.client.get(REPORT_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(any('LIKE' in entry['shape'] for entry in res.json()))
+        self.assertEqual(self.client.delete(REPORT_URL).status_code, 204)
+        self.assertEqual(article_queries(), [])
+
+    def test_failed_query_not_explained(self):
+        """Tests if failing slow query raises database error of Django and
+        is logged without plan."""
+        with self.log_all() as logs, self.assertRaises(OperationalError):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT * FROM missing_table WHERE id = %s',
+                               [1])
+
+        line = json.loads(logs.output[-1].split(':', 2)[2])
+        self.assertTrue(line['failed'])
+        self.assertIsNone(line['plan'])
+
+    def test_redact(self):
+        """Tests if every parameter is replaced by its type."""
+        self.assertEqual(redact(['secret', 5, None, b'ab', 1.5]),
+                         ['<str:6>', '<int>', None, '<bytes:2>', '<float>'])
+        self.assertEqual(redact({'id': 5}), {'id': '<int>'})
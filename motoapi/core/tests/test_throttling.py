@@ -0,0 +1,114 @@
+"""
+Tests for sliding-window throttling.
+"""
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.custom_throttling import (
+    SlidingWindowThrottle, key_timeout, memory_store)
+
+TOKEN_URL = reverse('user:token')
+ARTICLE_URL = reverse('article:article-list')
+RATES = {'login': '2/min', 'upload': '5/hour', 'anon_read': '3/min',
+         'user_write': '5/min'}
+
+
+class WindowThrottle(SlidingWindowThrottle):
+    rate = '10/min'
+    scope = 'test'
+
+
+class SlidingWindowTests(TestCase):
+    """Tests for estimating request rate."""
+
+    def setUp(self):
+        memory_store.clear()
+
+    def test_previous_window_is_weighted(self):
+        """Tests if previous window counts only for overlapping part."""
+        throttle = WindowThrottle()
+        throttle.elapsed = 0.25
+
+        self.assertEqual(throttle.estimate(8, 2), 8)
+
+    def test_requests_allowed_after_window_slides(self):
+        """Tests if limit is regained gradually in the next window."""
+        throttle = WindowThrottle()
+        request = mock.Mock(user=mock.Mock(is_authenticated=True, pk=1))
+        with mock.patch.object(WindowThrottle, 'timer', return_value=600):
+            allowed = [throttle.allow_request(request, None)
+                       for _ in range(11)]
+        self.assertEqual(allowed, [True] * 10 + [False])
+        self.assertAlmostEqual(throttle.wait(), 60)
+
+        with mock.patch.object(WindowThrottle, 'timer', return_value=666):
+            self.assertTrue(WindowThrottle().allow_request(request, None))
+            self.assertFalse(WindowThrottle().allow_request(request, None))
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK,
+                                   'DEFAULT_THROTTLE_RATES': RATES})
+class ThrottleApiTests(TestCase):
+    """Tests for throttled endpoints."""
+
+    def setUp(self):
+        memory_store.clear()
+        self.client = APIClient()
+
+    def test_login_throttled_with_retry_after(self):
+        """Tests if password checks are limited per client."""
+        get_user_model().objects.create_user('user@example.com', 'pass123')
+        payload = {'email': 'user@example.com', 'password': 'wrong'}
+
+        codes = [self.client.post(TOKEN_URL, payload).status_code
+                 for _ in range(2)]
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(codes, [status.HTTP_400_BAD_REQUEST] * 2)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(int(res['Retry-After']) > 0)
+
+    def test_anonymous_reads_throttled(self):
+        """Tests if anonymous reads are limited and counted in metrics."""
+        labels = {'scope': 'anon_read', 'outcome': 'throttled'}
+        before = REGISTRY.get_sample_value(
+            'throttle_requests_total', labels) or 0
+
+        codes = [self.client.get(ARTICLE_URL).status_code for _ in range(4)]
+
+        self.assertEqual(codes, [status.HTTP_200_OK] * 3
+                         + [status.HTTP_429_TOO_MANY_REQUESTS])
+        self.assertEqual(
+            REGISTRY.get_sample_value('throttle_requests_total', labels),
+            before + 1)
+
+    def test_authenticated_reads_not_limited_by_anonymous_scope(self):
+        """Tests if authenticated users are not counted as anonymous."""
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.client.force_authenticate(user)
+
+        codes = {self.client.get(ARTICLE_URL).status_code for _ in range(4)}
+
+        self.assertEqual(codes, {status.HTTP_200_OK})
+
+    @override_settings(THROTTLE_STORE={**settings.THROTTLE_STORE,
+                                       'BACKEND': 'cache'})
+    def test_cache_store(self):
+        """Tests counting requests in shared cache."""
+        cache.clear()
+        codes = [self.client.get(ARTICLE_URL).status_code for _ in range(4)]
+
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_cache_key_timeout_from_longest_window(self):
+        """Tests if cached counters outlive the longest configured window."""
+        self.assertEqual(key_timeout(), 2 * 60 * 60)
@@ -0,0 +1,100 @@
+"""
+Tests for Server-Timing instrumentation.
+"""
+import json
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image as Im
+from rest_framework.test import APIClient
+
+from core.custom_timing import current_timing, start_timing, stop_timing, timed
+from core.models import Article
+
+ARTICLE_URL = reverse('article:article-list')
+SAMPLED = {'SAMPLE_RATE': 1, 'HEADER': True, 'LOG': True}
+
+
+def phases(response):
+    """Returns names of phases in Server-Timing header."""
+    return [entry.split(';')[0].strip()
+            for entry in response['Server-Timing'].split(',')]
+
+
+@override_settings(SERVER_TIMING=SAMPLED)
+class ServerTimingTests(TestCase):
+    """Tests for timing of sampled requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'pass123')
+        self.article = Article.objects.create(
+            user=self.user, header='Test header', lead='Test lead',
+            main_text='Test main text', slug='test-header')
+
+    def test_header_and_log(self):
+        """Tests if phases are sent in header and logged."""
+        with self.assertLogs('core.custom_middleware', 'INFO') as logs:
+            res = self.client.get(
+                reverse('article:article-detail', args=['test-header']))
+
+        self.assertEqual(sorted(phases(res)),
+                         ['db', 'render', 'serialize', 'total', 'view'])
+        self.assertIn('desc="2 queries"', res['Server-Timing'])
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['view'], 'ArticleViewSet.retrieve')
+        self.assertEqual(line['phases']['db']['count'], 2)
+
+    def test_image_phase(self):
+        """Tests if image encoding is timed as image phase."""
+        self.client.force_authenticate(self.user)
+        image = BytesIO()
+        Im.new('RGB', (900, 700)).save(image, format='JPEG')
+        upload = SimpleUploadedFile('a.jpg', image.getvalue(), 'image/jpeg')
+
+        res = self.client.post(
+            reverse('article:article-upload-thumbnail', args=['test-header']),
+            {'thumbnail': upload}, format='multipart')
+
+        self.assertIn('image', phases(res))
+        self.article.refresh_from_db()
+        self.article.thumbnail.delete()
+
+    async def test_async_view(self):
+        """Tests if queries of async view are timed."""
+        res = await self.async_client.get(reverse('article:async-tag-list'))
+
+        self.assertIn('db', phases(res))
+
+    @override_settings(SERVER_TIMING={**SAMPLED, 'SAMPLE_RATE': 0})
+    def test_not_sampled(self):
+        """Tests if request outside sample has no header."""
+        res = self.client.get(ARTICLE_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+
+class TimedTests(TestCase):
+    """Tests for recording phases."""
+
+    def test_timed_outside_request(self):
+        """Tests if timing outside request is ignored."""
+        with timed('serialize'):
+            pass
+
+        self.assertIsNone(current_timing())
+
+    def test_phases_accumulate(self):
+        """Tests if repeated phase sums count."""
+        token = start_timing()
+        try:
+            for _ in range(2):
+                with timed('image'):
+                    pass
+            self.assertEqual(current_timing().phases['image'][1], 2)
+        finally:
+            stop_timing(token)
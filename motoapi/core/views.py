@@ -0,0 +1,286 @@
+"""
+Views serving uploaded media files, batched API requests, metrics,
+request profiles and slow query report.
+"""
+import hmac
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified,
+    StreamingHttpResponse)
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework import permissions, status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.batch import request_cost, run_batch
+from core.custom_authentication import CachedTokenAuthentication
+from core.custom_metrics import exposition
+from core.custom_profiling import list_summaries, load_summary, profile_path
+from core.custom_slow_queries import clear_slow_queries, slow_query_report
+from core.serializers import SubRequestSerializer
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+SIDECAR_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def _etag(stat):
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def _accepted_encodings(header):
+    """Returns encoding to q-value mapping of Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(','):
+        encoding, *params = [part.strip() for part in item.split(';')]
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[encoding.lower()] = quality
+    return accepted
+
+
+def _choose_sidecar(request, full_path):
+    """Returns precompressed sibling file accepted by client, if present.
+
+    Encodings are tried by client q-value, then by SIDECAR_ENCODINGS order.
+    """
+    accepted = _accepted_encodings(
+        request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    candidates = []
+    for order, (encoding, suffix) in enumerate(SIDECAR_ENCODINGS):
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            candidates.append((-quality, order, encoding, suffix))
+    for _, _, encoding, suffix in sorted(candidates):
+        if os.path.isfile(full_path + suffix):
+            return full_path + suffix, encoding
+    return full_path, None
+
+
+def _etag_matches(header, etag):
+    """Returns if If-None-Match header lists etag, compared weakly."""
+    etags = parse_etags(header)
+    return '*' in etags or etag in [tag.removeprefix('W/') for tag in etags]
+
+
+def _parse_range(header, size):
+    """Returns (start, end) of single byte range, None to serve whole file.
+
+    Raises ValueError for unsatisfiable range.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end) if end else size - 1, size - 1)
+    if start >= size or start > end:
+        raise ValueError('Range not satisfiable.')
+    return start, end
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def metrics(request):
+    """Exposes metrics of all worker processes in Prometheus format.
+
+    Scraper sends METRICS['TOKEN'] as bearer token, without configured
+    token the endpoint is disabled.
+    """
+    token = settings.METRICS['TOKEN']
+    scheme, _, credentials = request.META.get(
+        'HTTP_AUTHORIZATION', '').partition(' ')
+    if (not token or scheme.lower() != 'bearer'
+            or not hmac.compare_digest(credentials.encode(), token.encode())):
+        raise Http404('Not found.')
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE_LATEST)
+
+
+@require_safe
+def serve_media(request, path):
+    """Serves uploaded file with immutable caching and byte ranges.
+
+    File names are uuid based and never change, so responses are cached
+    forever. With MEDIA_SERVING['OFFLOAD'] set, sending bytes is left to
+    the front-end server through X-Accel-Redirect or X-Sendfile.
+    """
+    options = settings.MEDIA_SERVING
+    try:
+        full_path = safe_join(os.path.abspath(settings.MEDIA_ROOT), path)
+    except SuspiciousFileOperation:
+        raise Http404('Media file not found.')
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found.')
+
+    file_path, encoding = _choose_sidecar(request, full_path)
+    stat = os.stat(file_path)
+    etag = _etag(stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': f'public, max-age={options["MAX_AGE"]}, immutable',
+        'Vary': 'Accept-Encoding',
+    }
+    content_type = (mimetypes.guess_type(full_path)[0]
+                    or 'application/octet-stream')
+
+    if _etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+        response = HttpResponseNotModified()
+    elif options['OFFLOAD'] == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            options['ACCEL_REDIRECT_PREFIX'].rstrip('/') + '/'
+            + os.path.relpath(file_path, os.path.abspath(settings.MEDIA_ROOT)))
+    elif options['OFFLOAD'] == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = file_path
+    else:
+        response = _file_response(request, file_path, stat.st_size,
+                                  content_type, etag)
+
+    for header, value in headers.items():
+        response[header] = value
+    if encoding and response.status_code != 304:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def _file_response(request, file_path, size, content_type, etag):
+    """Returns whole file or requested byte range of it."""
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(file_path, start, end), status=206,
+                content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+    response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+class BatchView(APIView):
+    """Runs array of API sub-requests and returns their responses."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        """Validates limits of batch and executes its sub-requests."""
+        serializer = SubRequestSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data
+        options = settings.BATCH_REQUESTS
+        if not items:
+            return Response({'detail': 'Batch is empty.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > options['MAX_REQUESTS']:
+            return Response(
+                {'detail':
+                    f'Batch exceeds {options["MAX_REQUESTS"]} requests.'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if sum(request_cost(item) for item in items) > options['MAX_COST']:
+            return Response(
+                {'detail': f'Batch exceeds cost of {options["MAX_COST"]}.'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(run_batch(request, items), status=status.HTTP_200_OK)
+
+
+class ProfileListView(APIView):
+    """Lists saved request profiles."""
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(list_summaries(), status=status.HTTP_200_OK)
+
+
+class ProfileDetailView(APIView):
+    """Returns summary of request profile with slowest functions and top
+    allocations."""
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, profile_id):
+        summary = load_summary(profile_id)
+        if summary is None:
+            raise Http404('Profile not found.')
+        summary['download'] = request.build_absolute_uri(
+            reverse('profile-download', args=[profile_id]))
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class ProfileDownloadView(APIView):
+    """Downloads cProfile stats of request profile in pstats format."""
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, profile_id):
+        if load_summary(profile_id) is None:
+            raise Http404('Profile not found.')
+        try:
+            file = open(profile_path(profile_id, 'prof'), 'rb')
+        except FileNotFoundError:
+            raise Http404('Profile not found.')
+        return FileResponse(file, as_attachment=True,
+                            filename=f'{profile_id}.prof',
+                            content_type='application/octet-stream')
+
+
+class SlowQueryReportView(APIView):
+    """Reports slow query shapes of this process, DELETE clears them."""
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(slow_query_report(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        clear_slow_queries()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,14 +53,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.custom_middleware.MetricsMiddleware',
+    'core.custom_middleware.SlowQueryMiddleware',
+    'core.custom_middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'core.custom_middleware.AdmissionControlMiddleware',
+    'core.custom_middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.custom_middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'motoapi.urls'
@@ -100,6 +108,36 @@ DATABASES = {
     }
 }
 
+# Read replicas (core.custom_routers), listed in REPLICA_ROUTING['REPLICAS'].
+# Locally a replica may be second SQLite file refreshed with
+# 'manage.py sync_replica', e.g.:
+# DATABASES['replica1'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'replica1.sqlite3',
+#     'TEST': {'MIRROR': 'default'},
+# }
+# After a write the client reads from primary for STICKY_SECONDS, marked
+# by signed read_primary cookie or X-Read-Primary header it sends back.
+
+DATABASE_ROUTERS = ['core.custom_routers.ReplicaRouter']
+
+REPLICA_ROUTING = {
+    'REPLICAS': [],
+    'STICKY_SECONDS': 5,
+    'HEALTH_CHECK_INTERVAL': 10,
+}
+
+# Applied to every SQLite connection (core.custom_db)
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -148,6 +186,184 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+TEST_RUNNER = 'core.custom_testing.TestRunner'
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.custom_renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'core.custom_renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.custom_parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'core.custom_parsers.MessagePackParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.custom_throttling.AnonReadRateThrottle',
+        'core.custom_throttling.UserWriteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '10/min',
+        'upload': '60/hour',
+        'anon_read': '600/min',
+        'user_write': '120/min',
+    },
+}
+
+# Counters of core.custom_throttling, 'memory' keeps them per process,
+# 'cache' shares them between workers through default cache.
+
+THROTTLE_STORE = {
+    'BACKEND': 'memory',
+    'MAX_KEYS': 100000,
+}
+
+# Image encoder profiles (see core.custom_mixins.ENCODER_PROFILES)
+# IMAGE_ENCODER_PROFILES overrides or adds profiles by name, while
+# IMAGE_FIELD_PROFILES chooses profile for '<app>.<Model>.<field>'.
+
+IMAGE_ENCODER_PROFILES = {}
+
+IMAGE_FIELD_PROFILES = {
+    'core.Article.thumbnail': 'thumbnail',
+    'core.Image.photo': 'photo',
+}
+
+# ZIP archive ingest of article photos (article.archive)
+# Progress is kept in default cache. Default cache is local memory of
+# each process, so with several workers CACHES must configure a shared
+# backend (e.g. Redis), or progress requests may reach a worker which
+# knows nothing about the upload.
+
+ARCHIVE_UPLOAD = {
+    'WORKERS': 4,
+    'BATCH_SIZE': 50,
+    'MAX_ENTRIES': 500,
+    'MAX_ENTRY_SIZE': 20 * 1024 * 1024,
+    'PROGRESS_TIMEOUT': 60 * 60,
+}
+
+# Related objects embedded with ?expand= (article.views.ArticleViewSet)
+# MAX_DEPTH limits dotted relation paths, MAX_IMAGES images per article.
+
+ARTICLE_EXPAND = {
+    'MAX_DEPTH': 1,
+    'MAX_IMAGES': 50,
+}
+
+# Batched API sub-requests (core.batch)
+# Batch over MAX_REQUESTS or MAX_COST is rejected, consecutive reads run
+# concurrently in up to WORKERS threads.
+
+BATCH_REQUESTS = {
+    'MAX_REQUESTS': 20,
+    'MAX_COST': 40,
+    'WORKERS': 4,
+    'COSTS': {'read': 1, 'write': 5},
+}
+
+# Multi-get of articles with ?slugs= or ?ids= (article.views.ArticleViewSet)
+
+ARTICLE_MULTI_GET = {
+    'MAX_KEYS': 100,
+}
+
+# Category and tag counts (article.facets)
+# TOP_TAGS is default number of tags returned, MAX_TOP_TAGS the highest
+# accepted in ?top=. Changes invalidate cached counts by bumping version
+# key in default cache. With local memory cache only the process handling
+# the change sees it, other workers serve stale counts up to TIMEOUT
+# seconds, so several workers need shared cache backend in CACHES.
+
+ARTICLE_FACETS = {
+    'TOP_TAGS': 20,
+    'MAX_TOP_TAGS': 100,
+    'TIMEOUT': 60 * 10,
+}
+
+# Latest articles of every category (article.homepage)
+# Invalidated like ARTICLE_FACETS, so with several workers it also needs
+# shared cache backend, otherwise they serve stale document up to TIMEOUT.
+
+ARTICLE_HOMEPAGE = {
+    'PER_CATEGORY': 5,
+    'TIMEOUT': 60 * 10,
+}
+
+# Server-Timing header and timing log of sampled requests
+# (core.custom_middleware.ServerTimingMiddleware)
+
+SERVER_TIMING = {
+    'SAMPLE_RATE': 0.05,
+    'HEADER': True,
+    'LOG': True,
+}
+
+# Prometheus metrics (core.custom_metrics)
+# /metrics requires 'Authorization: Bearer <TOKEN>' and is disabled
+# without TOKEN. Several worker processes need PROMETHEUS_MULTIPROC_DIR
+# environment variable pointing to directory shared by them.
+
+METRICS = {
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+# Profiling of single requests of staff users (core.custom_profiling)
+# Requests with HEADER header or QUERY_PARAM parameter are profiled, at
+# most MAX_PROFILES newest profiles are kept in DIRECTORY.
+
+PROFILING = {
+    'HEADER': 'X-Profile',
+    'QUERY_PARAM': 'profile',
+    'DIRECTORY': Path(tempfile.gettempdir()) / 'motoapi-profiles',
+    'MAX_PROFILES': 50,
+    'TOP_FUNCTIONS': 30,
+    'TOP_ALLOCATIONS': 20,
+    'TRACEBACK_FRAMES': 1,
+}
+
+# Slow query log (core.custom_slow_queries)
+# Queries of THRESHOLD_MS or longer are logged with their plan when
+# EXPLAIN is on, None turns the log off. Report at /api/slow-queries keeps
+# MAX_SHAPES query shapes per process.
+
+SLOW_QUERIES = {
+    'THRESHOLD_MS': 100,
+    'EXPLAIN': True,
+    'MAX_SHAPES': 200,
+}
+
+# Serving of uploaded media (core.views.serve_media)
+# OFFLOAD is None, 'x-accel-redirect' (nginx internal location mapped to
+# ACCEL_REDIRECT_PREFIX) or 'x-sendfile' (Apache/lighttpd).
+
+MEDIA_SERVING = {
+    'OFFLOAD': None,
+    'ACCEL_REDIRECT_PREFIX': '/protected-media/',
+    'MAX_AGE': 60 * 60 * 24 * 365,
+}
+
+# Token authentication (core.custom_authentication)
+
+TOKEN_AUTH = {
+    'EXPIRES_AFTER': 60 * 60 * 24 * 7,
+    'CACHE_SIZE': 10000,
+    'CACHE_TTL': 60,
+}
+
+# Concurrency limits per request class (core.custom_middleware)
+# Requests over CONCURRENCY wait up to TIMEOUT seconds in queue of QUEUE
+# places, otherwise they get 503 with Retry-After.
+
+ADMISSION_CONTROL = {
+    'RETRY_AFTER': 1,
+    'CLASSES': {
+        'read': {'CONCURRENCY': 32, 'QUEUE': 64, 'TIMEOUT': 1},
+        'write': {'CONCURRENCY': 8, 'QUEUE': 16, 'TIMEOUT': 2},
+        'upload': {'CONCURRENCY': 2, 'QUEUE': 4, 'TIMEOUT': 5},
+        'docs': {'CONCURRENCY': 2, 'QUEUE': 2, 'TIMEOUT': 1},
+    },
 }
@@ -2,20 +2,29 @@
 URL configuration for motoapi project.
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from django.conf.urls.static import static
 from django.conf import settings
+from core.views import (
+    BatchView, ProfileDetailView, ProfileDownloadView, ProfileListView,
+    SlowQueryReportView, metrics, serve_media)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema', SpectacularAPIView.as_view(), name='api-schema'),
     path('api/docs', SpectacularSwaggerView.as_view(url_name='api-schema'),
          name='api-docs'),
+    path('api/batch', BatchView.as_view(), name='api-batch'),
+    path('metrics', metrics, name='metrics'),
+    path('api/profiles', ProfileListView.as_view(), name='profile-list'),
+    path('api/profiles/<str:profile_id>', ProfileDetailView.as_view(),
+         name='profile-detail'),
+    path('api/profiles/<str:profile_id>/download',
+         ProfileDownloadView.as_view(), name='profile-download'),
+    path('api/slow-queries', SlowQueryReportView.as_view(),
+         name='slow-query-report'),
     path('api/user/', include('user.urls')),
-    path('api/articles/', include('article.urls'))
+    path('api/articles/', include('article.urls')),
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$', serve_media,
+            name='media'),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL,
-                          document_root=settings.MEDIA_ROOT)
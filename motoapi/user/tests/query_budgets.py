@@ -0,0 +1,11 @@
+"""
+Query budgets of user API endpoints, used with core.custom_testing.
+"""
+QUERY_BUDGETS = {
+    'GET user:profile': 1,
+    'PATCH user:profile': 1,
+    'POST user:profile': 0,
+    'POST user:token': 4,
+    'POST user:token-rotate': 2,
+    'POST user:token-revoke': 1,
+}
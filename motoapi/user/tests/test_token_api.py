@@ -0,0 +1,123 @@
+"""
+Tests for token authentication, expiry and rotation.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.custom_authentication import token_cache
+from core.custom_testing import query_budget
+from user.tests.query_budgets import QUERY_BUDGETS
+
+PROFILE_URL = reverse('user:profile')
+TOKEN_URL = reverse('user:token')
+TOKEN_ROTATE_URL = reverse('user:token-rotate')
+TOKEN_REVOKE_URL = reverse('user:token-revoke')
+
+
+def create_user(**params):
+    """Helper function for creating user."""
+    return get_user_model().objects.create_user(**params)
+
+
+@query_budget(QUERY_BUDGETS)
+class TokenAuthenticationTests(TestCase):
+    """Tests for requests authenticated with token."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123',
+                                name='Test', surname='Userowsky')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def expire(self, token):
+        """Moves creation date of token past its lifetime."""
+        Token.objects.filter(key=token.key).update(
+            created=timezone.now() - timedelta(
+                seconds=settings.TOKEN_AUTH['EXPIRES_AFTER'] + 1))
+
+    def test_cached_token_skips_database(self):
+        """Tests if repeated request is authenticated from cache."""
+        self.client.get(PROFILE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_expired_token_rejected(self):
+        """Tests if token older than lifetime is not accepted."""
+        self.expire(self.token)
+
+        res = self.client.get(PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_replaces_expired_token(self):
+        """Tests if obtaining token returns new one after expiry."""
+        self.expire(self.token)
+
+        res = self.client.post(
+            TOKEN_URL, {'email': 'user@example.com', 'password': 'pass123'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], self.token.key)
+        self.assertIn('expires', res.data)
+
+    def test_rotate_token(self):
+        """Tests if rotation issues new token and revokes old one."""
+        self.client.get(PROFILE_URL)
+
+        res = self.client.post(TOKEN_ROTATE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], self.token.key)
+        self.assertEqual(self.client.get(PROFILE_URL).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {res.data["token"]}')
+        self.assertEqual(self.client.get(PROFILE_URL).status_code,
+                         status.HTTP_200_OK)
+
+    def test_revoke_token(self):
+        """Tests if revoked token is rejected even when cached."""
+        self.client.get(PROFILE_URL)
+
+        res = self.client.post(TOKEN_REVOKE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertEqual(self.client.get(PROFILE_URL).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_change_invalidates_cache(self):
+        """Tests if deactivated user loses access immediately."""
+        self.client.get(PROFILE_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(PROFILE_URL).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_AUTH={**settings.TOKEN_AUTH, 'CACHE_SIZE': 1})
+    def test_cache_evicts_least_recently_used(self):
+        """Tests if cache keeps at most CACHE_SIZE tokens."""
+        other = create_user(email='other@example.com', password='pass123')
+        other_token = Token.objects.create(user=other)
+        self.client.get(PROFILE_URL)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {other_token.key}')
+        self.client.get(PROFILE_URL)
+
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertIsNotNone(token_cache.get(other_token.key))
@@ -8,6 +8,9 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core.custom_testing import query_budget
+from user.tests.query_budgets import QUERY_BUDGETS
+
 PROFILE_URL = reverse('user:profile')
 TOKEN_URL = reverse('user:token')
 
@@ -18,6 +21,7 @@ def create_user(**params):
     return user
 
 
+@query_budget(QUERY_BUDGETS)
 class PublicUserApiTests(TestCase):
     """Tests for unauthenticated users."""
 
@@ -79,6 +83,7 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(QUERY_BUDGETS)
 class PrivateUserApiTests(TestCase):
     """Tests for authenticated users."""
 
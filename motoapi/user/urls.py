@@ -8,5 +8,9 @@ app_name = 'user'
 
 urlpatterns = [
     path('token/', views.AuthTokenCreateView.as_view(), name='token'),
+    path('token/rotate/', views.AuthTokenRotateView.as_view(),
+         name='token-rotate'),
+    path('token/revoke/', views.AuthTokenRevokeView.as_view(),
+         name='token-revoke'),
     path('profile/', views.ManagerUserView.as_view(), name='profile')
 ]
@@ -2,16 +2,22 @@
 Views for user API.
 """
 
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from user.serializers import AuthTokenSerializer, UserSerializer
 from rest_framework.settings import api_settings
 from rest_framework.authtoken.views import ObtainAuthToken
 
+from core.custom_authentication import (
+    CachedTokenAuthentication, get_valid_token, rotate_token, token_payload)
+from core.custom_throttling import LoginRateThrottle
+
 
 class ManagerUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
@@ -23,3 +29,31 @@ class AuthTokenCreateView(ObtainAuthToken):
     """Creates new token for validated user."""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginRateThrottle]
+
+    def post(self, request, *args, **kwargs):
+        """Returns valid token of user, replacing expired one."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = get_valid_token(serializer.validated_data['user'])
+        return Response(token_payload(token))
+
+
+class AuthTokenRotateView(APIView):
+    """Replaces token used for request with a new one."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        token = rotate_token(request.auth)
+        return Response(token_payload(token))
+
+
+class AuthTokenRevokeView(APIView):
+    """Revokes token used for request."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)